@@ -6,6 +6,8 @@ This package contains various agents for power system analysis:
 - loss_agent: System loss calculation
 - fault_agent: Fault analysis for bolted faults
 - ybus_agent: Ybus matrix calculation from branch data
+- stability_agent: Multi-machine transient stability simulation
+- dispatch_agent: Economic dispatch with transmission losses
 - websearch_agent: Web search for general queries
 - power_flow_agent: Main orchestrator agent for power flow analysis
 """
@@ -14,6 +16,8 @@ from .gs_agent import run_gs_agent
 from .loss_agent import run_loss_agent
 from .fault_agent import run_fault_agent
 from .ybus_agent import run_ybus_agent
+from .stability_agent import run_stability_agent
+from .dispatch_agent import run_dispatch_agent
 from .websearch_agent import run_websearch_agent
 from .power_flow_agent import run_power_flow_agent
 
@@ -22,6 +26,8 @@ __all__ = [
     'run_loss_agent',
     'run_fault_agent',
     'run_ybus_agent',
+    'run_stability_agent',
+    'run_dispatch_agent',
     'run_websearch_agent',
     'run_power_flow_agent'
 ]
@@ -0,0 +1,124 @@
+import numpy as np
+import json
+from groq import Groq
+from dotenv import load_dotenv
+from economic_dispatch import economic_dispatch
+import os
+
+load_dotenv()
+
+client = Groq()
+MODEL = "openai/gpt-oss-120b"
+
+_NUMBER_LIST = {
+    "type": "array",
+    "items": {
+        "type": "number"
+    }
+}
+
+
+def run_conversation(user_prompt):
+    # Initialize the conversation with system and user messages
+    messages=[
+        {
+            "role": "system",
+            "content": "You are a power system economic dispatch assistant. Use the economic_dispatch function to share a demand between generating units at equal incremental cost, given each unit's incremental cost alpha*P + beta, its limits and optionally the B loss coefficient matrix. If the user gives the cost as a*P^2 + b*P + c, pass alpha = 2a and beta = b. To get the incremental cost curve over several demand levels, pass them all in demands in a single call. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
+        },
+        {
+            "role": "user",
+            "content": user_prompt,
+        }
+    ]
+
+    # Define the available tools for our model to use
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "economic_dispatch",
+                "description": "Economic dispatch of generating units with limits and optional B-coefficient transmission losses",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "alpha": dict(_NUMBER_LIST, description="Slope of each unit's incremental cost alpha*P + beta"),
+                        "beta": dict(_NUMBER_LIST, description="Intercept of each unit's incremental cost alpha*P + beta"),
+                        "p_min": dict(_NUMBER_LIST, description="Minimum output of each unit in MW"),
+                        "p_max": dict(_NUMBER_LIST, description="Maximum output of each unit in MW"),
+                        "demands": dict(_NUMBER_LIST, description="Demand level(s) in MW; several levels give the incremental cost curve"),
+                        "B": {
+                            "type": "array",
+                            "description": "Optional loss coefficient matrix in 1/MW as a list of lists",
+                            "items": _NUMBER_LIST
+                        }
+                    },
+                    "required": ["alpha", "beta", "p_min", "p_max", "demands"]
+                }
+            }
+        }
+    ]
+
+    # Make the initial API call to Groq
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        stream=False,
+        tools=tools,
+        tool_choice="auto",
+        max_tokens=8100
+    )
+
+    # Extract the response and any tool calls
+    response_message = response.choices[0].message
+    tool_calls = response_message.tool_calls
+
+    if tool_calls:
+        # Add the LLM's response to conversation
+        messages.append(response_message)
+
+        # Process each tool call
+        for tool_call in tool_calls:
+            function_name = tool_call.function.name
+            function_args = json.loads(tool_call.function.arguments)
+
+            # Call the tool and get response
+            B = function_args.get("B")
+            result = economic_dispatch(
+                alpha=function_args["alpha"],
+                beta=function_args["beta"],
+                p_min=function_args["p_min"],
+                p_max=function_args["p_max"],
+                demand=function_args["demands"],
+                B=np.array(B, dtype=float) if B else None,
+            )
+
+            # Format the response as a string
+            response_str = json.dumps(result.as_rows(), indent=2)
+
+            # Add tool response to conversation
+            messages.append(
+                {
+                    "tool_call_id": tool_call.id,
+                    "role": "tool",
+                    "name": function_name,
+                    "content": response_str,
+                }
+            )
+
+        # Make second API call with updated conversation
+        second_response = client.chat.completions.create(
+            model=MODEL,
+            messages=messages
+        )
+
+        # Return final response
+        return second_response.choices[0].message.content
+    else:
+        return response_message.content
+
+
+def run_dispatch_agent(user_prompt):
+    """
+    Wrapper function for orchestrator compatibility
+    """
+    return run_conversation(user_prompt)
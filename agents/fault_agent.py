@@ -2,7 +2,10 @@ import numpy as np
 import json
 from groq import Groq
 from dotenv import load_dotenv
-from fault_analysis_matlab import get_fault_analysis_matlab
+from fault_analysis import get_fault_analysis
+from short_circuit_sweep import short_circuit_sweep
+from ybus_io import load_ybus
+from network import NETWORK_FILE_SCHEMA, load_network
 import os
 
 load_dotenv()
@@ -15,7 +18,7 @@ def run_conversation(user_prompt):
     messages=[
         {
             "role": "system",
-            "content": "You are a power system fault analysis assistant. Use the get_fault_analysis_matlab function to compute post-fault conditions given the positive sequence Ybus, Zbus matrices, pre-fault voltages and fault bus location. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
+            "content": "You are a power system fault analysis assistant. Use the get_fault_analysis function to compute post-fault conditions given the positive sequence Ybus, Zbus matrices, pre-fault voltages and fault bus location. For protection studies that need fault currents at every bus for three-phase, SLG, LL and DLG faults, use the short_circuit_sweep function (pass a Ybus file path as ybus1_file instead of inlining large matrices). If the result carries a warning about the zero-sequence network, repeat it to the user. If the user gives a case file or saved network (.npz), pass its path as network_file instead of any matrix. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
         },
         {
             "role": "user",
@@ -28,7 +31,7 @@ def run_conversation(user_prompt):
         {
             "type": "function",
             "function": {
-                "name": "get_fault_analysis_matlab",
+                "name": "get_fault_analysis",
                 "description": "Calculate post-fault voltages and currents for a three-phase bolted fault",
                 "parameters": {
                     "type": "object",
@@ -52,6 +55,7 @@ def run_conversation(user_prompt):
                                 }
                             }
                         },
+                        "network_file": NETWORK_FILE_SCHEMA,
                         "is_zbus": {
                             "type": "boolean",
                             "description": "True if bus_matrix is Zbus, False if it is Ybus"
@@ -74,10 +78,82 @@ def run_conversation(user_prompt):
                         },
                         "fault_bus_py": {
                             "type": "integer",
-                            "description": "The 0-based index of the bus where the fault occurs"
+                            "description": "The 0-based index of the bus where the fault occurs (with network_file: the bus number of the file)"
                         }
                     },
-                    "required": ["bus_matrix_np", "is_zbus", "v_pre_np", "fault_bus_py"]
+                    "required": ["is_zbus", "v_pre_np", "fault_bus_py"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "short_circuit_sweep",
+                "description": "Calculate fault current and worst post-fault voltage at every bus for three-phase, SLG, LL and DLG faults",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "ybus1_np": {
+                            "type": "array",
+                            "description": "The positive sequence Ybus (including generator admittances) as a list of lists of objects with real and imag parts",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "real": {
+                                            "type": "number"
+                                        },
+                                        "imag": {
+                                            "type": "number"
+                                        }
+                                    },
+                                    "required": ["real", "imag"]
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA,
+                        "ybus1_file": {
+                            "type": "string",
+                            "description": "Path to the positive sequence Ybus file (MATLAB complex CSV, .mat or Ybus store) to use instead of ybus1_np"
+                        },
+                        "ybus0_np": {
+                            "type": "array",
+                            "description": "Optional zero sequence Ybus as a list of lists of objects with real and imag parts (without it Z0 is assumed equal to Z1 and the SLG/DLG results are flagged as indicative)",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "real": {
+                                            "type": "number"
+                                        },
+                                        "imag": {
+                                            "type": "number"
+                                        }
+                                    },
+                                    "required": ["real", "imag"]
+                                }
+                            }
+                        },
+                        "v_pre_np": {
+                            "type": "array",
+                            "description": "The pre-fault voltage vector as a list of objects with real and imag parts (default 1.0 pu at all buses)",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "real": {
+                                        "type": "number"
+                                    },
+                                    "imag": {
+                                        "type": "number"
+                                    }
+                                },
+                                "required": ["real", "imag"]
+                            }
+                        }
+                    },
+                    "required": []
                 }
             }
         }
@@ -110,7 +186,8 @@ def run_conversation(user_prompt):
 
         # Define available tools
         available_functions = {
-            "get_fault_analysis_matlab": get_fault_analysis_matlab,
+            "get_fault_analysis": get_fault_analysis,
+            "short_circuit_sweep": short_circuit_sweep,
         }
 
         # Add the LLM's response to conversation
@@ -122,27 +199,66 @@ def run_conversation(user_prompt):
             function_to_call = available_functions[function_name]
             function_args = json.loads(tool_call.function.arguments)
             
-            # Parse arguments
-            bus_matrix_parsed = parse_matrix(function_args.get("bus_matrix_np"))
-            is_zbus = function_args.get("is_zbus")
-            v_pre_parsed = parse_vector(function_args.get("v_pre_np"))
-            fault_bus = function_args.get("fault_bus_py")
-
-            # Call the tool and get response
-            v_post, i_fault, i_post_inject = function_to_call(
-                bus_matrix_np=bus_matrix_parsed,
-                is_zbus=is_zbus,
-                v_pre_np=v_pre_parsed,
-                fault_bus_py=fault_bus
-            )
+            if function_name == "short_circuit_sweep":
+                # Parse arguments
+                ybus0 = function_args.get("ybus0_np")
+                v_pre = function_args.get("v_pre_np")
+                ybus1_file = function_args.get("ybus1_file")
+                network_file = function_args.get("network_file")
+                if network_file:
+                    y1 = load_network(network_file)
+                elif ybus1_file:
+                    y1 = load_ybus(ybus1_file)
+                else:
+                    y1 = parse_matrix(function_args.get("ybus1_np"))
 
-            # Format the response as a string
-            response_str = (
-                f"Post-fault analysis results:\n"
-                f"1. Post-fault voltages (pu): {v_post}\n"
-                f"2. Fault current (pu): {i_fault}\n"
-                f"3. Post-fault current injections (pu): {i_post_inject}"
-            )
+                # Call the tool and get response
+                table = function_to_call(
+                    y1=y1,
+                    y0=parse_matrix(ybus0) if ybus0 else None,
+                    v_pre=parse_vector(v_pre) if v_pre else None
+                )
+
+                result = table.as_dict()
+                if network_file:
+                    for row in result["buses"]:
+                        row["bus"] = int(y1.bus_ids[row["bus"] - 1])
+
+                # Format the response as a string
+                response_str = json.dumps(result, indent=2)
+            else:
+                # Parse arguments
+                network_file = function_args.get("network_file")
+                if network_file:
+                    bus_matrix_parsed = load_network(network_file)
+                else:
+                    bus_matrix_parsed = parse_matrix(function_args.get("bus_matrix_np"))
+                is_zbus = function_args.get("is_zbus") and not network_file
+                v_pre_parsed = parse_vector(function_args.get("v_pre_np"))
+                fault_bus = function_args.get("fault_bus_py")
+                if network_file:
+                    fault_bus = bus_matrix_parsed.positions(fault_bus)
+
+                # Call the tool and get response
+                v_post, i_fault, i_post_inject = function_to_call(
+                    bus_matrix_np=bus_matrix_parsed,
+                    is_zbus=is_zbus,
+                    v_pre_np=v_pre_parsed,
+                    fault_bus_py=fault_bus
+                )
+
+                if network_file:
+                    # Report per bus with the file's bus numbers
+                    v_post = dict(zip(bus_matrix_parsed.bus_ids.tolist(), v_post))
+                    i_post_inject = dict(zip(bus_matrix_parsed.bus_ids.tolist(), i_post_inject))
+
+                # Format the response as a string
+                response_str = (
+                    f"Post-fault analysis results:\n"
+                    f"1. Post-fault voltages (pu): {v_post}\n"
+                    f"2. Fault current (pu): {i_fault}\n"
+                    f"3. Post-fault current injections (pu): {i_post_inject}"
+                )
 
             # Add tool response to conversation
             messages.append(
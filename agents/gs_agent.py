@@ -4,6 +4,21 @@ import json
 from groq import Groq
 from dotenv import load_dotenv
 import os
+import hashlib
+import tempfile
+import scipy.sparse as sp
+from bus_ordering import OrderedLU, get_ordering
+from factor_cache import fingerprint, get_cache
+from newton_raphson import newton_raphson_loadflow
+from continuation_power_flow import continuation_power_flow
+from islands import solve_islands, ybus_islands
+from network import as_ybus, load_network
+from ybus_io import load_ybus
+from radial_sweep import backward_forward_sweep
+from time_series import time_series_loadflow
+from probabilistic_load_flow import probabilistic_load_flow
+from state_estimation import read_measurements, wls_state_estimation
+from ybus_builder import branch_stamps
 
 load_dotenv()
 
@@ -17,7 +32,7 @@ def gauss_seidel_loadflow(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
 
     Parameters
     ----------
-    Ybus : (n,n) complex ndarray
+    Ybus : (n,n) complex ndarray or Network
         Bus admittance matrix
     bus_type : list or array of int
         1 = PQ bus, 2 = PV bus, 0 = Slack
@@ -42,6 +57,7 @@ def gauss_seidel_loadflow(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
         Final calculated reactive powers
     """
 
+    Ybus = as_ybus(Ybus, dense=True)
     n_bus = len(Ybus)
     V = np.array(V_init, dtype=complex)
     V_mag = np.abs(V)
@@ -105,12 +121,442 @@ def gauss_seidel_loadflow(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
 
     return V
 
+
+def _fdlf_matrices(Ybus, method):
+    """
+    Build the fast-decoupled B' and B'' matrices from Ybus.
+
+    The series admittance of each branch is taken from the off-diagonal
+    entries (y_ij = -Y_ij). For the XB scheme B' ignores branch resistance
+    and shunts while B'' is -imag(Ybus); the BX scheme swaps the roles.
+    """
+    n = Ybus.shape[0]
+    # Only stored nonzeros are branches; an explicit 0 would divide by zero below
+    off = sp.triu(Ybus, k=1).tocsr()
+    off.eliminate_zeros()
+    off = off.tocoo()
+    y_series = -off.data
+    x_only = -1.0 / np.imag(1.0 / y_series)      # susceptance with r = 0
+    b_full = np.imag(y_series)                   # susceptance including r
+
+    def laplacian(b):
+        rows = np.r_[off.row, off.col, off.row, off.col]
+        cols = np.r_[off.col, off.row, off.row, off.col]
+        vals = np.r_[b, b, -b, -b]
+        return sp.csr_matrix((vals, (rows, cols)), shape=(n, n))
+
+    b_ybus = -Ybus.imag.tocsr()
+    if method == "bx":
+        return laplacian(b_full), b_ybus - laplacian(b_full) + laplacian(x_only)
+    return laplacian(x_only), b_ybus
+
+
+def _fdlf_factors(Ybus, fp, pvpq, pq, method):
+    """
+    Return sparse LU factors of B'(pvpq, pvpq) and B''(pq, pq), kept in the
+    shared factor cache per network fingerprint and bus-type pattern. Both are
+    factored in the network's minimum degree bus order (see bus_ordering).
+    """
+    pattern = hashlib.sha1()
+    for arr in (pvpq, pq):
+        pattern.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+
+    def compute():
+        Bp, Bpp = _fdlf_matrices(Ybus, method)
+        position = get_ordering(Ybus).position
+        return (
+            OrderedLU(Bp[pvpq][:, pvpq], np.argsort(position[pvpq])),
+            OrderedLU(Bpp[pq][:, pq], np.argsort(position[pq])) if len(pq) else None,
+        )
+
+    return get_cache().get_or_compute(fp, "fdlf", compute, key=(pattern.hexdigest(), method))
+
+
+def fast_decoupled_loadflow(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
+                            V_init=None, tol=1e-6, max_iter=100, method="xb"):
+    """
+    Fast-decoupled load flow supporting PV and PQ buses.
+
+    Same interface and bus conventions as gauss_seidel_loadflow (bus 0 is the
+    slack, bus_type 2 marks PV buses). B' and B'' are factored once per network
+    and kept in the shared factor cache, so they are reused across iterations
+    and across repeated solves of the same Ybus.
+
+    Parameters
+    ----------
+    Ybus : (n,n) complex ndarray, scipy sparse matrix or Network
+        Bus admittance matrix
+    bus_type : list or array of int
+        2 = PV bus, anything else = PQ (bus 0 is the slack)
+    p_spec, q_spec : array_like
+        Specified active and reactive powers (in p.u.)
+    q_min, q_max : array_like
+        Minimum and maximum reactive power limits for PV buses
+    V_init : array_like (complex)
+        Initial voltage guesses (flat start if None or empty)
+    tol : float
+        Convergence tolerance on the largest power mismatch (p.u.)
+    max_iter : int
+        Maximum number of P-Q half-iteration pairs
+    method : str
+        "xb" (default) or "bx" fast-decoupled scheme
+
+    Returns
+    -------
+    V : (n,) complex ndarray
+        Final bus voltages
+    """
+    Ybus = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    Ybus.sum_duplicates()
+    fp = fingerprint(Ybus)
+    n_bus = Ybus.shape[0]
+    bus_type = np.asarray(bus_type)
+    p_spec = np.asarray(p_spec, dtype=float)
+    q_spec = np.array(q_spec, dtype=float)
+    if V_init is None or len(V_init) == 0:
+        V = np.ones(n_bus, dtype=complex)
+    else:
+        V = np.array(V_init, dtype=complex)
+
+    if q_min is None or len(q_min) == 0:
+        q_min = np.full(n_bus, -np.inf)
+    else:
+        q_min = np.array(q_min, dtype=float)
+
+    if q_max is None or len(q_max) == 0:
+        q_max = np.full(n_bus, np.inf)
+    else:
+        q_max = np.array(q_max, dtype=float)
+
+    is_pv = bus_type == 2
+    is_pv[0] = False
+
+    for _ in range(n_bus):
+        pv = np.flatnonzero(is_pv)
+        pq = np.flatnonzero(~is_pv)
+        pq = pq[pq != 0]
+        pvpq = np.r_[pv, pq]
+        lu_p, lu_pp = _fdlf_factors(Ybus, fp, pvpq, pq, method)
+
+        S_spec = p_spec + 1j * q_spec
+        Va = np.angle(V)
+        Vm = np.abs(V)
+        converged = False
+
+        for k in range(max_iter):
+            mis = (V * np.conj(Ybus @ V) - S_spec) / Vm
+            P = mis[pvpq].real
+            Q = mis[pq].imag
+            if max(np.max(np.abs(P), initial=0), np.max(np.abs(Q), initial=0)) < tol:
+                converged = True
+                break
+
+            # P-theta half iteration
+            Va[pvpq] -= lu_p.solve(P)
+            V = Vm * np.exp(1j * Va)
+
+            # Q-V half iteration
+            if lu_pp is not None:
+                mis = (V * np.conj(Ybus @ V) - S_spec) / Vm
+                Vm[pq] -= lu_pp.solve(mis[pq].imag)
+                V = Vm * np.exp(1j * Va)
+
+        if not converged:
+            break
+
+        q_calc = (V * np.conj(Ybus @ V)).imag
+        over = is_pv & (q_calc > q_max)
+        under = is_pv & (q_calc < q_min)
+        if not (over.any() or under.any()):
+            break
+
+        q_spec[over] = q_max[over]
+        q_spec[under] = q_min[under]
+        is_pv &= ~(over | under)
+
+    if converged:
+        get_cache().put(fp, "voltage", V)
+
+    return V
+
+
+# Shared argument schema of the load flow tools
+_LOADFLOW_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "Ybus": {
+            "type": "array",
+            "description": "The bus admittance matrix Ybus as a list of lists, each element being an object with real and imag parts. Give either Ybus or Ybus_file.",
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "real": {"type": "number"},
+                        "imag": {"type": "number"}
+                    },
+                    "required": ["real", "imag"]
+                }
+            }
+        },
+        "Ybus_file": {
+            "type": "string",
+            "description": "Path to a Ybus file (MATLAB complex CSV, .mat or Ybus store) to use instead of inlining Ybus."
+        },
+        "bus_type": {
+            "type": "array",
+            "description": "Bus types for each bus (1 = Slack, 2 = PV, 3 = PQ).",
+            "items": {"type": "integer"}
+        },
+        "p_spec": {
+            "type": "array",
+            "description": "Specified active power injections (P_spec) in per unit for each bus.",
+            "items": {"type": "number"}
+        },
+        "q_spec": {
+            "type": "array",
+            "description": "Specified reactive power injections (Q_spec) in per unit for each bus.",
+            "items": {"type": "number"}
+        },
+        "q_min": {
+            "type": "array",
+            "description": "Minimum reactive power limits for PV buses.",
+            "items": {"type": "number"}
+        },
+        "q_max": {
+            "type": "array",
+            "description": "Maximum reactive power limits for PV buses.",
+            "items": {"type": "number"}
+        },
+        "V_init": {
+            "type": "array",
+            "description": "Initial complex bus voltage guesses as list of objects with real and imag parts.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "real": {"type": "number"},
+                    "imag": {"type": "number"}
+                },
+                "required": ["real", "imag"]
+            }
+        },
+        "tol": {
+            "type": "number",
+            "description": "Tolerance for convergence of the iterative method (default 1e-6)."
+        },
+        "max_iter": {
+            "type": "integer",
+            "description": "Maximum number of iterations to perform (default 100)."
+        }
+    },
+    "required": ["bus_type", "p_spec", "q_spec", "V_init"]
+}
+
+# PV curve tracing takes the base case plus a load growth direction
+_CPF_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        **{k: v for k, v in _LOADFLOW_PARAMETERS["properties"].items()
+           if k in ("Ybus", "Ybus_file", "bus_type", "p_spec", "q_spec", "V_init", "tol")},
+        "p_dir": {
+            "type": "array",
+            "description": "Active power injection growth per unit of lambda for each bus (defaults to the base case injections).",
+            "items": {"type": "number"}
+        },
+        "q_dir": {
+            "type": "array",
+            "description": "Reactive power injection growth per unit of lambda for each bus (defaults to the base case injections).",
+            "items": {"type": "number"}
+        },
+        "stop_at_nose": {
+            "type": "boolean",
+            "description": "Stop at the nose point instead of tracing the lower half of the PV curve (default false)."
+        }
+    },
+    "required": ["bus_type", "p_spec", "q_spec"]
+}
+
+# Monte Carlo studies take the base case plus the uncertain injections
+_PLF_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        **{k: v for k, v in _LOADFLOW_PARAMETERS["properties"].items()
+           if k in ("Ybus", "Ybus_file", "bus_type", "p_spec", "q_spec", "V_init")},
+        "uncertainties": {
+            "type": "array",
+            "description": "Uncertain injections, each added to the base-case injection of its bus (generation positive).",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "bus": {"type": "integer", "description": "Bus number (1-based, not the slack)."},
+                    "distribution": {
+                        "type": "string",
+                        "enum": ["normal", "uniform", "beta", "weibull"],
+                        "description": "normal (mean, std) for load uncertainty, uniform (low, high), beta (a, b, scale) for solar output, weibull (shape, scale = wind speed in m/s, p_rated) for wind farms."
+                    },
+                    "mean": {"type": "number"},
+                    "std": {"type": "number"},
+                    "low": {"type": "number"},
+                    "high": {"type": "number"},
+                    "a": {"type": "number"},
+                    "b": {"type": "number"},
+                    "scale": {"type": "number"},
+                    "shape": {"type": "number"},
+                    "p_rated": {"type": "number"},
+                    "power_factor": {"type": "number", "description": "Reactive power follows the active power at this power factor (default 1)."}
+                },
+                "required": ["bus", "distribution"]
+            }
+        },
+        "n_samples": {
+            "type": "integer",
+            "description": "Number of Monte Carlo samples (default 10000)."
+        },
+        "v_min": {
+            "type": "number",
+            "description": "Lower voltage limit in pu (default 0.95)."
+        },
+        "v_max": {
+            "type": "number",
+            "description": "Upper voltage limit in pu (default 1.05)."
+        }
+    },
+    "required": ["bus_type", "p_spec", "q_spec", "uncertainties"]
+}
+
+_SE_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        **{k: v for k, v in _LOADFLOW_PARAMETERS["properties"].items()
+           if k in ("Ybus", "Ybus_file", "V_init")},
+        "measurements": {
+            "type": "array",
+            "description": "Telemetered measurements in pu (angles in radians).",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {
+                        "type": "string",
+                        "enum": ["vm", "va", "p", "q", "pf", "qf"],
+                        "description": "vm / va: bus voltage magnitude / angle, p / q: bus injection (generation positive), pf / qf: power flow from bus to to_bus."
+                    },
+                    "bus": {"type": "integer", "description": "Bus number (1-based)."},
+                    "to_bus": {"type": "integer", "description": "Far end bus of a pf / qf flow measurement (1-based)."},
+                    "value": {"type": "number"},
+                    "sigma": {"type": "number", "description": "Standard deviation of the meter."}
+                },
+                "required": ["type", "bus", "value", "sigma"]
+            }
+        },
+        "measurements_file": {
+            "type": "string",
+            "description": "Path to a measurement CSV with columns type, bus, to_bus, value, sigma (instead of measurements)."
+        },
+        "line_data": {
+            "type": "array",
+            "description": "Optional branch data, rows of [from_bus, to_bus, R, X, a, shunt], so that flow measurements include line charging and taps.",
+            "items": {"type": "array", "items": {"type": "number"}}
+        }
+    },
+    "required": []
+}
+
+
+def solve_case_file(case_file, method="newton_raphson", tol=1e-6, max_iter=100):
+    """
+    Load flow of a MATPOWER / IEEE CDF case file, read straight from disk.
+
+    Returns:
+        Dict with the voltage of every bus (case file numbering), the total
+        loss and the island report, e.g. for JSON tool output
+    """
+    solvers = {
+        "gauss_seidel": gauss_seidel_loadflow,
+        "newton_raphson": newton_raphson_loadflow,
+        "fast_decoupled": fast_decoupled_loadflow,
+        "backward_forward": backward_forward_sweep,
+    }
+    network = load_network(case_file)
+    inputs = network.loadflow_inputs()
+    Ybus = inputs["Ybus"]
+    if solvers[method] is gauss_seidel_loadflow:
+        inputs["Ybus"] = Ybus.toarray()
+    islands = solve_islands(**inputs, tol=tol, max_iter=max_iter, solver=solvers[method])
+    V = islands.V
+    S = V * np.conj(Ybus @ V)
+    return {
+        "case": network.summary(),
+        "converged": islands.converged,
+        "voltages": [
+            {"bus": int(b), "magnitude": float(abs(v)), "angle_deg": float(np.degrees(np.angle(v)))}
+            for b, v in zip(network.bus_ids, V)
+        ],
+        "Total_System_Loss": float(S.real.sum()),
+        "Islands": islands.as_rows() if len(islands.islands) > 1 else None,
+    }
+
+
+def time_series_case_file(case_file, profile_file, method="newton_raphson", tol=1e-6,
+                          out_dir=None):
+    """
+    Quasi-static time-series load flow of a case file over a load profile CSV.
+
+    Profile P<bus> / Q<bus> columns use the case file bus numbers and MW /
+    MVAr; a scale column multiplies the Pd / Qd loads of the case file and
+    leaves its generation as it is. The bus voltage limits come from the
+    case file.
+
+    Returns:
+        Dict with the study summary and the output directory, e.g. for JSON
+        tool output
+    """
+    solvers = {
+        "newton_raphson": newton_raphson_loadflow,
+        "fast_decoupled": fast_decoupled_loadflow,
+        "backward_forward": backward_forward_sweep,
+    }
+    network = load_network(case_file)
+    if out_dir is None:
+        out_dir = tempfile.mkdtemp(prefix="qsts_")
+    result = time_series_loadflow(
+        **network.loadflow_inputs(), profile_csv=profile_file, out_dir=out_dir,
+        v_min=network.bus.vmin, v_max=network.bus.vmax, bus_ids=network.bus_ids,
+        base_mva=network.base_mva, p_load=network.bus.pd / network.base_mva,
+        q_load=network.bus.qd / network.base_mva, tol=tol, solver=solvers[method]
+    )
+    return {"case": network.summary(), **result.as_dict()}
+
+
+def estimate_case_file(case_file, measurements_file):
+    """
+    Weighted least squares state estimate of a case file network from a
+    measurement CSV (bus numbers of the case file, values in pu).
+
+    Returns:
+        Dict with the estimated voltage of every bus (case file numbering),
+        the chi-square test and the bad data removed, e.g. for JSON tool output
+    """
+    network = load_network(case_file)
+    position = {int(b): i + 1 for i, b in enumerate(network.bus_ids)}
+    measurements = read_measurements(measurements_file)
+    measurements.bus[:] = [position[int(b) + 1] - 1 for b in measurements.bus]
+    flows = measurements.to_bus >= 0
+    measurements.to_bus[flows] = [position[int(b) + 1] - 1 for b in measurements.to_bus[flows]]
+    estimate = wls_state_estimation(network, measurements, V_init=network.loadflow_inputs()["V_init"])
+    result = estimate.as_dict()
+    for row in result["voltages"] + result["bad_data"]:
+        for key in ("bus", "to_bus"):
+            if row.get(key) is not None:
+                row[key] = int(network.bus_ids[row[key] - 1])
+    return {"case": network.summary(), **result}
+
+
 def run_conversation(user_prompt):
     # Initialize the conversation with system and user messages
     messages=[
         {
             "role": "system",
-            "content": "You are a power flow assistant. Use the gauss_seidel function to compute bus voltages given the Ybus matrix and power injections P. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt (exectly like this)"
+            "content": "You are a power flow assistant. Use the gauss_seidel_loadflow function (or newton_raphson_loadflow / fast_decoupled_loadflow for larger systems) to compute bus voltages given the Ybus matrix and power injections P. Use backward_forward_sweep for radial distribution feeders (it falls back to Newton-Raphson when the network has loops). Use continuation_power_flow for PV curves, voltage stability and loadability margins. Use probabilistic_load_flow for voltage violation probabilities under uncertain loads and renewables. Use state_estimation to estimate bus voltages from noisy telemetry and detect bad measurements. If the user gives a case file path (or a saved network .npz), call solve_case_file with it instead of copying data out of the file; if a CSV file is given with it, call time_series_case_file when it is a load profile (time column, scale or P<bus>/Q<bus> columns) and estimate_case_file when it is a measurement table (type, bus, to_bus, value, sigma columns). If the user gives a Ybus file (.csv, .mat or Ybus store), pass its path as Ybus_file instead of Ybus. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt (exectly like this)"
         },
         {
             "role": "user",
@@ -124,71 +570,127 @@ def run_conversation(user_prompt):
             "function": {
                 "name": "gauss_seidel_loadflow",
                 "description": "Solve for bus voltages using the Gauss-Seidel Load Flow method including PV and PQ bus handling with Q-limits.",
+                "parameters": _LOADFLOW_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "newton_raphson_loadflow",
+                "description": "Solve for bus voltages using the sparse Newton-Raphson Load Flow method including PV and PQ bus handling with Q-limits. Converges in a few iterations; prefer it for larger systems.",
+                "parameters": _LOADFLOW_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "fast_decoupled_loadflow",
+                "description": "Solve for bus voltages using the fast-decoupled (XB) Load Flow method including PV and PQ bus handling with Q-limits. Cheapest per iteration; best for transmission networks with high X/R ratios.",
+                "parameters": _LOADFLOW_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "backward_forward_sweep",
+                "description": "Solve for bus voltages of a radial distribution feeder with the backward/forward sweep method including PV and PQ bus handling with Q-limits. Unaffected by high R/X ratios; meshed networks are solved with Newton-Raphson instead.",
+                "parameters": _LOADFLOW_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "continuation_power_flow",
+                "description": "Trace the PV (nose) curve with a predictor-corrector continuation power flow while the injections grow along a direction. Returns the loadability margin (maximum lambda), the critical bus and the voltage profile along the curve.",
+                "parameters": _CPF_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "probabilistic_load_flow",
+                "description": "Monte Carlo probabilistic load flow: samples uncertain load and renewable injections and returns, per bus, the mean, standard deviation and quantiles of the voltage magnitude and the probability of a voltage limit violation.",
+                "parameters": _PLF_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "state_estimation",
+                "description": "Weighted least squares state estimation: estimates all bus voltages from redundant voltage, injection and flow measurements, and removes bad data with the largest normalized residual test.",
+                "parameters": _SE_PARAMETERS
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "solve_case_file",
+                "description": "Solve the load flow of a MATPOWER (.m) or IEEE Common Data Format case file read directly from disk. Use it whenever the user gives a case file path instead of the data itself.",
                 "parameters": {
                     "type": "object",
                     "properties": {
-                        "Ybus": {
-                            "type": "array",
-                            "description": "The bus admittance matrix Ybus as a list of lists, each element being an object with real and imag parts.",
-                            "items": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "real": {"type": "number"},
-                                        "imag": {"type": "number"}
-                                    },
-                                    "required": ["real", "imag"]
-                                }
-                            }
-                        },
-                        "bus_type": {
-                            "type": "array",
-                            "description": "Bus types for each bus (1 = Slack, 2 = PV, 3 = PQ).",
-                            "items": {"type": "integer"}
+                        "case_file": {
+                            "type": "string",
+                            "description": "Path of the case file exactly as given by the user."
                         },
-                        "p_spec": {
-                            "type": "array",
-                            "description": "Specified active power injections (P_spec) in per unit for each bus.",
-                            "items": {"type": "number"}
-                        },
-                        "q_spec": {
-                            "type": "array",
-                            "description": "Specified reactive power injections (Q_spec) in per unit for each bus.",
-                            "items": {"type": "number"}
-                        },
-                        "q_min": {
-                            "type": "array",
-                            "description": "Minimum reactive power limits for PV buses.",
-                            "items": {"type": "number"}
-                        },
-                        "q_max": {
-                            "type": "array",
-                            "description": "Maximum reactive power limits for PV buses.",
-                            "items": {"type": "number"}
-                        },
-                        "V_init": {
-                            "type": "array",
-                            "description": "Initial complex bus voltage guesses as list of objects with real and imag parts.",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "real": {"type": "number"},
-                                    "imag": {"type": "number"}
-                                },
-                                "required": ["real", "imag"]
-                            }
+                        "method": {
+                            "type": "string",
+                            "enum": ["newton_raphson", "fast_decoupled", "gauss_seidel", "backward_forward"],
+                            "description": "Load flow method (default newton_raphson)."
                         },
                         "tol": {
                             "type": "number",
-                            "description": "Tolerance for convergence of the iterative method (default 1e-6)."
+                            "description": "Tolerance for convergence (default 1e-6)."
+                        }
+                    },
+                    "required": ["case_file"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "time_series_case_file",
+                "description": "Quasi-static time-series load flow of a case file over a load profile CSV (e.g. 8760 hourly rows). The first CSV column is the time label; a 'scale' column multiplies all loads and P<bus>/Q<bus> columns give bus loads in MW/MVAr. Returns losses, the lowest voltage and limit violations over the horizon.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "case_file": {
+                            "type": "string",
+                            "description": "Path of the case file exactly as given by the user."
+                        },
+                        "profile_file": {
+                            "type": "string",
+                            "description": "Path of the load profile CSV exactly as given by the user."
+                        },
+                        "method": {
+                            "type": "string",
+                            "enum": ["newton_raphson", "fast_decoupled", "backward_forward"],
+                            "description": "Load flow method for every timestep (default newton_raphson)."
+                        }
+                    },
+                    "required": ["case_file", "profile_file"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "estimate_case_file",
+                "description": "State estimation of a case file network from a measurement CSV (columns type, bus, to_bus, value, sigma with the case file bus numbers). Returns the estimated voltages and any bad data removed.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "case_file": {
+                            "type": "string",
+                            "description": "Path of the case file exactly as given by the user."
                         },
-                        "max_iter": {
-                            "type": "integer",
-                            "description": "Maximum number of iterations to perform (default 100)."
+                        "measurements_file": {
+                            "type": "string",
+                            "description": "Path of the measurement CSV exactly as given by the user."
                         }
                     },
-                    "required": ["Ybus", "bus_type", "p_spec", "q_spec", "V_init"]
+                    "required": ["case_file", "measurements_file"]
                 }
             }
         }
@@ -222,6 +724,15 @@ def run_conversation(user_prompt):
         # Define the available tools that can be called by the LLM
         available_functions = {
             "gauss_seidel_loadflow": gauss_seidel_loadflow,
+            "newton_raphson_loadflow": newton_raphson_loadflow,
+            "fast_decoupled_loadflow": fast_decoupled_loadflow,
+            "backward_forward_sweep": backward_forward_sweep,
+            "continuation_power_flow": continuation_power_flow,
+            "probabilistic_load_flow": probabilistic_load_flow,
+            "solve_case_file": solve_case_file,
+            "time_series_case_file": time_series_case_file,
+            "state_estimation": wls_state_estimation,
+            "estimate_case_file": estimate_case_file,
         }
         # Add the LLM's response to the conversation
         messages.append(response_message)
@@ -232,8 +743,36 @@ def run_conversation(user_prompt):
             function_to_call = available_functions[function_name]
             function_args = json.loads(tool_call.function.arguments)
             print("Here are the values of the variables: ",function_args)
+            if function_name in ("solve_case_file", "time_series_case_file", "estimate_case_file"):
+                messages.append(
+                    {
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps(function_to_call(**function_args), indent=2),
+                    }
+                )
+                continue
             # --- Parse arguments ---
-            Ybus_parsed = parse_matrix(function_args.get("Ybus"))
+            if bool(function_args.get("Ybus")) == bool(function_args.get("Ybus_file")):
+                # Neither or both given: report it so the model can correct its call
+                messages.append(
+                    {
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps({"error": "Pass exactly one of Ybus (inline matrix) "
+                                                        "or Ybus_file (path of a Ybus file)."}),
+                    }
+                )
+                continue
+            if function_args.get("Ybus_file"):
+                # Large networks are referenced by file instead of inlined
+                Ybus_parsed = load_ybus(function_args["Ybus_file"])
+                if sp.issparse(Ybus_parsed) and function_to_call is gauss_seidel_loadflow:
+                    Ybus_parsed = Ybus_parsed.toarray()
+            else:
+                Ybus_parsed = parse_matrix(function_args.get("Ybus"))
             bus_type = np.array(function_args.get("bus_type", []))
             p_spec = np.array(function_args.get("p_spec", []), dtype=float)
             q_spec = np.array(function_args.get("q_spec", []), dtype=float)
@@ -243,21 +782,97 @@ def run_conversation(user_prompt):
             tol = function_args.get("tol", 1e-4)
             max_iter = function_args.get("max_iter", 100)
 
-            # --- Call the load flow solver (returns complex bus voltages) ---
-            function_response = function_to_call(
-                Ybus=Ybus_parsed,
-                bus_type=bus_type,
-                p_spec=p_spec,
-                q_spec=q_spec,
-                q_min=q_min,
-                q_max=q_max,
-                V_init=V_init_parsed,
-                tol=tol,
-                max_iter=max_iter
-            )
+            if function_name == "continuation_power_flow":
+                p_dir = function_args.get("p_dir")
+                q_dir = function_args.get("q_dir")
+                curve = function_to_call(
+                    Ybus=Ybus_parsed,
+                    bus_type=bus_type,
+                    p_spec=p_spec,
+                    q_spec=q_spec,
+                    p_dir=None if p_dir is None else np.array(p_dir, dtype=float),
+                    q_dir=None if q_dir is None else np.array(q_dir, dtype=float),
+                    V_init=V_init_parsed,
+                    tol=min(tol, 1e-6),
+                    stop_at_nose=function_args.get("stop_at_nose", False)
+                )
+                messages.append(
+                    {
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps(curve.as_dict(), indent=2),
+                    }
+                )
+                continue
+
+            if function_name == "state_estimation":
+                line_data = function_args.get("line_data")
+                branches = None
+                if line_data:
+                    branches = branch_stamps(line_data)
+                estimate = function_to_call(
+                    Ybus=Ybus_parsed,
+                    measurements=function_args.get("measurements_file") or function_args.get("measurements", []),
+                    branches=branches,
+                    V_init=V_init_parsed
+                )
+                messages.append(
+                    {
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps(estimate.as_dict(), indent=2),
+                    }
+                )
+                continue
+
+            if function_name == "probabilistic_load_flow":
+                result = function_to_call(
+                    Ybus=Ybus_parsed,
+                    bus_type=bus_type,
+                    p_spec=p_spec,
+                    q_spec=q_spec,
+                    uncertainties=function_args.get("uncertainties", []),
+                    V_init=V_init_parsed,
+                    n_samples=function_args.get("n_samples", 10000),
+                    v_min=function_args.get("v_min", 0.95),
+                    v_max=function_args.get("v_max", 1.05)
+                )
+                messages.append(
+                    {
+                        "tool_call_id": tool_call.id,
+                        "role": "tool",
+                        "name": function_name,
+                        "content": json.dumps(result.as_dict(), indent=2),
+                    }
+                )
+                continue
+
+            # --- Call the selected load flow solver (returns complex bus voltages) ---
+            islands = None
+            if ybus_islands(Ybus_parsed).max() > 0:
+                # Split network: solve each live island with its own slack
+                islands = solve_islands(
+                    Ybus_parsed, bus_type, p_spec, q_spec, q_min, q_max,
+                    V_init=V_init_parsed, tol=tol, max_iter=max_iter, solver=function_to_call
+                )
+                function_response = islands.V
+            else:
+                function_response = function_to_call(
+                    Ybus=Ybus_parsed,
+                    bus_type=bus_type,
+                    p_spec=p_spec,
+                    q_spec=q_spec,
+                    q_min=q_min,
+                    q_max=q_max,
+                    V_init=V_init_parsed,
+                    tol=tol,
+                    max_iter=max_iter
+                )
 
             # --- Post-processing: compute current & power injections ---
-            I = np.dot(Ybus_parsed, function_response)
+            I = Ybus_parsed @ function_response
             S = function_response * np.conj(I)  # Complex power injection at each bus
             total_loss = np.sum(np.real(S))     # Total real power loss (MW if base=1 pu)
 
@@ -267,6 +882,8 @@ def run_conversation(user_prompt):
                 "Power_Injections": np.array2string(S, precision=4, suppress_small=True),
                 "Total_System_Loss": float(total_loss)
             }
+            if islands is not None:
+                tool_output["Islands"] = islands.as_rows()
 
             # --- Add to conversation messages ---
             messages.append(
@@ -2,7 +2,8 @@ import numpy as np
 import json
 from groq import Groq
 from dotenv import load_dotenv
-from loss_after_new_load import get_total_loss_matlab
+from loss_after_new_load import study_new_load, sweep_new_load
+from network import NETWORK_FILE_SCHEMA, load_network
 import os
 
 load_dotenv()
@@ -10,12 +11,18 @@ load_dotenv()
 client = Groq()
 MODEL = "openai/gpt-oss-120b"
 
+_BUS_TYPE = {
+    "type": "array",
+    "description": "Optional type of every bus in order (2 = PV bus keeping its voltage magnitude, 1 = PQ); bus 0 is the slack. Defaults to the network file's bus types, else all PQ",
+    "items": {"type": "integer"}
+}
+
 def run_conversation(user_prompt):
     # Initialize the conversation with system and user messages
     messages=[
         {
             "role": "system",
-            "content": "You are a power system loss calculator assistant. Use the get_total_loss_matlab function to compute total system losses given the Ybus matrix, voltage profile, new load value and bus location. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
+            "content": "You are a power system loss calculator assistant. Use the study_new_load function to compute total and per-branch system losses after adding a new load, given the Ybus matrix, the solved voltage profile, the new load value and bus location. If the user asks where a load should be placed, use the sweep_new_load function to evaluate every candidate bus at once. Pass the bus types when the user names PV (generator) buses. If the user gives a case file or saved network (.npz), pass its path as network_file instead of ybus_np. Parse the user's input into the required structured format for the tool call. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
         },
         {
             "role": "user",
@@ -28,8 +35,8 @@ def run_conversation(user_prompt):
         {
             "type": "function",
             "function": {
-                "name": "get_total_loss_matlab",
-                "description": "Calculate total system power loss after adding a new load",
+                "name": "study_new_load",
+                "description": "Add a new load at a bus, re-solve the power flow and calculate the total and per-branch system power loss",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -52,6 +59,7 @@ def run_conversation(user_prompt):
                                 }
                             }
                         },
+                        "network_file": NETWORK_FILE_SCHEMA,
                         "v_np": {
                             "type": "array",
                             "description": "The voltage vector as a list of objects with real and imag parts",
@@ -83,10 +91,79 @@ def run_conversation(user_prompt):
                         },
                         "bus_at_py": {
                             "type": "integer",
-                            "description": "The 0-based index of the bus where new load is added"
-                        }
+                            "description": "The 0-based index of the bus where new load is added (with network_file: the bus number of the file)"
+                        },
+                        "bus_type": _BUS_TYPE
                     },
-                    "required": ["ybus_np", "v_np", "new_load", "bus_at_py"]
+                    "required": ["v_np", "new_load", "bus_at_py"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "sweep_new_load",
+                "description": "Evaluate the same new load at every candidate bus in one batched power flow (shared base-case Jacobian factors) and return the sites ranked by total system loss",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "ybus_np": {
+                            "type": "array",
+                            "description": "The admittance matrix Ybus as a list of lists of objects with real and imag parts",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "real": {
+                                            "type": "number"
+                                        },
+                                        "imag": {
+                                            "type": "number"
+                                        }
+                                    },
+                                    "required": ["real", "imag"]
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA,
+                        "v_np": {
+                            "type": "array",
+                            "description": "The voltage vector as a list of objects with real and imag parts",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "real": {
+                                        "type": "number"
+                                    },
+                                    "imag": {
+                                        "type": "number"
+                                    }
+                                },
+                                "required": ["real", "imag"]
+                            }
+                        },
+                        "new_load": {
+                            "type": "object",
+                            "description": "The new load value as complex number with real and imag parts",
+                            "properties": {
+                                "real": {
+                                    "type": "number"
+                                },
+                                "imag": {
+                                    "type": "number"
+                                }
+                            },
+                            "required": ["real", "imag"]
+                        },
+                        "candidate_buses": {
+                            "type": "array",
+                            "description": "Optional 0-based indices of the candidate buses (with network_file: bus numbers of the file; default: every non-slack bus)",
+                            "items": {"type": "integer"}
+                        },
+                        "bus_type": _BUS_TYPE
+                    },
+                    "required": ["v_np", "new_load"]
                 }
             }
         }
@@ -119,7 +196,8 @@ def run_conversation(user_prompt):
 
         # Define available tools
         available_functions = {
-            "get_total_loss_matlab": get_total_loss_matlab,
+            "study_new_load": study_new_load,
+            "sweep_new_load": sweep_new_load,
         }
 
         # Add the LLM's response to conversation
@@ -132,21 +210,50 @@ def run_conversation(user_prompt):
             function_args = json.loads(tool_call.function.arguments)
             
             # Parse arguments
-            ybus_parsed = parse_matrix(function_args.get("ybus_np"))
+            network = None
+            if function_args.get("network_file"):
+                network = ybus_parsed = load_network(function_args["network_file"])
+            else:
+                ybus_parsed = parse_matrix(function_args.get("ybus_np"))
             v_parsed = parse_vector(function_args.get("v_np"))
             new_load = parse_complex_dict(function_args.get("new_load"))
-            bus_at = function_args.get("bus_at_py")
 
             # Call the tool and get response
-            function_response = function_to_call(
-                ybus_np=ybus_parsed,
-                v_np=v_parsed,
-                new_load=new_load,
-                bus_at_py=bus_at
-            )
+            if function_name == "sweep_new_load":
+                candidate_buses = function_args.get("candidate_buses")
+                if network is not None and candidate_buses is not None:
+                    candidate_buses = network.positions(candidate_buses)
+                function_response = function_to_call(
+                    ybus_np=ybus_parsed,
+                    v_np=v_parsed,
+                    new_load=new_load,
+                    candidate_buses=candidate_buses,
+                    bus_type=function_args.get("bus_type")
+                )
+                if network is not None:
+                    for row in function_response:
+                        row["bus"] = int(network.bus_ids[row["bus"] - 1])
+            else:
+                bus_at = function_args.get("bus_at_py")
+                if network is not None:
+                    bus_at = network.positions(bus_at)
+                result = function_to_call(
+                    ybus_np=ybus_parsed,
+                    v_np=v_parsed,
+                    new_load=new_load,
+                    bus_at_py=bus_at,
+                    bus_type=function_args.get("bus_type")
+                )
+                if network is not None:
+                    for row in result["branch_losses"]:
+                        for key in ("from_bus", "to_bus"):
+                            row[key] = int(network.bus_ids[row[key] - 1])
+                    result["buses"] = network.bus_ids.tolist()
+                result["voltages"] = np.array2string(result["voltages"], precision=4, suppress_small=True)
+                function_response = result
 
             # Convert response to string
-            function_response = str(function_response)
+            function_response = json.dumps(function_response, indent=2)
 
             # Add tool response to conversation
             messages.append(
@@ -7,6 +7,8 @@ from .gs_agent import run_gs_agent
 from .loss_agent import run_loss_agent
 from .fault_agent import run_fault_agent
 from .ybus_agent import run_ybus_agent
+from .stability_agent import run_stability_agent
+from .dispatch_agent import run_dispatch_agent
 
 load_dotenv()
 
@@ -20,10 +22,25 @@ def run_conversation(user_prompt):
             "role": "system",
             "content": """You are a comprehensive power system analysis assistant. You can:
             1. Calculate Ybus matrix from branch/line data (resistance, reactance, transformer ratio, shunt admittance)
-            2. Solve power flow using Gauss-Seidel method to find bus voltages
-            3. Calculate total system losses after adding new loads
-            4. Find after fault voltages and currents for 3 phase bolted faults
+            2. Solve power flow using Gauss-Seidel or Newton-Raphson method (backward/forward sweep for radial feeders) to find bus voltages
+            3. Calculate total system losses after adding new loads, or rank candidate buses for a new load by the resulting losses
+            4. Find after fault voltages and currents for 3 phase bolted faults, or sweep three-phase, SLG, LL and DLG faults over every bus
+            5. Screen N-1 branch outages (contingency analysis) from branch data and solved base-case voltages
+            6. Answer DC flow sensitivity questions (moving power between two buses, single branch outages) from branch data
+            7. Simulate multi-machine transient stability (swing curves) for a fault and its clearing time, and find critical clearing times
+            8. Solve economic dispatch of generating units, with or without B-coefficient losses
+            9. Trace PV curves (continuation power flow) to find the loadability margin and the critical bus
+            10. Reduce a large network to an equivalent Ybus between a few retained buses (Kron reduction)
+            11. Run quasi-static time-series load flows of a case file over a load profile CSV (e.g. a year of hourly loads)
+            12. Estimate voltage violation probabilities under uncertain loads and renewables (Monte Carlo probabilistic load flow)
+            13. Estimate bus voltages from noisy measurements and detect bad data (weighted least squares state estimation)
             
+            If the query names a case file (MATPOWER .m or IEEE CDF) or a saved network (.npz), pass the
+            path unchanged in the query to the Ybus, load flow, loss or fault agent; never copy data out
+            of the file yourself (the network is parsed once and shared between the agents). The same
+            holds for a load profile or measurement CSV, which goes to the load flow agent together with
+            the case file.
+
             Parse the user's input and determine which tool(s) to use. You can use multiple tools in sequence if needed.
             For example, if user provides branch data and wants power flow solution:
             - First use Ybus agent to calculate the bus admittance matrix
@@ -53,7 +70,7 @@ def run_conversation(user_prompt):
             "type": "function",
             "function": {
                 "name": "run_ybus_calculation_agent",
-                "description": "Calculate Ybus matrix from branch/line data using MATLAB. Takes branch data with from bus, to bus, resistance, reactance, transformer ratio, and shunt admittance.",
+                "description": "Calculate Ybus matrix from branch/line data. Takes branch data with from bus, to bus, resistance, reactance, transformer ratio, and shunt admittance. Also runs N-1 branch outage (contingency) screening when the branch data comes with solved base-case voltages. Also answers DC flow sensitivity questions (transfer between buses, branch outage flows) from branch data. Also builds Kron-reduced network equivalents onto a set of retained buses.",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -70,7 +87,7 @@ def run_conversation(user_prompt):
             "type": "function",
             "function": {
                 "name": "run_power_flow_agent",
-                "description": "Use Gauss-Seidel agent to solve power flow and get bus voltages",
+                "description": "Use the load flow agent (Gauss-Seidel, or sparse Newton-Raphson for larger systems) to solve power flow and get bus voltages, or trace PV curves and loadability margins with the continuation power flow",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -87,7 +104,7 @@ def run_conversation(user_prompt):
             "type": "function",
             "function": {
                 "name": "run_loss_agent",
-                "description": "Use loss calculation agent to compute system losses",
+                "description": "Use loss calculation agent to compute total and per-branch system losses after adding a load, or to rank candidate buses for a new load",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -116,6 +133,40 @@ def run_conversation(user_prompt):
                     "required": ["query"]
                 }
             }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "run_stability_agent",
+                "description": "Simulate rotor angle swings of one or more machines for a fault and its clearing time and report whether the system stays in synchronism, or find the critical clearing time",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "The query for transient stability in the format 'H: [...], E: [...], delta0: [...], Pm: [...], Y pre/fault/post: [[...]], clearing time ...'"
+                        }
+                    },
+                    "required": ["query"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "run_dispatch_agent",
+                "description": "Economic dispatch: share a demand between generating units at equal incremental cost, with unit limits and optional B-coefficient losses",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "The query for economic dispatch in the format 'cost curves / incremental costs: ..., limits: ..., B: [[...]], demand: ...'"
+                        }
+                    },
+                    "required": ["query"]
+                }
+            }
         }
     ]
 
@@ -124,7 +175,9 @@ def run_conversation(user_prompt):
         "run_ybus_calculation_agent": run_ybus_agent,
         "run_power_flow_agent": run_gs_agent,
         "run_loss_agent": run_loss_agent,
-        "run_bolted_fault_agent": run_fault_agent
+        "run_bolted_fault_agent": run_fault_agent,
+        "run_stability_agent": run_stability_agent,
+        "run_dispatch_agent": run_dispatch_agent,
     }
 
     # Iterative loop to handle multiple rounds of tool calls
@@ -0,0 +1,230 @@
+import numpy as np
+import json
+from groq import Groq
+from dotenv import load_dotenv
+from transient_stability import GeneratorData, critical_clearing_time, transient_stability
+import os
+
+load_dotenv()
+
+client = Groq()
+MODEL = "openai/gpt-oss-120b"
+
+_COMPLEX_MATRIX = {
+    "type": "array",
+    "items": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "real": {
+                    "type": "number"
+                },
+                "imag": {
+                    "type": "number"
+                }
+            },
+            "required": ["real", "imag"]
+        }
+    }
+}
+
+_NUMBER_LIST = {
+    "type": "array",
+    "items": {
+        "type": "number"
+    }
+}
+
+
+def run_conversation(user_prompt):
+    # Initialize the conversation with system and user messages
+    messages=[
+        {
+            "role": "system",
+            "content": "You are a power system transient stability assistant. Use the transient_stability function to simulate the swing equations of all machines (classical model) through a fault and its clearing, given the generator data and the reduced admittance matrices between the internal machine nodes before, during and after the fault. A single machine against an infinite bus is modelled as two machines where the infinite bus has H = 0. Parse the user's input into the required structured format for the tool call and report whether the system stays in synchronism, the largest rotor angle separation and the swing curve. If the user asks for the critical clearing time, use the critical_clearing_time function instead. At the end add a disclaimer that it's generated by LLM and might not be correct so take it with a pinch of salt."
+        },
+        {
+            "role": "user",
+            "content": user_prompt,
+        }
+    ]
+
+    # Define the available tools for our model to use
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": "transient_stability",
+                "description": "Simulate multi-machine rotor angle swings for a fault applied at t_fault and cleared at t_clear",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "H": dict(_NUMBER_LIST, description="Inertia constant of each machine in seconds (0 for an infinite bus)"),
+                        "E": dict(_NUMBER_LIST, description="Internal EMF magnitude of each machine in pu"),
+                        "delta0_deg": dict(_NUMBER_LIST, description="Initial rotor angle of each machine in degrees"),
+                        "Pm": dict(_NUMBER_LIST, description="Optional mechanical input power of each machine in pu (defaults to the pre-fault electrical power)"),
+                        "D": dict(_NUMBER_LIST, description="Optional damping coefficient of each machine in pu power per rad/s"),
+                        "f": {
+                            "type": "number",
+                            "description": "System frequency in Hz (default 50)"
+                        },
+                        "y_pre": dict(_COMPLEX_MATRIX, description="Pre-fault reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "y_fault": dict(_COMPLEX_MATRIX, description="Fault-on reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "y_post": dict(_COMPLEX_MATRIX, description="Post-fault reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "t_clear": {
+                            "type": "number",
+                            "description": "Fault clearing time in seconds"
+                        },
+                        "t_fault": {
+                            "type": "number",
+                            "description": "Fault inception time in seconds (default 0)"
+                        },
+                        "t_end": {
+                            "type": "number",
+                            "description": "Simulation end time in seconds (default 2)"
+                        },
+                        "dt": {
+                            "type": "number",
+                            "description": "Integration step in seconds (default 0.01)"
+                        },
+                        "method": {
+                            "type": "string",
+                            "enum": ["rk4", "trapezoidal"],
+                            "description": "Integration method (default rk4)"
+                        }
+                    },
+                    "required": ["H", "E", "delta0_deg", "y_pre", "y_fault", "y_post", "t_clear"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "critical_clearing_time",
+                "description": "Find the critical clearing time of a fault by a parallel search over the clearing time",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "H": dict(_NUMBER_LIST, description="Inertia constant of each machine in seconds (0 for an infinite bus)"),
+                        "E": dict(_NUMBER_LIST, description="Internal EMF magnitude of each machine in pu"),
+                        "delta0_deg": dict(_NUMBER_LIST, description="Initial rotor angle of each machine in degrees"),
+                        "Pm": dict(_NUMBER_LIST, description="Optional mechanical input power of each machine in pu (defaults to the pre-fault electrical power)"),
+                        "D": dict(_NUMBER_LIST, description="Optional damping coefficient of each machine in pu power per rad/s"),
+                        "f": {
+                            "type": "number",
+                            "description": "System frequency in Hz (default 50)"
+                        },
+                        "y_pre": dict(_COMPLEX_MATRIX, description="Pre-fault reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "y_fault": dict(_COMPLEX_MATRIX, description="Fault-on reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "y_post": dict(_COMPLEX_MATRIX, description="Post-fault reduced admittance matrix as a list of lists of objects with real and imag parts"),
+                        "t_max": {
+                            "type": "number",
+                            "description": "Longest clearing time to consider in seconds (default 1)"
+                        },
+                        "tol": {
+                            "type": "number",
+                            "description": "Width of the returned clearing time band in seconds (default 0.005)"
+                        }
+                    },
+                    "required": ["H", "E", "delta0_deg", "y_pre", "y_fault", "y_post"]
+                }
+            }
+        }
+    ]
+
+    # Make the initial API call to Groq
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        stream=False,
+        tools=tools,
+        tool_choice="auto",
+        max_tokens=8100
+    )
+
+    # Extract the response and any tool calls
+    response_message = response.choices[0].message
+    tool_calls = response_message.tool_calls
+
+    if tool_calls:
+        # Define helper functions to parse structured args to numpy arrays
+        def parse_complex_dict(d):
+            return complex(d['real'], d['imag'])
+
+        def parse_matrix(mat):
+            return np.array([[parse_complex_dict(item) for item in row] for row in mat], dtype=complex)
+
+        def parse_optional(values):
+            return np.array(values, dtype=float) if values else None
+
+        # Add the LLM's response to conversation
+        messages.append(response_message)
+
+        # Process each tool call
+        for tool_call in tool_calls:
+            function_name = tool_call.function.name
+            function_args = json.loads(tool_call.function.arguments)
+
+            # Parse arguments
+            H = np.array(function_args["H"], dtype=float)
+            gen = GeneratorData(
+                H=np.where(H > 0, H, np.inf),
+                E=np.array(function_args["E"], dtype=float),
+                delta0=np.radians(function_args["delta0_deg"]),
+                Pm=parse_optional(function_args.get("Pm")),
+                D=parse_optional(function_args.get("D")),
+                f=function_args.get("f") or 50.0,
+            )
+
+            networks = [parse_matrix(function_args[key]) for key in ("y_pre", "y_fault", "y_post")]
+
+            # Call the tool and get response
+            if function_name == "critical_clearing_time":
+                result = critical_clearing_time(
+                    gen,
+                    *networks,
+                    t_max=function_args.get("t_max", 1.0),
+                    tol=function_args.get("tol", 0.005),
+                )
+            else:
+                result = transient_stability(
+                    gen,
+                    *networks,
+                    t_clear=function_args["t_clear"],
+                    t_fault=function_args.get("t_fault", 0.0),
+                    t_end=function_args.get("t_end", 2.0),
+                    dt=function_args.get("dt", 0.01),
+                    method=function_args.get("method", "rk4"),
+                )
+
+            # Format the response as a string
+            response_str = json.dumps(result.as_dict(), indent=2)
+
+            # Add tool response to conversation
+            messages.append(
+                {
+                    "tool_call_id": tool_call.id,
+                    "role": "tool",
+                    "name": function_name,
+                    "content": response_str,
+                }
+            )
+
+        # Make second API call with updated conversation
+        second_response = client.chat.completions.create(
+            model=MODEL,
+            messages=messages
+        )
+
+        # Return final response
+        return second_response.choices[0].message.content
+    else:
+        return response_message.content
+
+
+def run_stability_agent(user_prompt):
+    """
+    Wrapper function for orchestrator compatibility
+    """
+    return run_conversation(user_prompt)
@@ -3,13 +3,19 @@ import json
 from groq import Groq
 from dotenv import load_dotenv
 import os
-import matlab.engine
+from ybus_builder import branch_stamps, build_ybus
+from contingency import branch_flows, n1_contingency
+from sensitivity import dc_flow_study
+from network_reduction import kron_reduce
+from bus_ordering import fill_statistics
+from network import NETWORK_FILE_SCHEMA, load_network
 
 load_dotenv()
 
 client = Groq()
 MODEL = "openai/gpt-oss-120b"
 
+# Tools take either inline line_data or a network file parsed once per session
 def compute_ybus_matlab(line_data):
     """
     Compute Ybus matrix using MATLAB engine
@@ -20,6 +26,8 @@ def compute_ybus_matlab(line_data):
     Returns:
         Ybus matrix as a numpy array
     """
+    import matlab.engine
+
     # Start MATLAB engine
     eng = matlab.engine.start_matlab()
     
@@ -68,9 +76,26 @@ def compute_ybus_matlab(line_data):
     
     return ybus_array
 
+def _case_file_ybus(case_file, max_buses=30):
+    """Case summary plus its Ybus (small cases only) as a JSON string."""
+    network = load_network(case_file)
+    result = network.summary()
+    result["bus_numbers"] = network.bus_ids.tolist()
+    if network.n_bus <= max_buses:
+        result["Ybus"] = np.array2string(network.ybus().toarray(), precision=4, suppress_small=True)
+    return json.dumps(result, indent=2)
+
+def _case_bus_numbers(rows, network, keys=("from_bus", "to_bus")):
+    """Rewrite the 1-based internal buses of result rows to the network file's bus numbers."""
+    for row in rows:
+        for key in keys:
+            if row.get(key) is not None:
+                row[key] = int(network.bus_ids[row[key] - 1])
+    return rows
+
 def run_ybus_agent(user_prompt):
     """
-    Agent that computes Ybus matrix from branch data using LLM + MATLAB
+    Agent that computes Ybus matrix from branch data using LLM + native sparse builder
     """
     messages = [
         {
@@ -82,6 +107,19 @@ def run_ybus_agent(user_prompt):
             3. Call the compute_ybus function with the extracted data
             4. Return the Ybus matrix in a clear format
             5. If element number is a column name then ignore that column while calling the tool.
+            6. If the user asks for N-1 / branch outage / contingency analysis and gives the solved
+               base-case voltages, call the n1_contingency function instead. Branch ratings, if given,
+               go in a 7th column of the line data.
+            7. For "what happens to the flows if X is moved from bus a to bus b" or single branch outage
+               flow questions, call the dc_flow_sensitivity function (DC distribution factors).
+            8. If the user only cares about a few buses of a large network (network equivalent, Kron
+               reduction, fault or stability study on selected buses), call the kron_reduce function
+               with the 1-based buses to keep; its reduced Ybus can be passed on to the other tools.
+            9. For questions about bus ordering, sparsity or fill-in of the factorization, call the
+               bus_ordering_stats function.
+            10. If the user gives a case file path (MATPOWER .m or IEEE CDF), call load_case_file with
+               that path instead of copying any data out of the file, and pass the same path as
+               network_file (instead of line_data) to the other tools. Saved networks (.npz) work the same way.
             
             The line data should be in the format:
             [[from1, to1, R1, X1, a1, sh1],
@@ -103,7 +141,162 @@ def run_ybus_agent(user_prompt):
             "type": "function",
             "function": {
                 "name": "compute_ybus",
-                "description": "Compute Ybus matrix from branch/line data using MATLAB",
+                "description": "Compute Ybus matrix from branch/line data",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "line_data": {
+                            "type": "array",
+                            "description": "Array of branch data where each row is [from_bus, to_bus, R, X, a, shunt]",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA
+                    },
+                    "required": []
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "n1_contingency",
+                "description": "N-1 branch outage screening: rank every single-branch outage with DC distribution factors, then verify the worst ones with an AC solution and report voltage violations and overloads. Outages that split the network are listed separately as islanding_outages",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "line_data": {
+                            "type": "array",
+                            "description": "Array of branch data where each row is [from_bus, to_bus, R, X, a, shunt] with an optional 7th column for the branch rating in pu",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA,
+                        "v_base": {
+                            "type": "array",
+                            "description": "Solved base-case bus voltages as a list of objects with real and imag parts",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "real": {
+                                        "type": "number"
+                                    },
+                                    "imag": {
+                                        "type": "number"
+                                    }
+                                },
+                                "required": ["real", "imag"]
+                            }
+                        },
+                        "top_k": {
+                            "type": "integer",
+                            "description": "Number of worst-ranked non-islanding outages to verify with an AC solution (default 10)"
+                        }
+                    },
+                    "required": ["v_base"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "dc_flow_sensitivity",
+                "description": "Branch flow changes for a power transfer between two buses and/or a branch outage, from cached DC PTDF/LODF sensitivities",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "line_data": {
+                            "type": "array",
+                            "description": "Array of branch data where each row is [from_bus, to_bus, R, X, a, shunt]",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA,
+                        "from_bus": {
+                            "type": "integer",
+                            "description": "1-based bus where the transferred power is injected"
+                        },
+                        "to_bus": {
+                            "type": "integer",
+                            "description": "1-based bus where the transferred power is withdrawn"
+                        },
+                        "amount": {
+                            "type": "number",
+                            "description": "Transferred power in pu"
+                        },
+                        "outage_branch": {
+                            "type": "integer",
+                            "description": "Optional 1-based branch (row of line_data) to take out of service"
+                        },
+                        "v_base": {
+                            "type": "array",
+                            "description": "Optional solved base-case bus voltages (real and imag parts) to report absolute flows",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "real": {
+                                        "type": "number"
+                                    },
+                                    "imag": {
+                                        "type": "number"
+                                    }
+                                },
+                                "required": ["real", "imag"]
+                            }
+                        }
+                    },
+                    "required": []
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "kron_reduce",
+                "description": "Kron-reduce the network onto a set of retained buses and return the equivalent (reduced) Ybus between them",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "line_data": {
+                            "type": "array",
+                            "description": "Array of branch data where each row is [from_bus, to_bus, R, X, a, shunt]",
+                            "items": {
+                                "type": "array",
+                                "items": {
+                                    "type": "number"
+                                }
+                            }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA,
+                        "retained_buses": {
+                            "type": "array",
+                            "description": "1-based buses (with network_file: bus numbers of the file) to keep in the equivalent; all other buses are eliminated",
+                            "items": {
+                                "type": "integer"
+                            }
+                        }
+                    },
+                    "required": ["retained_buses"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "bus_ordering_stats",
+                "description": "Fill-reducing (minimum degree) bus ordering used by the sparse solvers, with the fill-in of its LU factors compared to the user's bus numbering",
                 "parameters": {
                     "type": "object",
                     "properties": {
@@ -116,16 +309,39 @@ def run_ybus_agent(user_prompt):
                                     "type": "number"
                                 }
                             }
+                        },
+                        "network_file": NETWORK_FILE_SCHEMA
+                    },
+                    "required": []
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "load_case_file",
+                "description": "Read a MATPOWER (.m) or IEEE Common Data Format case file from disk and build its Ybus directly, without transcribing the branch data",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "case_file": {
+                            "type": "string",
+                            "description": "Path of the case file exactly as given by the user"
                         }
                     },
-                    "required": ["line_data"]
+                    "required": ["case_file"]
                 }
             }
         }
     ]
     
     available_functions = {
-        "compute_ybus": lambda line_data: str(compute_ybus_matlab(line_data))
+        "compute_ybus": lambda line_data: str(build_ybus(line_data, dense=True)),
+        "n1_contingency": n1_contingency,
+        "dc_flow_sensitivity": dc_flow_study,
+        "kron_reduce": kron_reduce,
+        "bus_ordering_stats": lambda line_data: json.dumps(fill_statistics(build_ybus(line_data)), indent=2),
+        "load_case_file": _case_file_ybus,
     }
     
     max_iterations = 5
@@ -153,10 +369,59 @@ def run_ybus_agent(user_prompt):
             function_name = tool_call.function.name
             function_to_call = available_functions[function_name]
             function_args = json.loads(tool_call.function.arguments)
+            network = None
+            if function_args.get("network_file"):
+                # Parsed once per session; every tool below accepts the Network as line_data.
+                # Its bus arguments and results are the file's bus numbers, mapped to and
+                # from the internal (slack first) positions here.
+                network = function_args["line_data"] = load_network(function_args.pop("network_file"))
             
             # Call the function
             if function_name == "compute_ybus":
                 function_response = function_to_call(function_args["line_data"])
+            elif function_name == "n1_contingency":
+                v_base = [complex(v["real"], v["imag"]) for v in function_args["v_base"]]
+                top_k = function_args.get("top_k") or 10
+                results = function_to_call(function_args["line_data"], v_base, top_k=top_k)
+                # Islanding outages have no AC solution; list them apart from the verified ones
+                rows = [r.as_dict() for r in results if not r.islanded][:top_k]
+                islanding = [{"branch": r.branch, "from_bus": r.from_bus, "to_bus": r.to_bus}
+                             for r in results if r.islanded]
+                if network is not None:
+                    _case_bus_numbers(rows + islanding, network)
+                    for row in rows:
+                        _case_bus_numbers(row["voltage_violations"], network, keys=("bus",))
+                function_response = json.dumps({"outages": rows, "islanding_outages": islanding},
+                                               indent=2)
+            elif function_name == "dc_flow_sensitivity":
+                base_flows = None
+                if function_args.get("v_base"):
+                    v_base = np.array([complex(v["real"], v["imag"]) for v in function_args["v_base"]])
+                    base_flows = branch_flows(*branch_stamps(function_args["line_data"]), v_base)[0].real
+                from_bus, to_bus = function_args.get("from_bus"), function_args.get("to_bus")
+                if network is not None:
+                    from_bus = None if from_bus is None else network.positions(from_bus) + 1
+                    to_bus = None if to_bus is None else network.positions(to_bus) + 1
+                rows = function_to_call(
+                    function_args["line_data"],
+                    from_bus=from_bus,
+                    to_bus=to_bus,
+                    amount=function_args.get("amount", 0.0),
+                    outage_branch=function_args.get("outage_branch"),
+                    base_flows=base_flows,
+                )
+                if network is not None:
+                    _case_bus_numbers(rows, network)
+                function_response = json.dumps(rows, indent=2)
+            elif function_name == "kron_reduce":
+                if network is not None:
+                    retained = network.positions(function_args["retained_buses"])
+                else:
+                    retained = np.array(function_args["retained_buses"], dtype=int) - 1
+                result = function_to_call(build_ybus(function_args["line_data"]), retained).as_dict()
+                if network is not None:
+                    result["retained_buses"] = network.bus_ids[retained].tolist()
+                function_response = json.dumps(result, indent=2)
             else:
                 function_response = function_to_call(**function_args)
             
@@ -5,6 +5,7 @@ from PIL import Image
 import io
 import tempfile
 import csv
+import os
 
 # Set page config
 st.set_page_config(
@@ -64,6 +65,10 @@ if "csv_path" not in st.session_state:
 if "csv_preview" not in st.session_state:
     st.session_state.csv_preview = None
 
+# Initialize case file state
+if "case_path" not in st.session_state:
+    st.session_state.case_path = None
+
 # Display chat history
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -101,7 +106,7 @@ elif st.session_state.uploaded_image_bytes is not None:
 uploaded_csv = st.file_uploader(
     "📊 Attach CSV data (optional)",
     type=["csv"],
-    help="Upload a CSV file to use as data input for MATLAB analysis",
+    help="Upload a CSV file to use as data input for MATLAB analysis, or a load profile / measurement table to run a time-series study / state estimation on an attached case file",
     key="csv_uploader"
 )
 
@@ -125,6 +130,22 @@ if uploaded_csv is not None:
 elif st.session_state.csv_path is None:
     st.session_state.csv_preview = None
 
+# Power system case file uploader (read directly by the solvers)
+uploaded_case = st.file_uploader(
+    "⚡ Attach a case file (optional)",
+    type=["m", "cdf", "txt"],
+    help="Upload a MATPOWER .m case or an IEEE Common Data Format file",
+    key="case_uploader"
+)
+
+if uploaded_case is not None:
+    suffix = os.path.splitext(uploaded_case.name)[1] or ".txt"
+    _, case_tmp = tempfile.mkstemp(suffix=suffix)
+    with open(case_tmp, "wb") as f:
+        f.write(uploaded_case.read())
+    st.session_state.case_path = case_tmp
+    st.success(f"✅ Case file ready: {uploaded_case.name}")
+
 # Chat input
 prompt = st.chat_input("Ask your question here...")
 
@@ -150,6 +171,8 @@ if prompt:
     csv_preview = st.session_state.csv_preview
     st.session_state.csv_path = None
     st.session_state.csv_preview = None
+    case_path = st.session_state.case_path
+    st.session_state.case_path = None
     
     # Prepare message content for display
     message_content = prompt
@@ -185,7 +208,7 @@ if prompt:
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             csv_files = [{"path": csv_path, "preview": csv_preview}] if csv_path else None
-            response = orchestrate(prompt, image_base64=image_base64, csv_files=csv_files, conversation_history=conversation_history)
+            response = orchestrate(prompt, image_base64=image_base64, csv_files=csv_files, conversation_history=conversation_history, case_file=case_path)
             st.markdown(response)
     
     # Add assistant response to history
@@ -0,0 +1,198 @@
+import heapq
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from dataclasses import dataclass
+from factor_cache import fingerprint, get_cache
+from network import as_ybus
+
+
+@dataclass
+class BusOrdering:
+    perm: np.ndarray                      # (n,) perm[k] = user bus eliminated k-th (0-based)
+    position: np.ndarray                  # (n,) position[bus] = elimination step of a user bus
+    n_branch: int                         # off-diagonal pairs in the Ybus pattern
+    fill_in: int                          # pairs created by eliminating in perm order
+
+    @property
+    def nnz_factor(self):
+        """Nonzeros of L + U (diagonal included) for the ordered Ybus."""
+        return len(self.perm) + 2 * (self.n_branch + self.fill_in)
+
+    def as_dict(self):
+        """Fill-in statistics (1-based order), e.g. for JSON tool output."""
+        return {
+            "n_bus": len(self.perm),
+            "n_branch": self.n_branch,
+            "fill_in": self.fill_in,
+            "nnz_factor": self.nnz_factor,
+            "order": (self.perm + 1).tolist(),
+        }
+
+
+class OrderedLU:
+    """
+    SuperLU factors of A[p][:, p] for a precomputed symmetric permutation p.
+
+    solve() takes and returns vectors in the original (user) numbering, so
+    it is a drop-in replacement for the SuperLU object of A itself.
+    """
+
+    def __init__(self, A, p):
+        self.p = np.asarray(p, dtype=np.int64)
+        A = sp.csc_matrix(A)[self.p][:, self.p].tocsc()
+        # Ybus and Jacobians are diagonally strong: keep the diagonal pivots
+        # (and with them the fill-reducing order) unless one is very small
+        self.lu = splu(A, permc_spec="NATURAL", diag_pivot_thresh=0.1,
+                       options={"SymmetricMode": True})
+        self.shape = self.lu.shape
+        self.nnz = self.lu.nnz
+        self.dtype = A.dtype
+        # Permutations of the factors with respect to A itself
+        position = np.empty_like(self.p)
+        position[self.p] = np.arange(len(self.p))
+        self.perm_r = self.lu.perm_r[position]
+        self.perm_c = self.lu.perm_c[position]
+
+    # SuperLU builds a new sparse copy of a factor on every L / U access, so
+    # they are only formed for the callers that need them explicitly
+    @property
+    def L(self):
+        return self.lu.L
+
+    @property
+    def U(self):
+        return self.lu.U
+
+    def solve(self, b):
+        b = np.asarray(b)
+        x = np.empty(b.shape, dtype=np.result_type(b.dtype, self.dtype))
+        x[self.p] = self.lu.solve(np.ascontiguousarray(b[self.p]))
+        return x
+
+
+def _adjacency(A):
+    """Neighbour sets of the symmetrized off-diagonal pattern of A."""
+    A = sp.csr_matrix(A)
+    A = (abs(A) + abs(A).T).tocsr()
+    return [set(A.indices[A.indptr[i]:A.indptr[i + 1]].tolist()) - {i}
+            for i in range(A.shape[0])]
+
+
+def _eliminate(adj, j):
+    """Eliminate bus j from the graph, joining its neighbours; returns the new pairs."""
+    nbrs = adj[j]
+    fill = 0
+    for k in nbrs:
+        adj[k].discard(j)
+        new = nbrs - adj[k]
+        new.discard(k)
+        fill += len(new)
+        adj[k] |= new
+    adj[j] = set()
+    return fill // 2
+
+
+def symbolic_fill(A, order=None):
+    """
+    Number of fill-in pairs of a symmetric elimination of A.
+
+    Args:
+        A: (n, n) matrix, dense or scipy sparse (only the pattern is used)
+        order: Elimination order (default: natural order 0..n-1)
+
+    Returns:
+        Number of new off-diagonal pairs created in the factors
+    """
+    adj = _adjacency(A)
+    order = range(len(adj)) if order is None else order
+    return sum(_eliminate(adj, j) for j in order)
+
+
+def minimum_degree_order(A):
+    """
+    Tinney scheme 2 (minimum degree) ordering of a symmetric sparsity pattern.
+
+    At every step the bus with the fewest remaining neighbours is eliminated
+    and its neighbours are joined, as in a symbolic Gaussian elimination.
+    Ties are broken by the lower bus number, so the order is deterministic.
+
+    Args:
+        A: (n, n) matrix, dense or scipy sparse (only the pattern is used)
+
+    Returns:
+        BusOrdering
+    """
+    adj = _adjacency(A)
+    n = len(adj)
+    n_branch = sum(len(a) for a in adj) // 2
+    heap = [(len(a), i) for i, a in enumerate(adj)]
+    heapq.heapify(heap)
+    done = np.zeros(n, dtype=bool)
+    perm = []
+    fill = 0
+
+    while heap:
+        degree, j = heapq.heappop(heap)
+        if done[j] or degree != len(adj[j]):
+            continue
+        nbrs = list(adj[j])
+        fill += _eliminate(adj, j)
+        done[j] = True
+        perm.append(j)
+        for k in nbrs:
+            heapq.heappush(heap, (len(adj[k]), k))
+
+    perm = np.array(perm, dtype=np.int64)
+    position = np.empty(n, dtype=np.int64)
+    position[perm] = np.arange(n)
+    return BusOrdering(perm=perm, position=position, n_branch=n_branch, fill_in=fill)
+
+
+def _pattern_fingerprint(A):
+    A = sp.csr_matrix(A, dtype=complex)
+    A.eliminate_zeros()
+    return fingerprint(sp.csr_matrix((np.ones(A.nnz), A.indices, A.indptr), shape=A.shape))
+
+
+def get_ordering(Ybus):
+    """
+    Minimum degree ordering of a network, computed once per sparsity pattern.
+
+    The ordering only depends on which buses are connected, so it is kept in
+    the shared factor cache under the pattern fingerprint and reused for
+    every value change (new loads, outaged shunts, Newton iterations).
+    """
+    return get_cache().get_or_compute(_pattern_fingerprint(Ybus), "ordering",
+                                      lambda: minimum_degree_order(Ybus))
+
+
+def jacobian_order(ordering, pv, pq):
+    """
+    Symmetric permutation of the load flow unknowns [Va(pv+pq), Vm(pq)] that
+    follows the bus ordering, with the angle and magnitude of a bus adjacent.
+    """
+    pvpq = np.r_[pv, pq]
+    bus = np.r_[pvpq, pq]
+    kind = np.r_[np.zeros(len(pvpq), dtype=np.int64), np.ones(len(pq), dtype=np.int64)]
+    return np.lexsort((kind, ordering.position[bus]))
+
+
+def fill_statistics(Ybus):
+    """
+    Fill-in of the cached minimum degree ordering next to the user bus order.
+
+    Args:
+        Ybus: (n, n) admittance matrix, dense or scipy sparse, or a Network
+
+    Returns:
+        Dict of ordering statistics (see BusOrdering.as_dict) plus the fill-in
+        and factor size of eliminating in the user's bus numbering
+    """
+    Ybus = as_ybus(Ybus)
+    ordering = get_ordering(Ybus)
+    stats = ordering.as_dict()
+    natural = symbolic_fill(Ybus)
+    stats["fill_in_natural"] = natural
+    stats["nnz_factor_natural"] = len(ordering.perm) + 2 * (ordering.n_branch + natural)
+    return stats
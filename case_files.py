@@ -0,0 +1,351 @@
+import hashlib
+import os
+import re
+import numpy as np
+import scipy.sparse as sp
+from dataclasses import dataclass
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "CASE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "chatbot_eee", "cases"),
+)
+
+# Column layout of the tables (MATPOWER case format, version 2)
+BUS_COLUMNS = ("bus_i", "type", "Pd", "Qd", "Gs", "Bs", "area", "Vm", "Va", "baseKV",
+               "zone", "Vmax", "Vmin")
+BRANCH_COLUMNS = ("fbus", "tbus", "r", "x", "b", "rateA", "rateB", "rateC", "ratio", "angle",
+                  "status")
+GEN_COLUMNS = ("bus", "Pg", "Qg", "Qmax", "Qmin", "Vg", "mBase", "status", "Pmax", "Pmin")
+
+_MATPOWER_TABLE = re.compile(r"^\s*mpc\.(bus|branch|gen)\s*=\s*\[")
+_MATPOWER_BASE = re.compile(r"^\s*mpc\.baseMVA\s*=\s*([-+0-9.eE]+)")
+
+
+@dataclass
+class CaseData:
+    base_mva: float                       # system MVA base
+    bus: np.ndarray                       # (n, 13) bus table, BUS_COLUMNS, slack bus first
+    branch: np.ndarray                    # (m, 11) branch table, BRANCH_COLUMNS, internal 1-based buses
+    gen: np.ndarray                       # (g, 10) generator table, GEN_COLUMNS, internal 1-based buses
+    bus_ids: np.ndarray                   # (n,) bus numbers of the case file, in internal order
+    name: str = ""                        # case name (file name or CDF title)
+
+    @property
+    def n_bus(self):
+        return len(self.bus)
+
+    def _in_service(self):
+        return self.branch[self.branch[:, 10] > 0]
+
+    def line_data(self, exact=True):
+        """
+        In-service branches as [from_bus, to_bus, R, X, a, shunt, rating] rows
+        (1-based internal buses, rating in pu, 0 if unrated) for the tools that
+        take line_data.
+
+        build_ybus applies the tap at both ends and has no phase shifts or bus
+        shunts, so as in Network.line_data a case with any of these raises with
+        exact; pass exact=False where only the branch ends and impedances are
+        used, and use ybus() for the exact transformer model.
+        """
+        br = self._in_service()
+        a = np.where(br[:, 8] == 0, 1.0, br[:, 8])
+        if exact and (np.any(a != 1) or np.any(br[:, 9] != 0) or np.any(self.bus[:, 4:6] != 0)):
+            raise ValueError(f"case {self.name!r} has off-nominal taps, phase shifts or bus "
+                             "shunts, which line_data rows cannot represent; use its "
+                             "branch_admittances() and ybus()")
+        return np.column_stack([br[:, 0], br[:, 1], br[:, 2], br[:, 3], a, br[:, 4],
+                                br[:, 5] / self.base_mva])
+
+    def branch_admittances(self):
+        """
+        Two-port stamps of the in-service branches with the standard pi model
+        (off-nominal tap and phase shift on the from side).
+
+        Returns:
+            Tuple (f, t, yff, yft, ytf, ytt): 0-based end buses and the
+            admittances with I_from = yff V_f + yft V_t, I_to = ytf V_f + ytt V_t
+        """
+        br = self._in_service()
+        f = br[:, 0].astype(np.int64) - 1
+        t = br[:, 1].astype(np.int64) - 1
+        ys = 1.0 / (br[:, 2] + 1j * br[:, 3])
+        bc = br[:, 4]
+        tap = np.where(br[:, 8] == 0, 1.0, br[:, 8]) * np.exp(1j * np.deg2rad(br[:, 9]))
+
+        ytt = ys + 1j * bc / 2
+        yff = ytt / (tap * np.conj(tap))
+        yft = -ys / np.conj(tap)
+        ytf = -ys / tap
+        return f, t, yff, yft, ytf, ytt
+
+    def ybus(self):
+        """
+        Sparse Ybus with the standard pi model (see branch_admittances) and
+        the bus shunts.
+        """
+        n = self.n_bus
+        f, t, yff, yft, ytf, ytt = self.branch_admittances()
+        ysh = (self.bus[:, 4] + 1j * self.bus[:, 5]) / self.base_mva
+
+        rows = np.r_[f, f, t, t, np.arange(n)]
+        cols = np.r_[f, t, f, t, np.arange(n)]
+        vals = np.r_[yff, yft, ytf, ytt, ysh]
+        return sp.coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsr()
+
+    def loadflow_inputs(self):
+        """
+        Keyword arguments for the load flow solvers (gauss_seidel_loadflow,
+        newton_raphson_loadflow, ...): Ybus, bus_type (2 = PV), p_spec and
+        q_spec in pu, summed generator Q limits and V_init from the case
+        voltages with generator setpoints at PV and slack buses.
+        """
+        n = self.n_bus
+        on = self.gen[self.gen[:, 7] > 0]
+        gbus = on[:, 0].astype(np.int64) - 1
+        pg = np.bincount(gbus, on[:, 1], n)
+        qg = np.bincount(gbus, on[:, 2], n)
+        has_gen = np.bincount(gbus, minlength=n) > 0
+
+        bus_type = np.where((self.bus[:, 1] == 2) & has_gen, 2, 1)
+        q_min = np.where(bus_type == 2, np.bincount(gbus, on[:, 4], n) / self.base_mva, -np.inf)
+        q_max = np.where(bus_type == 2, np.bincount(gbus, on[:, 3], n) / self.base_mva, np.inf)
+
+        Vm = np.where(self.bus[:, 7] > 0, self.bus[:, 7], 1.0)
+        vg = np.zeros(n)
+        vg[gbus] = on[:, 5]
+        Vm = np.where((bus_type == 2) | (np.arange(n) == 0), np.where(vg > 0, vg, Vm), Vm)
+        V_init = Vm * np.exp(1j * np.deg2rad(self.bus[:, 8] - self.bus[0, 8]))
+
+        return {
+            "Ybus": self.ybus(),
+            "bus_type": bus_type,
+            "p_spec": (pg - self.bus[:, 2]) / self.base_mva,
+            "q_spec": (qg - self.bus[:, 3]) / self.base_mva,
+            "q_min": q_min,
+            "q_max": q_max,
+            "V_init": V_init,
+        }
+
+    def summary(self):
+        """Short description of the case, e.g. for JSON tool output."""
+        return {
+            "name": self.name,
+            "base_mva": float(self.base_mva),
+            "buses": self.n_bus,
+            "branches": int(len(self.branch)),
+            "in_service_branches": int(np.sum(self.branch[:, 10] > 0)),
+            "generators": int(len(self.gen)),
+            "slack_bus": int(self.bus_ids[0]),
+            "total_load_mw": float(self.bus[:, 2].sum()),
+            "total_load_mvar": float(self.bus[:, 3].sum()),
+        }
+
+    # --- Persistence ---
+
+    def save(self, path):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, base_mva=self.base_mva, bus=self.bus, branch=self.branch, gen=self.gen,
+                 bus_ids=self.bus_ids, name=np.array(self.name))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(base_mva=float(data["base_mva"]), bus=data["bus"], branch=data["branch"],
+                       gen=data["gen"], bus_ids=data["bus_ids"], name=str(data["name"]))
+
+
+def _pad(rows, width):
+    """Rows of possibly different length as an (len(rows), width) float array."""
+    out = np.zeros((len(rows), width))
+    for i, row in enumerate(rows):
+        row = row[:width]
+        out[i, :len(row)] = row
+    return out
+
+
+def _renumber(base_mva, bus, branch, gen, name):
+    """Internal numbering: slack bus first, then the file order; tables to 1-based internal buses."""
+    ref = np.flatnonzero(bus[:, 1] == 3)
+    if len(ref) == 0:
+        raise ValueError("case has no reference (slack) bus")
+    order = np.r_[ref[0], np.delete(np.arange(len(bus)), ref[0])]
+    bus = bus[order]
+    bus_ids = bus[:, 0].astype(np.int64)
+    lookup = {b: k + 1 for k, b in enumerate(bus_ids.tolist())}
+    try:
+        branch[:, :2] = [[lookup[int(f)], lookup[int(t)]] for f, t in branch[:, :2]]
+        gen[:, 0] = [lookup[int(b)] for b in gen[:, 0]]
+    except KeyError as exc:
+        raise ValueError(f"branch or generator refers to unknown bus {exc.args[0]}") from None
+    bus[:, 0] = np.arange(1, len(bus) + 1)
+    return CaseData(base_mva=base_mva, bus=bus, branch=branch, gen=gen, bus_ids=bus_ids, name=name)
+
+
+def parse_matpower(path):
+    """
+    Parse a MATPOWER case file (.m, version 2 tables).
+
+    The file is read line by line; only the mpc.baseMVA, mpc.bus, mpc.branch
+    and mpc.gen assignments are used (gencost and other fields are skipped).
+
+    Returns:
+        CaseData
+    """
+    base_mva = 100.0
+    tables = {"bus": [], "branch": [], "gen": []}
+    current = None
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            line = line.split("%", 1)[0]
+            if current is None:
+                match = _MATPOWER_BASE.match(line)
+                if match:
+                    base_mva = float(match.group(1))
+                    continue
+                match = _MATPOWER_TABLE.match(line)
+                if not match:
+                    continue
+                current = match.group(1)
+                line = line[match.end():]
+            end = "]" in line
+            for row in line.split("]", 1)[0].split(";"):
+                values = row.replace(",", " ").split()
+                if values:
+                    tables[current].append([float(v) for v in values])
+            if end:
+                current = None
+
+    if not tables["bus"]:
+        raise ValueError(f"{path} has no mpc.bus table")
+    bus = _pad(tables["bus"], len(BUS_COLUMNS))
+    branch = _pad(tables["branch"], len(BRANCH_COLUMNS))
+    if tables["branch"]:
+        # Missing status columns mean in service
+        short = np.array([len(r) for r in tables["branch"]]) <= 10
+        branch[short, 10] = 1
+    gen = _pad(tables["gen"], len(GEN_COLUMNS))
+    name = os.path.splitext(os.path.basename(path))[0]
+    return _renumber(base_mva, bus, branch, gen, name)
+
+
+def parse_ieee_cdf(path):
+    """
+    Parse an IEEE Common Data Format case (e.g. ieee14cdf.txt).
+
+    Bus names are taken from their fixed columns (6-17); every other field is
+    split on whitespace, which tolerates the slightly shifted columns found in
+    many published files. Generators are created at PV and slack buses, with
+    the desired voltage as setpoint and the bus Q limits.
+
+    Returns:
+        CaseData
+    """
+    base_mva, name = 100.0, ""
+    buses, branches = [], []
+    section = None
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        title = fh.readline()
+        try:
+            base_mva = float(title[31:37])
+        except ValueError:
+            pass
+        name = title[45:].strip() or os.path.basename(path)
+        for line in fh:
+            if line.startswith("BUS DATA FOLLOWS"):
+                section = buses
+            elif line.startswith("BRANCH DATA FOLLOWS"):
+                section = branches
+            elif line.lstrip().startswith("-999"):
+                section = None
+            elif section is buses and line.strip():
+                # number, name, then area zone type Vm Va Pd Qd Pg Qg kV Vset Qmax Qmin G B ...
+                buses.append([float(line[:5])] + [float(v) for v in line[18:].split()[:15]])
+            elif section is branches and line.strip():
+                # from to area zone circuit type R X B rateA rateB rateC ctrl side ratio angle ...
+                branches.append([float(v) for v in line.split()[:16]])
+
+    if not buses:
+        raise ValueError(f"{path} has no BUS DATA section")
+    cdf = _pad(buses, 16)
+    n = len(cdf)
+    bus = np.zeros((n, len(BUS_COLUMNS)))
+    bus[:, 0] = cdf[:, 0]
+    bus[:, 1] = np.select([cdf[:, 3] == 3, cdf[:, 3] == 2], [3, 2], 1)
+    bus[:, 2:4] = cdf[:, 6:8]
+    bus[:, 4:6] = cdf[:, 14:16] * base_mva
+    bus[:, 6] = cdf[:, 1]
+    bus[:, 7:9] = cdf[:, 4:6]
+    bus[:, 9] = cdf[:, 10]
+    bus[:, 10] = cdf[:, 2]
+    bus[:, 11:13] = [1.06, 0.94]
+
+    cdf_br = _pad(branches, 16)
+    branch = np.zeros((len(cdf_br), len(BRANCH_COLUMNS)))
+    branch[:, 0:2] = cdf_br[:, 0:2]
+    branch[:, 2:8] = cdf_br[:, 6:12]
+    branch[:, 8:10] = cdf_br[:, 14:16]
+    branch[:, 10] = 1
+
+    g = np.flatnonzero(bus[:, 1] >= 2)
+    gen = np.zeros((len(g), len(GEN_COLUMNS)))
+    gen[:, 0] = bus[g, 0]
+    gen[:, 1:3] = cdf[g, 8:10]
+    gen[:, 3] = np.where(cdf[g, 12] == cdf[g, 13], np.inf, cdf[g, 12])
+    gen[:, 4] = np.where(cdf[g, 12] == cdf[g, 13], -np.inf, cdf[g, 13])
+    gen[:, 5] = np.where(cdf[g, 11] > 0, cdf[g, 11], bus[g, 7])
+    gen[:, 6] = base_mva
+    gen[:, 7] = 1
+    gen[:, 8] = np.inf
+    return _renumber(base_mva, bus, branch, gen, name)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _is_cdf(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        for _, line in zip(range(5), fh):
+            if line.startswith("BUS DATA FOLLOWS"):
+                return True
+    return False
+
+
+def load_case(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Load a MATPOWER (.m) or IEEE CDF case file, through an .npz cache.
+
+    The parsed tables are stored as case_<sha256 of the file>.npz in
+    cache_dir, so uploading the same file again skips the text parsing.
+
+    Args:
+        path: Case file path
+        cache_dir: Directory of the parsed-case cache (None disables it)
+
+    Returns:
+        CaseData
+    """
+    cached = None
+    if cache_dir:
+        cached = os.path.join(cache_dir, f"case_{file_hash(path)}.npz")
+        if os.path.exists(cached):
+            return CaseData.load(cached)
+
+    if path.lower().endswith(".m"):
+        case = parse_matpower(path)
+    elif _is_cdf(path):
+        case = parse_ieee_cdf(path)
+    else:
+        raise ValueError(f"{path} is neither a MATPOWER .m file nor an IEEE CDF file")
+
+    if cached:
+        os.makedirs(cache_dir, exist_ok=True)
+        case.save(cached)
+    return case
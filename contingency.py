@@ -0,0 +1,237 @@
+import numpy as np
+from dataclasses import dataclass, field
+from factor_cache import fingerprint, get_cache
+from fault_analysis import factorize_ybus
+from network import as_line_data
+from sensitivity import DCSensitivity
+from ybus_builder import branch_stamps, build_ybus
+
+
+@dataclass
+class ContingencyResult:
+    branch: int                           # 1-based line_data row of the outaged branch
+    from_bus: int                         # 1-based end buses of the outaged branch
+    to_bus: int
+    dc_severity: float                    # worst post-outage DC branch loading
+    islanded: bool                        # outage splits the network
+    verified: bool = False                # AC solution computed
+    converged: bool = False
+    min_voltage: float = float("nan")
+    max_voltage: float = float("nan")
+    voltage_violations: list = field(default_factory=list)    # [(bus, |V|)], 1-based
+    overloads: list = field(default_factory=list)             # [(branch, loading)], 1-based
+
+    def as_dict(self):
+        return {
+            "branch": self.branch,
+            "from_bus": self.from_bus,
+            "to_bus": self.to_bus,
+            "dc_severity": float(self.dc_severity),
+            "islanded": self.islanded,
+            "verified": self.verified,
+            "converged": self.converged,
+            "min_voltage": float(self.min_voltage),
+            "max_voltage": float(self.max_voltage),
+            "voltage_violations": [{"bus": b, "voltage": float(v)} for b, v in self.voltage_violations],
+            "overloads": [{"branch": b, "loading": float(l)} for b, l in self.overloads],
+        }
+
+
+def _ratings(line_data, rates):
+    """Branch ratings from the argument or a 7th line_data column (0 = unrated)."""
+    if rates is not None:
+        return np.asarray(rates, dtype=float)
+    ldata = np.asarray(line_data, dtype=float)
+    if ldata.shape[1] > 6:
+        return ldata[:, 6].copy()
+    return np.zeros(len(ldata))
+
+
+def branch_flows(fb, tb, yff, yft, ytf, ytt, v):
+    """
+    Complex power entering every branch at its from and to ends.
+
+    Args:
+        fb, tb, yff, yft, ytf, ytt: Branch stamps from ybus_builder.branch_stamps
+        v: (n,) complex bus voltages
+
+    Returns:
+        Tuple (s_from, s_to) of complex arrays
+    """
+    s_from = v[fb] * np.conj(yff * v[fb] + yft * v[tb])
+    s_to = v[tb] * np.conj(ytf * v[fb] + ytt * v[tb])
+    return s_from, s_to
+
+
+def dc_screen(line_data, v_base, rates=None, slack=0, block_size=256):
+    """
+    Rank all single-branch outages with DC line outage distribution factors.
+
+    B (from the branch reactances) is factored once; the LODF columns of a
+    block of outages are solved together (see sensitivity.DCSensitivity) and
+    every post-outage active flow follows as f_m + LODF_ml * f_l, applied to
+    the active flows of the AC base case.
+
+    Args:
+        line_data: Branch rows [from_bus, to_bus, R, X, a, shunt(, rate)] or a
+            Network, whose own branch model gives the base-case flows
+        v_base: (n,) converged base-case voltages
+        rates: Optional branch ratings (pu), overrides the rate column
+        slack: 0-based slack bus
+        block_size: Outages whose sensitivities are solved together
+
+    Returns:
+        List of ContingencyResult sorted by decreasing dc_severity. Severity
+        is the largest |flow| / rating over rated branches (largest |flow| in
+        pu if no branch is rated); islanding outages rank first with inf.
+    """
+    stamps = branch_stamps(line_data)
+    fb, tb = stamps[:2]
+    v_base = np.asarray(v_base, dtype=complex).ravel()
+    n = len(v_base)
+    n_br = len(fb)
+    rate = _ratings(as_line_data(line_data, exact=False), rates)
+    rated = rate > 0
+
+    sens = DCSensitivity(line_data, n_bus=n, slack=slack, cache_dir=None)
+
+    f_base = branch_flows(*stamps, v_base)[0].real
+    severity = np.empty(n_br)
+    islanded = np.zeros(n_br, dtype=bool)
+
+    for start in range(0, n_br, block_size):
+        block = np.arange(start, min(start + block_size, n_br))
+        lodf = sens.lodf_columns(block)
+        bridge = np.isnan(lodf[0])
+        islanded[block] = bridge
+
+        f_post = f_base[:, None] + np.nan_to_num(lodf) * f_base[block]
+        loading = np.abs(f_post[rated]) / rate[rated, None] if rated.any() else np.abs(f_post)
+        severity[block] = np.where(bridge, np.inf, loading.max(axis=0, initial=0.0))
+
+    order = np.argsort(-severity, kind="stable")
+    return [
+        ContingencyResult(branch=int(l) + 1, from_bus=int(fb[l]) + 1, to_bus=int(tb[l]) + 1,
+                          dc_severity=float(severity[l]), islanded=bool(islanded[l]))
+        for l in order
+    ]
+
+
+def _outage_voltages(lu, y_ns_s, keep_pos, l_ends, l_block, v_base, s_spec, slack,
+                     tol, max_iter):
+    """
+    Post-outage voltages from the base factorization of Ybus without the slack row.
+
+    The outage changes Ybus by U C U^T on (at most) the two end buses, so
+    (A + U C U^T)^-1 b = x - A^-1 U C (I + U^T A^-1 U C)^-1 U^T x with
+    x = A^-1 b. Loads are converted to current injections and iterated to a
+    fixed point (implicit Zbus method).
+    """
+    n = len(v_base)
+    ns = np.flatnonzero(np.arange(n) != slack)
+    rhs_s = y_ns_s.copy()
+    ends = [k for k, bus in enumerate(l_ends) if bus != slack]
+    for k, bus in enumerate(l_ends):
+        if bus == slack:
+            # Coupling between the remaining end and the slack loses the branch
+            other = l_ends[1 - k]
+            rhs_s[keep_pos[other]] -= l_block[1 - k, k]
+
+    U_pos = [keep_pos[l_ends[k]] for k in ends]
+    C = -l_block[np.ix_(ends, ends)]
+    Ainv_U = None
+    if ends:
+        unit = np.zeros((len(ns), len(ends)), dtype=complex)
+        unit[U_pos, np.arange(len(ends))] = 1.0
+        Ainv_U = lu.solve(unit)
+        M = np.eye(len(ends)) + Ainv_U[U_pos] @ C
+        if np.linalg.cond(M) > 1e12:
+            return v_base.copy(), False
+
+    v = v_base.copy()
+    v_s = v_base[slack]
+    for _ in range(max_iter):
+        i_ns = np.conj(s_spec[ns] / v[ns]) - rhs_s * v_s
+        x = lu.solve(i_ns)
+        if Ainv_U is not None:
+            x -= Ainv_U @ (C @ np.linalg.solve(M, x[U_pos]))
+        dv = np.max(np.abs(x - v[ns]), initial=0.0)
+        v[ns] = x
+        if dv < tol:
+            return v, True
+    return v, False
+
+
+def n1_contingency(line_data, v_base, top_k=None, rates=None, v_min=0.95, v_max=1.05,
+                   slack=0, tol=1e-8, max_iter=100):
+    """
+    N-1 branch outage study: DC ranking followed by AC verification.
+
+    Every outage is ranked with dc_screen; the top_k worst that keep the
+    network connected (all if None) are then solved in AC as a rank-2 Sherman-Morrison-Woodbury update of the
+    base-case factorization of Ybus, which is taken from the shared factor
+    cache, so no outage refactors or rebuilds the network. The specified
+    injections of all non-slack buses are taken from the base case
+    (S = V .* conj(Ybus V)), i.e. PV buses keep their base-case Q.
+
+    Args:
+        line_data: Branch rows [from_bus, to_bus, R, X, a, shunt(, rate)] as parsed by
+            the Ybus agent, or a Network (its Ybus and branch stamps, with taps,
+            phase shifts and bus shunts, are used as they are)
+        v_base: (n,) converged base-case voltages
+        top_k: Number of DC-ranked non-islanding outages to verify in AC (None = all).
+            Islanding outages rank first (infinite severity) and are never verified
+        rates: Optional branch ratings (pu apparent power), overrides the rate column
+        v_min, v_max: Voltage magnitude limits (pu)
+        slack: 0-based slack bus
+        tol: Convergence tolerance on the voltage update
+        max_iter: Maximum current-injection iterations per outage
+
+    Returns:
+        List of ContingencyResult in DC rank order; verified entries carry the
+        AC voltage range, voltage violations and overloaded branches
+    """
+    stamps = branch_stamps(line_data)
+    fb, tb, yff, yft, ytf, ytt = stamps
+    v_base = np.asarray(v_base, dtype=complex).ravel()
+    n = len(v_base)
+    rate = _ratings(as_line_data(line_data, exact=False), rates)
+
+    results = dc_screen(line_data, v_base, rates=rate, slack=slack)
+    if top_k is None:
+        top_k = len(results)
+
+    # A Network's own Ybus, with its bus shunts and transformer model
+    ybus = build_ybus(line_data, n_bus=n).tocsc()
+    s_spec = v_base * np.conj(ybus @ v_base)
+    ns = np.flatnonzero(np.arange(n) != slack)
+    keep_pos = np.full(n, -1)
+    keep_pos[ns] = np.arange(len(ns))
+    lu = get_cache().get_or_compute(fingerprint(ybus), "lu_reduced",
+                                    lambda: factorize_ybus(ybus[ns][:, ns]), key=slack)
+    y_ns_s = ybus[ns][:, [slack]].toarray().ravel()
+
+    for res in [r for r in results if not r.islanded][:top_k]:
+        l = res.branch - 1
+        l_ends = (fb[l], tb[l])
+        l_block = np.array([[yff[l], yft[l]], [ytf[l], ytt[l]]])
+        v, converged = _outage_voltages(lu, y_ns_s, keep_pos, l_ends, l_block, v_base,
+                                        s_spec, slack, tol, max_iter)
+        vm = np.abs(v)
+        res.verified = True
+        res.converged = converged
+        res.min_voltage = float(vm.min())
+        res.max_voltage = float(vm.max())
+        bad = np.flatnonzero((vm < v_min) | (vm > v_max))
+        res.voltage_violations = [(int(k) + 1, float(vm[k])) for k in bad]
+
+        s_from, s_to = branch_flows(*stamps, v)
+        flow = np.maximum(np.abs(s_from), np.abs(s_to))
+        flow[l] = 0.0
+        rated = rate > 0
+        loading = np.zeros(len(fb))
+        loading[rated] = flow[rated] / rate[rated]
+        over = np.flatnonzero(loading > 1.0)
+        res.overloads = [(int(m) + 1, float(loading[m])) for m in over]
+
+    return results
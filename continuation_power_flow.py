@@ -0,0 +1,207 @@
+import numpy as np
+import scipy.sparse as sp
+from dataclasses import dataclass
+from bus_ordering import OrderedLU, get_ordering, jacobian_order
+from newton_raphson import build_jacobian, newton_raphson, power_mismatch
+from network import as_ybus
+
+
+@dataclass
+class PVCurve:
+    lam: np.ndarray                       # (N,) load parameter at each traced point
+    V: np.ndarray                         # (N, n) complex bus voltages along the curve
+    max_lambda: float                     # loadability margin (largest lam reached)
+    nose_index: int                       # index of the nose point in lam / V
+    critical_bus: int                     # 0-based bus with the largest voltage drop at the nose
+    margin_p: float                       # extra active load at the nose (pu), max_lambda * load direction
+    converged: bool                       # base case solved and curve traced to the nose
+
+    def as_dict(self, max_points=40):
+        """Summary with a down-sampled PV curve (1-based buses), e.g. for JSON tool output."""
+        step = max(1, int(np.ceil(len(self.lam) / max_points)))
+        idx = np.unique(np.r_[np.arange(0, len(self.lam), step), self.nose_index, len(self.lam) - 1])
+        vm = np.abs(self.V)
+        return {
+            "max_lambda": float(self.max_lambda),
+            "margin_p": float(self.margin_p),
+            "critical_bus": self.critical_bus + 1,
+            "converged": self.converged,
+            "nose_voltages": vm[self.nose_index].round(4).tolist(),
+            "curve": [
+                {"lambda": float(self.lam[k]), "v_critical": float(vm[k, self.critical_bus]),
+                 "v_min": float(vm[k].min())}
+                for k in idx
+            ],
+        }
+
+
+def _augmented(Ybus, V, pv, pq, d_red, t, order):
+    """[J, -d; t'] for the load flow equations extended by the load parameter."""
+    J = build_jacobian(Ybus, V, pv, pq)
+    A = sp.bmat([[J, sp.csc_matrix(-d_red[:, None])],
+                 [sp.csc_matrix(t[None, :-1]), sp.csc_matrix([[t[-1]]])]], format="csc")
+    return OrderedLU(A, order)
+
+
+def continuation_power_flow(Ybus, bus_type, p_spec, q_spec, p_dir=None, q_dir=None,
+                            V_init=None, step=0.1, min_step=1e-4, max_step=0.5,
+                            nose_tol=1e-3, tol=1e-8, max_corrector=10, max_steps=500,
+                            stop_at_nose=False):
+    """
+    Trace the PV curve with a predictor-corrector continuation power flow.
+
+    Injections grow along S(lam) = S_spec + lam * S_dir. Each step predicts
+    along the tangent and corrects with Newton's method on the load flow
+    equations plus a pseudo-arclength constraint, which stays well-posed
+    at the nose. The corrector keeps the factorization of its augmented
+    Jacobian while convergence is fast, and the last one is reused to
+    compute the next tangent, so a typical step costs one factorization.
+    Steps grow after easy corrections, shrink after hard or failed ones,
+    and are refined around the nose until they are below nose_tol.
+
+    Uses the bus conventions of newton_raphson_loadflow (bus 0 is the slack,
+    bus_type 2 marks PV buses); Q limits are not enforced along the curve.
+
+    Args:
+        Ybus: (n, n) complex admittance matrix (dense or sparse) or a Network
+        bus_type: 2 = PV bus, anything else = PQ (bus 0 is the slack)
+        p_spec, q_spec: Base-case injections (pu, generation positive)
+        p_dir, q_dir: Injection growth direction (default: the base case
+            injections, i.e. all loads and generation scaled together)
+        V_init: Initial voltages of the base case (flat start if None);
+            PV and slack magnitudes are taken from it
+        step: Initial arclength step
+        min_step, max_step: Step size bounds
+        nose_tol: Step below which the nose point is accepted
+        tol: Power mismatch tolerance (pu)
+        max_corrector: Maximum corrector iterations per step
+        max_steps: Maximum number of continuation steps
+        stop_at_nose: Stop at the nose instead of tracing the lower branch
+            back down to lam = 0
+
+    Returns:
+        PVCurve
+    """
+    Ybus = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    n = Ybus.shape[0]
+    bus_type = np.asarray(bus_type)
+    is_pv = bus_type == 2
+    is_pv[0] = False
+    pv = np.flatnonzero(is_pv)
+    pq = np.flatnonzero(~is_pv)
+    pq = pq[pq != 0]
+    pvpq = np.r_[pv, pq]
+    n_a = len(pvpq)
+
+    S0 = np.asarray(p_spec, dtype=float) + 1j * np.asarray(q_spec, dtype=float)
+    d = S0 if p_dir is None and q_dir is None else (
+        np.zeros(n) if p_dir is None else np.asarray(p_dir, dtype=float)) + 1j * (
+        np.zeros(n) if q_dir is None else np.asarray(q_dir, dtype=float))
+    d_red = np.r_[d[pvpq].real, d[pq].imag]
+    # Buses in minimum degree order, the (dense) load parameter row/column last
+    order = np.r_[jacobian_order(get_ordering(Ybus), pv, pq), n_a + len(pq)]
+
+    V0 = np.ones(n, dtype=complex) if V_init is None else np.array(V_init, dtype=complex)
+    V, converged, _ = newton_raphson(Ybus, V0, pv, pq, S0, tol=tol)
+    Va_fixed, Vm_fixed = np.angle(V), np.abs(V)
+
+    def voltages(z):
+        Va = Va_fixed.copy()
+        Vm = Vm_fixed.copy()
+        Va[pvpq] = z[:n_a]
+        Vm[pq] = z[n_a:-1]
+        return Vm * np.exp(1j * Va)
+
+    def residual(z, V):
+        mis = power_mismatch(Ybus, V, S0 + z[-1] * d)
+        return np.r_[mis[pvpq].real, mis[pq].imag]
+
+    lam_path = [0.0]
+    V_path = [V]
+    if not converged:
+        return PVCurve(np.array(lam_path), np.array(V_path), 0.0, 0, 0, 0.0, False)
+
+    z = np.r_[np.angle(V)[pvpq], np.abs(V)[pq], 0.0]
+    t = np.zeros(len(z))
+    t[-1] = 1.0
+    lu = _augmented(Ybus, V, pv, pq, d_red, t, order)
+    sigma = step
+    nose_done = False
+    reached_nose = False
+
+    for _ in range(max_steps):
+        # Predictor: tangent from the last factorization, oriented along the path
+        e = np.zeros(len(z))
+        e[-1] = 1.0
+        t_new = lu.solve(e)
+        t_new /= np.linalg.norm(t_new)
+        if t_new @ t < 0:
+            t_new = -t_new
+        if len(lam_path) == 1:
+            t_lam0 = t_new[-1]
+
+        accepted = False
+        while sigma >= min_step:
+            z_pred = z + sigma * t_new
+            z_c = z_pred.copy()
+            V_c = voltages(z_c)
+            lu_c = _augmented(Ybus, V_c, pv, pq, d_red, t_new, order)
+            F = residual(z_c, V_c)
+            norm_prev = np.inf
+            for it in range(max_corrector):
+                norm = np.max(np.abs(F))
+                if norm < tol:
+                    accepted = True
+                    break
+                if norm > 0.5 * norm_prev:
+                    # Slow chord convergence: refactor at the current iterate
+                    lu_c = _augmented(Ybus, V_c, pv, pq, d_red, t_new, order)
+                norm_prev = norm
+                z_c = z_c - lu_c.solve(np.r_[F, t_new @ (z_c - z_pred)])
+                if not np.all(np.isfinite(z_c)) or np.any(z_c[n_a:-1] <= 0):
+                    break
+                V_c = voltages(z_c)
+                F = residual(z_c, V_c)
+            if accepted:
+                break
+            sigma /= 2
+
+        if not accepted:
+            break
+
+        # Tangent at the new point decides whether the nose was passed
+        e = np.zeros(len(z))
+        e[-1] = 1.0
+        t_next = lu_c.solve(e)
+        t_next /= np.linalg.norm(t_next)
+        if t_next @ t_new < 0:
+            t_next = -t_next
+        if not nose_done and t_next[-1] < 0 < t_new[-1] and sigma > nose_tol:
+            # Nose overshot with a coarse step: retry from the last point
+            sigma = max(sigma / 4, min_step)
+            continue
+
+        z, t, lu = z_c, t_new, lu_c
+        lam_path.append(z[-1])
+        V_path.append(V_c)
+        if not nose_done and t_next[-1] < 0:
+            nose_done = reached_nose = True
+            if stop_at_nose:
+                break
+
+        if z[-1] < 0:
+            break
+        sigma = min(max_step, sigma * 2) if it <= 3 else max(min_step, sigma / 2)
+        if not nose_done and abs(t_next[-1]) < 0.1 * t_lam0:
+            # Approaching the nose: keep the step fine enough to locate it
+            sigma = min(sigma, 10 * nose_tol)
+
+    lam = np.array(lam_path)
+    V_path = np.array(V_path)
+    nose = int(np.argmax(lam))
+    drop = np.abs(V_path[0]) - np.abs(V_path[nose])
+    load = -d.real[d.real < 0].sum()
+
+    return PVCurve(lam=lam, V=V_path, max_lambda=float(lam[nose]), nose_index=nose,
+                   critical_bus=int(np.argmax(drop)), margin_p=float(lam[nose] * load),
+                   converged=reached_nose)
@@ -0,0 +1,147 @@
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class DispatchResult:
+    demand: np.ndarray                    # (K,) demand levels (MW)
+    lam: np.ndarray                       # (K,) system incremental cost lambda
+    p: np.ndarray                         # (K, m) unit outputs (MW)
+    losses: np.ndarray                    # (K,) transmission losses (MW)
+    cost: np.ndarray                      # (K,) total generation cost
+    converged: np.ndarray                 # (K,) power balance met within tol
+    feasible: np.ndarray                  # (K,) demand within the fleet's Pmin/Pmax range
+
+    def as_rows(self):
+        """One dict per demand level, e.g. for JSON tool output."""
+        return [
+            {
+                "demand": float(self.demand[k]),
+                "lambda": float(self.lam[k]),
+                "p": self.p[k].round(4).tolist(),
+                "losses": float(self.losses[k]),
+                "cost": float(self.cost[k]),
+                "converged": bool(self.converged[k]),
+                "feasible": bool(self.feasible[k]),
+            }
+            for k in range(len(self.demand))
+        ]
+
+
+def _losses(p, B, B0, B00):
+    """Kron loss formula P' B P + B0' P + B00 for each row of p."""
+    if B is None:
+        return np.zeros(len(p))
+    return np.einsum("ki,ij,kj->k", p, B, p) + p @ B0 + B00
+
+
+def _unit_outputs(lam, alpha, beta, p_min, p_max, B, B0, p, tol, max_iter):
+    """
+    Unit outputs meeting the coordination equations for each lambda.
+
+    alpha_i P_i + beta_i = lambda (1 - dPL/dP_i), dPL/dP_i = 2 (B P)_i + B0_i,
+    solved for all units and all lambdas at once by the same fixed-point
+    update as point_by_point.m (losses from the other units held at their
+    last value), with outputs clamped to [p_min, p_max].
+    """
+    lam = lam[:, None]
+    if B is None:
+        return np.clip((lam - beta) / alpha, p_min, p_max)
+
+    b_ii = np.diag(B)
+    for _ in range(max_iter):
+        sigma = p @ B.T - p * b_ii
+        p_new = np.clip((lam * (1 - B0 - 2 * sigma) - beta) / (alpha + 2 * lam * b_ii),
+                        p_min, p_max)
+        done = np.max(np.abs(p_new - p), initial=0.0) < tol
+        p = p_new
+        if done:
+            break
+    return p
+
+
+def economic_dispatch(alpha, beta, p_min, p_max, demand, B=None, B0=None, B00=0.0,
+                      gamma=None, tol=1e-6, max_iter=100):
+    """
+    Economic dispatch of a generator fleet with optional B-coefficient losses.
+
+    Native, vectorized replacement for matlab_scripts/point_by_point.m. Unit
+    incremental costs are alpha_i P_i + beta_i (cost 0.5 alpha P^2 + beta P
+    + gamma). Lambda is found by Newton steps on the power balance, kept
+    inside a [lambda_lo, lambda_hi] bracket and replaced by bisection
+    whenever they leave it. With an array of demands every level is solved
+    together, which gives the whole incremental-cost curve in one call.
+
+    Args:
+        alpha, beta: (m,) incremental cost coefficients
+        p_min, p_max: (m,) unit limits (MW)
+        demand: Demand (MW), scalar or (K,) array of levels
+        B: Optional (m, m) loss coefficient matrix (1/MW)
+        B0: Optional (m,) linear loss coefficients
+        B00: Constant loss term (MW)
+        gamma: Optional (m,) no-load cost terms
+        tol: Power balance tolerance (MW)
+        max_iter: Maximum lambda iterations
+
+    Returns:
+        DispatchResult with one row per demand level
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    beta = np.asarray(beta, dtype=float)
+    p_min = np.asarray(p_min, dtype=float) * np.ones_like(alpha)
+    p_max = np.asarray(p_max, dtype=float) * np.ones_like(alpha)
+    demand = np.atleast_1d(np.asarray(demand, dtype=float))
+    K = len(demand)
+    if B is not None:
+        B = np.asarray(B, dtype=float)
+        B0 = np.zeros_like(alpha) if B0 is None else np.asarray(B0, dtype=float)
+
+    def balance(lam, p):
+        p = _unit_outputs(lam, alpha, beta, p_min, p_max, B, B0, p, tol * 1e-3, 200)
+        losses = _losses(p, B, B0, B00)
+        return p, losses, p.sum(axis=1) - demand - losses
+
+    # Bracket lambda: at lo every unit is at or below the cost of its
+    # minimum output, hi is raised until the fleet covers demand + losses
+    lo = np.full(K, np.min(alpha * p_min + beta))
+    hi = np.full(K, np.max(alpha * np.minimum(p_max, demand.max()) + beta))
+    p = np.tile(p_min, (K, 1))
+    p_hi, _, g_hi = balance(hi, p.copy())
+    for _ in range(60):
+        short = (g_hi < 0) & ~np.all(p_hi >= p_max, axis=1)
+        if not short.any():
+            break
+        hi = np.where(short, 2 * hi, hi)
+        p_hi, _, g_hi = balance(hi, p_hi)
+    _, _, g_lo = balance(lo, p.copy())
+    feasible = (g_hi >= -tol) & (g_lo <= tol)
+
+    lam = 0.5 * (lo + hi)
+    converged = np.zeros(K, dtype=bool)
+    for _ in range(max_iter):
+        p, losses, g = balance(lam, p)
+        converged = np.abs(g) < tol
+        if (converged | ~feasible).all():
+            break
+        lo = np.where(g < 0, lam, lo)
+        hi = np.where(g > 0, lam, hi)
+
+        # d(balance)/d(lambda) through the units that are not at a limit
+        pf = 1 - (2 * p @ B.T + B0 if B is not None else 0.0)
+        b_ii = np.diag(B) if B is not None else 0.0
+        free = (p > p_min) & (p < p_max)
+        slope = np.sum(free * pf ** 2 / (alpha + 2 * lam[:, None] * b_ii), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = lam - g / slope
+        inside = (slope > 0) & (newton > lo) & (newton < hi)
+        lam = np.where(converged, lam, np.where(inside, newton, 0.5 * (lo + hi)))
+    else:
+        p, losses, g = balance(lam, p)
+        converged = np.abs(g) < tol
+
+    cost = np.sum(0.5 * alpha * p ** 2 + beta * p, axis=1)
+    if gamma is not None:
+        cost += np.sum(gamma)
+
+    return DispatchResult(demand=demand, lam=lam, p=p, losses=losses, cost=cost,
+                          converged=converged & feasible, feasible=feasible)
@@ -0,0 +1,158 @@
+import dataclasses
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+def fingerprint(ybus):
+    """
+    Hash a network matrix by its sparse structure and values.
+
+    Dense and sparse inputs holding the same matrix get the same fingerprint.
+
+    Args:
+        ybus: (n, n) matrix, dense or scipy sparse
+
+    Returns:
+        Hex digest string
+    """
+    Y = sp.csr_matrix(ybus, dtype=complex, copy=True)
+    Y.sum_duplicates()
+    Y.eliminate_zeros()
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.asarray(Y.shape, dtype=np.int64).tobytes())
+    h.update(Y.indptr.astype(np.int64).tobytes())
+    h.update(Y.indices.astype(np.int64).tobytes())
+    h.update(Y.data.tobytes())
+    return h.hexdigest()
+
+
+def _nbytes(value):
+    """Rough memory footprint of a cached artifact."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if sp.issparse(value):
+        value = value.tocsr()
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if hasattr(value, "nnz") and hasattr(value, "perm_r"):
+        # SuperLU: L+U entries (counted as complex) with row indices, plus permutations
+        return value.nnz * 20 + 16 * value.shape[0]
+    if hasattr(value, "nbytes"):
+        # Objects that report their own footprint (e.g. network.Network)
+        return int(value.nbytes)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        # e.g. radial_sweep.RadialFeeder: its arrays and factors
+        return sum(_nbytes(getattr(value, f.name)) for f in dataclasses.fields(value))
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 64
+
+
+def _frozen(value):
+    """
+    Read-only copy of the arrays of a cached artifact.
+
+    The cache keeps its own copy of every ndarray (also inside tuples), so a
+    caller that edits the array it stored or got back can't change later
+    warm starts or Zbus columns; writing to a cached array raises instead.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    if isinstance(value, tuple):
+        return tuple(_frozen(v) for v in value)
+    return value
+
+
+class FactorCache:
+    """
+    Process-wide LRU store of artifacts derived from a network matrix
+    (sparse LU factors, Zbus columns, B'/B'' factors, converged voltages).
+
+    Entries are keyed by (fingerprint, kind, key) and evicted least recently
+    used first once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, fp, kind, key=None):
+        """Return the cached artifact or None (counts a hit or a miss)."""
+        with self._lock:
+            entry = self._entries.get((fp, kind, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((fp, kind, key))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, fp, kind, value, key=None):
+        """
+        Store an artifact, evicting least recently used entries if needed.
+
+        Arrays are stored as read-only copies (see _frozen); the stored value
+        is returned.
+        """
+        value = _frozen(value)
+        size = _nbytes(value)
+        with self._lock:
+            old = self._entries.pop((fp, kind, key), None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[(fp, kind, key)] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, fp, kind, compute, key=None):
+        """Return the cached artifact, computing and storing it on a miss."""
+        value = self.get(fp, kind, key)
+        if value is None:
+            value = self.put(fp, kind, compute(), key)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_CACHE = FactorCache()
+
+
+def get_cache():
+    """The shared process-wide FactorCache."""
+    return _CACHE
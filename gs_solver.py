@@ -1,34 +1,182 @@
 import numpy as np
+import scipy.sparse as sp
+from network import as_ybus
 
-def gauss_seidel(Ybus, P, V_init=None, tol=1e-4, max_iter=100):
+
+def _csr_rows(Ybus):
+    """
+    Split Ybus into per-row lists of off-diagonal (column, value) pairs and
+    the diagonal, so a sweep only touches the nonzeros of each row.
+    """
+    Y = sp.csr_matrix(Ybus, dtype=complex)
+    Y.sort_indices()
+    indptr, indices, data = Y.indptr, Y.indices.tolist(), Y.data.tolist()
+    n = Y.shape[0]
+    rows = []
+    diag = [0j] * n
+    for i in range(n):
+        entries = []
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if j == i:
+                diag[i] = data[k]
+            else:
+                entries.append((j, data[k]))
+        rows.append(entries)
+    return rows, diag
+
+
+def _sweep(rows, diag, P, V, omega):
+    """
+    One in-place Gauss-Seidel (SOR when omega != 1) sweep over the PQ buses.
+    Returns the largest voltage change of the sweep.
+    """
+    max_dv = 0.0
+    for i in range(1, len(V)):
+        sigma = 0
+        for j, y in rows[i]:
+            sigma += y * V[j]
+        v_old = V[i]
+        v_gs = (1 / diag[i]) * ((P[i] / v_old.conjugate()) - sigma)
+        v_new = v_old + omega * (v_gs - v_old) if omega != 1.0 else v_gs
+        V[i] = v_new
+        dv = abs(v_new - v_old)
+        if dv > max_dv:
+            max_dv = dv
+    return max_dv
+
+
+def gauss_seidel(Ybus, P, V_init=None, tol=1e-4, max_iter=100, omega=1.0,
+                 auto_tune=False, max_tune=3):
     """
     Gauss-Seidel power flow for PQ buses (no PV).
-    - Ybus: (n, n) complex numpy array for bus admittance matrix.
+    - Ybus: (n, n) complex numpy array or scipy sparse matrix for bus admittance matrix, or a Network.
     - P: (n,) complex numpy array for net complex bus power injections (negative for loads, positive for generations).
     - V_init: (n,) complex numpy array, initial bus voltages.
     - tol: convergence (default 1e-4).
     - max_iter: max iterations.
+    - omega: successive over-relaxation factor (1.0 = plain Gauss-Seidel).
+    - auto_tune: if the sweeps do not converge within max_iter, pick a new
+      omega from the observed contraction rate (or damp it if the iteration
+      diverged) and try again, up to max_tune times.
 
     Assumes bus 0 is the slack/reference bus: its voltage is fixed!
+    Each sweep only visits the nonzeros of Ybus, so the cost per sweep is
+    O(nnz) instead of O(n^2).
     """
 
     n = len(P)
     # Initial bus voltages: default 1.0+0j (flat start)
     if V_init is None:
-        V = np.ones(n, dtype=complex)
+        V0 = [1.0 + 0j] * n
     else:
-        V = V_init.copy()
-
-    for _ in range(max_iter):
-        V_prev = V.copy()
-        for i in range(n):
-            if i == 0:
-                # Slack bus stays fixed
-                continue
-            sigma = sum(Ybus[i, j] * V[j] for j in range(n) if j != i)
-            # Gauss-Seidel update for bus i (PQ type)
-            V[i] = (1 / Ybus[i, i]) * ((P[i] / np.conj(V[i])) - sigma)
-        # Convergence check
-        if np.max(np.abs(V - V_prev)) < tol:
+        V0 = [complex(v) for v in V_init]
+
+    rows, diag = _csr_rows(as_ybus(Ybus))
+    P = [complex(p) for p in P]
+    V = list(V0)
+
+    n_rounds = max_tune + 1 if auto_tune else 1
+    for attempt in range(n_rounds):
+        errors = []
+        for _ in range(max_iter):
+            errors.append(_sweep(rows, diag, P, V, omega))
+            # Convergence check
+            if errors[-1] < tol:
+                return np.array(V, dtype=complex)
+
+        if attempt == n_rounds - 1:
             break
-    return V
+
+        if len(errors) < 3 or not np.isfinite(errors[-1]):
+            rate = np.inf
+        else:
+            rate = errors[-1] / errors[-2]
+
+        if rate >= 1.0:
+            # Diverging (or stalled): pull the factor back towards (and below)
+            # plain Gauss-Seidel and restart from the initial voltages
+            omega = 1.0 + 0.5 * (omega - 1.0) if omega > 1.0 else 0.7 * omega
+            V = list(V0)
+        else:
+            # Young's estimate of the optimal factor from the observed
+            # contraction rate, kept conservative since the problem is nonlinear
+            rho_gs = min(0.99, ((rate + omega - 1) / omega) ** 2 / rate)
+            omega = min(1.9, 2.0 / (1.0 + np.sqrt(1.0 - rho_gs)))
+
+    return np.array(V, dtype=complex)
+
+
+def gauss_seidel_batch(Ybus, P, V_init=None, tol=1e-4, max_iter=100, omega=1.0):
+    """
+    Gauss-Seidel power flow for many load scenarios on the same network.
+    - Ybus: (n, n) complex numpy array or scipy sparse matrix for bus admittance matrix, or a Network.
+    - P: (S, n) complex numpy array, one row of net bus injections per scenario
+      (same convention as gauss_seidel).
+    - V_init: (n,) or (S, n) complex initial voltages (flat start if None).
+    - tol, max_iter, omega: as in gauss_seidel, applied per scenario.
+
+    All scenarios are swept together, bus by bus, with NumPy operations across
+    the scenario axis. Each scenario is checked for convergence after every
+    sweep and converged scenarios are dropped from the working set, so the
+    remaining sweeps only pay for the stragglers.
+
+    Returns:
+        V: (S, n) complex array of bus voltages
+        iters: (S,) number of sweeps each scenario needed
+        converged: (S,) boolean convergence flags
+    """
+    P = np.atleast_2d(np.asarray(P, dtype=complex))
+    n_scen, n = P.shape
+
+    if V_init is None:
+        V = np.ones((n_scen, n), dtype=complex)
+    else:
+        V = np.array(np.broadcast_to(V_init, (n_scen, n)), dtype=complex)
+
+    Y = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    Y.sort_indices()
+    indptr, indices, data = Y.indptr, Y.indices, Y.data
+    diag = Y.diagonal()
+    off_cols = []
+    off_vals = []
+    for i in range(n):
+        cols = indices[indptr[i]:indptr[i + 1]]
+        keep = cols != i
+        off_cols.append(cols[keep])
+        off_vals.append(data[indptr[i]:indptr[i + 1]][keep])
+
+    iters = np.full(n_scen, max_iter, dtype=int)
+    converged = np.zeros(n_scen, dtype=bool)
+
+    # Working set stored bus-major so each bus update reads contiguous rows
+    active = np.arange(n_scen)
+    Vt = V.T.copy()
+    Pt = P.T.copy()
+
+    for k in range(1, max_iter + 1):
+        max_dv = np.zeros(len(active))
+        for i in range(1, n):
+            sigma = off_vals[i] @ Vt[off_cols[i]]
+            v_old = Vt[i]
+            v_gs = (1 / diag[i]) * ((Pt[i] / np.conj(v_old)) - sigma)
+            v_new = v_old + omega * (v_gs - v_old) if omega != 1.0 else v_gs
+            np.maximum(max_dv, np.abs(v_new - v_old), out=max_dv)
+            Vt[i] = v_new
+
+        done = max_dv < tol
+        if done.any():
+            V[active[done]] = Vt[:, done].T
+            iters[active[done]] = k
+            converged[active[done]] = True
+            keep = ~done
+            active = active[keep]
+            Vt = Vt[:, keep]
+            Pt = Pt[:, keep]
+            if len(active) == 0:
+                break
+
+    if len(active):
+        V[active] = Vt.T
+
+    return V, iters, converged
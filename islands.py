@@ -0,0 +1,190 @@
+import numpy as np
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+from newton_raphson import newton_raphson_loadflow, solution_converged
+from network import as_line_data, as_ybus
+
+
+@dataclass
+class Island:
+    buses: np.ndarray                     # 0-based buses of the island, ascending
+    slack: int                            # 0-based slack bus (-1 for a dead island)
+    status: str                           # "solved", "not_converged" or "dead"
+    reason: str = ""                      # why the slack was assigned or the island is dead
+
+    def as_dict(self):
+        return {
+            "buses": (self.buses + 1).tolist(),
+            "slack": self.slack + 1 if self.slack >= 0 else None,
+            "status": self.status,
+            "reason": self.reason,
+        }
+
+
+@dataclass
+class IslandSolution:
+    V: np.ndarray                         # (n,) complex voltages (0 on dead islands)
+    labels: np.ndarray                    # (n,) island index of every bus
+    islands: list                         # Island per label
+
+    @property
+    def converged(self):
+        return all(isl.status != "not_converged" for isl in self.islands)
+
+    def as_rows(self):
+        """One dict per island (1-based buses), e.g. for JSON tool output."""
+        return [isl.as_dict() for isl in self.islands]
+
+
+def union_find(from_bus, to_bus, n_bus):
+    """
+    Connected components of a branch list by union-find.
+
+    Uses union by size with path halving, so the pass is close to linear in
+    the number of branches.
+
+    Args:
+        from_bus, to_bus: 0-based end buses of every branch
+        n_bus: Number of buses
+
+    Returns:
+        (n_bus,) island labels numbered 0, 1, ... in order of their lowest bus
+    """
+    parent = list(range(n_bus))
+    size = [1] * n_bus
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in zip(np.asarray(from_bus).tolist(), np.asarray(to_bus).tolist()):
+        ra, rb = find(int(a)), find(int(b))
+        if ra == rb:
+            continue
+        if size[ra] < size[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        size[ra] += size[rb]
+
+    roots = np.array([find(i) for i in range(n_bus)], dtype=np.int64)
+    # Relabel by first appearance so bus 0 is always in island 0
+    _, first, labels = np.unique(roots, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first))[labels]
+
+
+def find_islands(line_data, n_bus=None):
+    """
+    Island labels of a network given as branch rows [from_bus, to_bus, ...] (1-based).
+
+    Returns:
+        (n_bus,) 0-based island label of every bus
+    """
+    line_data = np.asarray(as_line_data(line_data, exact=False), dtype=float)
+    fb = line_data[:, 0].astype(np.int64) - 1
+    tb = line_data[:, 1].astype(np.int64) - 1
+    if n_bus is None:
+        n_bus = int(max(fb.max(), tb.max())) + 1
+    return union_find(fb, tb, n_bus)
+
+
+def ybus_islands(Ybus):
+    """Island labels of a network given as its Ybus (nonzero off-diagonals are branches)."""
+    Y = sp.coo_matrix(Ybus)
+    keep = (Y.row < Y.col) & (Y.data != 0)
+    return union_find(Y.row[keep], Y.col[keep], Y.shape[0])
+
+
+def _assign_slack(buses, bus_type, p_spec, q_spec):
+    """Slack bus of an island and the reason, or (-1, reason) for a dead island."""
+    if buses[0] == 0:
+        return 0, "system slack"
+    pv = buses[bus_type[buses] == 2]
+    if len(pv):
+        return int(pv[np.argmax(p_spec[pv])]), "largest PV generator"
+    if np.max(p_spec[buses]) > 0:
+        return int(buses[np.argmax(p_spec[buses])]), "largest generating bus"
+    if np.any(p_spec[buses] != 0) or np.any(q_spec[buses] != 0):
+        return -1, "no generation to supply the load"
+    return -1, "no generation or load"
+
+
+def _solve_island(task):
+    solver, Ybus, bus_type, p_spec, q_spec, q_min, q_max, V_init, tol, max_iter = task
+    V = solver(Ybus, bus_type, p_spec, q_spec, q_min, q_max, V_init, tol=tol, max_iter=max_iter)
+    return V, solution_converged(Ybus, V, bus_type, p_spec + 1j * q_spec, tol)
+
+
+def solve_islands(Ybus, bus_type, p_spec, q_spec, q_min=None, q_max=None, V_init=None,
+                  tol=1e-6, max_iter=100, solver=newton_raphson_loadflow, workers=None):
+    """
+    Load flow of a possibly split network, one island at a time.
+
+    Islands are found by union-find over the Ybus branches. Every live island
+    gets its own slack: bus 0 for the island that holds it, otherwise the PV
+    bus with the largest active generation (or, without PV buses, the bus
+    with the largest active injection), held at its V_init magnitude and
+    zero angle. Islands without any generation are dead and reported at
+    once with zero voltage instead of being iterated on. The live islands
+    are solved independently, on a process pool when there are several.
+
+    Args:
+        Ybus: (n, n) complex admittance matrix (dense or scipy sparse) or a Network
+        bus_type, p_spec, q_spec, q_min, q_max, V_init, tol, max_iter: As for
+            gauss_seidel_loadflow / newton_raphson_loadflow (bus 0 is the slack)
+        solver: Load flow function with that interface, run on each island
+            with its slack renumbered to bus 0 (must be picklable for workers > 1)
+        workers: Number of worker processes (default os.cpu_count(); 1 solves
+            in this process)
+
+    Returns:
+        IslandSolution
+    """
+    Ybus = as_ybus(Ybus)
+    dense = not sp.issparse(Ybus)
+    Y = np.asarray(Ybus, dtype=complex) if dense else sp.csr_matrix(Ybus, dtype=complex)
+    n = Y.shape[0]
+    bus_type = np.asarray(bus_type)
+    p_spec = np.asarray(p_spec, dtype=float)
+    q_spec = np.asarray(q_spec, dtype=float)
+    q_min = np.array([]) if q_min is None else np.asarray(q_min, dtype=float)
+    q_max = np.array([]) if q_max is None else np.asarray(q_max, dtype=float)
+    V_init = np.ones(n, dtype=complex) if V_init is None or len(V_init) == 0 else np.asarray(V_init, dtype=complex)
+
+    labels = ybus_islands(Y)
+    islands, tasks = [], []
+    for k in range(labels.max() + 1):
+        buses = np.flatnonzero(labels == k)
+        slack, reason = _assign_slack(buses, bus_type, p_spec, q_spec)
+        islands.append(Island(buses=buses, slack=slack, status="dead" if slack < 0 else "solved",
+                              reason=reason))
+        if slack < 0:
+            continue
+        # Renumber the island with its slack first
+        idx = np.r_[slack, buses[buses != slack]]
+        Y_isl = Y[np.ix_(idx, idx)] if dense else Y[idx][:, idx]
+        V0 = V_init[idx].copy()
+        V0[0] = abs(V0[0])
+        tasks.append((k, idx, (solver, Y_isl, bus_type[idx], p_spec[idx], q_spec[idx],
+                               q_min[idx] if len(q_min) else q_min,
+                               q_max[idx] if len(q_max) else q_max, V0, tol, max_iter)))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        results = [_solve_island(t) for _, _, t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_island, [t for _, _, t in tasks]))
+
+    V = np.zeros(n, dtype=complex)
+    for (k, idx, _), (V_isl, converged) in zip(tasks, results):
+        V[idx] = V_isl
+        if not converged:
+            islands[k].status = "not_converged"
+
+    return IslandSolution(V=V, labels=labels, islands=islands)
@@ -1,6 +1,214 @@
-import matlab.engine
 import numpy as np
 import os
+import scipy.sparse as sp
+from bus_ordering import OrderedLU, get_ordering, jacobian_order
+from newton_raphson import build_jacobian, newton_raphson
+from network import as_ybus
+from ybus_builder import branch_stamps
+
+
+def branch_losses(ybus, v, line_data=None):
+    """
+    Real power loss of every branch.
+
+    With line_data (branch rows or a Network) the loss of each branch is
+    real(S_from + S_to) from its own two-port stamps (ybus_builder.branch_stamps),
+    so parallel circuits, tapped transformers and line charging are reported
+    exactly. Without it, branches are recovered from the off-diagonal entries
+    of Ybus (series admittance y_ij = -Y_ij) and the loss of branch i-j is
+    approximated as real(y_ij) * |V_i - V_j|^2: parallel circuits merge into
+    one row and off-nominal taps are not accounted for.
+
+    Args:
+        ybus: (n, n) complex Ybus, dense or scipy sparse.
+        v: (n,) complex bus voltages.
+        line_data: Optional branch rows [from_bus, to_bus, R, X, a, shunt] or a Network.
+
+    Returns:
+        Tuple (from_bus, to_bus, loss) of arrays, 0-based bus indices.
+    """
+    v = np.asarray(v).ravel()
+    if line_data is not None:
+        fb, tb, yff, yft, ytf, ytt = branch_stamps(line_data)
+        s_from = v[fb] * np.conj(yff * v[fb] + yft * v[tb])
+        s_to = v[tb] * np.conj(ytf * v[fb] + ytt * v[tb])
+        return fb, tb, np.real(s_from + s_to)
+    off = sp.triu(sp.csr_matrix(ybus), k=1).tocoo()
+    loss = np.real(-off.data) * np.abs(v[off.row] - v[off.col]) ** 2
+    return off.row, off.col, loss
+
+
+def _pv_pq(ybus_np, bus_type, n):
+    """PV and PQ buses (bus 0 is the slack) from bus types, or a Network's own types."""
+    if bus_type is None and hasattr(ybus_np, "loadflow_inputs"):
+        bus_type = ybus_np.loadflow_inputs()["bus_type"]
+    others = np.arange(1, n)
+    if bus_type is None:
+        return others[:0], others
+    pv_mask = np.asarray(bus_type)[1:] == 2
+    return others[pv_mask], others[~pv_mask]
+
+
+def study_new_load(ybus_np, v_np, new_load, bus_at_py, bus_type=None, line_data=None, tol=1e-8,
+                   max_iter=20):
+    """
+    Add a load at one bus, re-solve the power flow and report the losses.
+
+    The specified injections of every bus are taken from the given solved
+    voltage profile (S = V .* conj(Ybus V)); the new load is subtracted at
+    bus_at_py and the case is re-solved with Newton-Raphson, warm-started
+    from v_np. Bus 0 is the slack bus; PV buses keep their P and voltage
+    magnitude, all other buses their P and Q.
+
+    Args:
+        ybus_np (np.ndarray): The (n, n) complex Y-bus matrix (dense or sparse) or a Network.
+        v_np (np.ndarray): The (n,) solved voltages before adding the load.
+        new_load (complex): The new load value (e.g., 1.0 + 0.5j for 1pu P, 0.5pu Q).
+        bus_at_py (int): The 0-based Python index of the bus.
+        bus_type (array-like): Optional bus types (2 = PV, anything else = PQ);
+            defaults to the types of a Network, else every bus is PQ.
+        line_data: Optional branch rows for exact per-branch losses (see
+            branch_losses); a Network gives its own branches.
+        tol (float): Power mismatch tolerance of the re-solve.
+        max_iter (int): Maximum Newton iterations.
+
+    Returns:
+        dict with total_loss, branch_losses (list of from/to/loss rows,
+        1-based bus numbers), voltages and converged.
+    """
+    ybus = sp.csr_matrix(as_ybus(ybus_np), dtype=complex)
+    v = np.asarray(v_np, dtype=complex).ravel()
+    n = len(v)
+    pv, pq = _pv_pq(ybus_np, bus_type, n)
+
+    s_spec = v * np.conj(ybus @ v)
+    s_spec[bus_at_py] -= new_load
+
+    v_new, converged, _ = newton_raphson(ybus, v, pv, pq, s_spec, tol, max_iter)
+
+    total_loss = float(np.real(np.sum(v_new * np.conj(ybus @ v_new))))
+    if line_data is None and hasattr(ybus_np, "branch_admittances"):
+        line_data = ybus_np
+    fb, tb, loss = branch_losses(ybus, v_new, line_data)
+
+    return {
+        "total_loss": total_loss,
+        "branch_losses": [
+            {"from_bus": int(f) + 1, "to_bus": int(t) + 1, "loss": float(l)}
+            for f, t, l in zip(fb, tb, loss)
+        ],
+        "voltages": v_new,
+        "converged": bool(converged),
+    }
+
+
+def _sweep_block(ybus, v, pv, pq, lu, s_base, new_load, buses, tol, max_iter, max_chord):
+    """
+    Re-solve a block of candidate sites together.
+
+    Column k holds the base-case injections with the new load at buses[k].
+    Chord (fixed Jacobian) iterations on the base-case factors advance every
+    column with one sparse product and one multi-column solve, as in
+    probabilistic_load_flow; columns that have not converged after
+    max_chord iterations are finished with a full Newton-Raphson solve.
+
+    Returns:
+        (V, converged): (n, k) voltages and (k,) flags
+    """
+    pvpq = np.r_[pv, pq]
+    m = len(pvpq)
+    k = len(buses)
+    S = np.repeat(s_base[:, None], k, axis=1)
+    S[buses, np.arange(k)] -= new_load
+    Va = np.repeat(np.angle(v)[:, None], k, axis=1)
+    Vm = np.repeat(np.abs(v)[:, None], k, axis=1)
+    V = Vm * np.exp(1j * Va)
+    active = np.arange(k)
+    for _ in range(max_chord):
+        V_a = Vm[:, active] * np.exp(1j * Va[:, active])
+        mis = V_a * np.conj(ybus @ V_a) - S[:, active]
+        F = np.vstack([mis[pvpq].real, mis[pq].imag])
+        done = np.max(np.abs(F), axis=0, initial=0.0) < tol
+        V[:, active[done]] = V_a[:, done]
+        active, F = active[~done], F[:, ~done]
+        if len(active) == 0:
+            break
+        dx = -lu.solve(F)
+        Va[np.ix_(pvpq, active)] += dx[:m]
+        Vm[np.ix_(pq, active)] += dx[m:]
+
+    converged = np.ones(k, dtype=bool)
+    for c in active:
+        V[:, c], converged[c], _ = newton_raphson(ybus, v, pv, pq, S[:, c], tol, max_iter)
+    converged &= np.all(np.isfinite(V), axis=0)
+    return V, converged
+
+
+def sweep_new_load(ybus_np, v_np, new_load, candidate_buses=None, bus_type=None, tol=1e-8,
+                   max_iter=20, max_chord=15, block_size=256):
+    """
+    Evaluate the same new load at every candidate bus and rank the sites.
+
+    The Jacobian at v_np is factored once (in the cached bus ordering of the
+    network) and all candidates are re-solved together from it in blocks of
+    block_size columns (see _sweep_block): a single new load moves the
+    operating point little, so most sites converge in a few chord iterations
+    and only the rest need their own Newton-Raphson solve. Every site meets
+    the same mismatch tolerance as study_new_load, so both tools agree on a
+    bus to within it.
+
+    Args:
+        ybus_np (np.ndarray): The (n, n) complex Y-bus matrix (dense or sparse) or a Network.
+        v_np (np.ndarray): The (n,) solved voltages before adding the load.
+        new_load (complex): The new load value.
+        candidate_buses (list[int]): 0-based candidate buses (default: all
+            non-slack buses).
+        bus_type (array-like): Optional bus types, as in study_new_load.
+        tol (float): Power mismatch tolerance of the re-solves.
+        max_iter (int): Maximum Newton iterations of a candidate that the
+            chord iterations leave unconverged.
+        max_chord (int): Fixed-Jacobian iterations before the Newton fallback.
+        block_size (int): Candidates solved together.
+
+    Returns:
+        List of dicts (bus as 1-based number, total_loss, loss_increase,
+        min_voltage, converged), converged candidates first from lowest to
+        highest total loss, then the candidates whose re-solve failed.
+    """
+    ybus = sp.csr_matrix(as_ybus(ybus_np), dtype=complex)
+    v = np.asarray(v_np, dtype=complex).ravel()
+    n = len(v)
+    pv, pq = _pv_pq(ybus_np, bus_type, n)
+    if candidate_buses is None:
+        candidate_buses = np.arange(1, n)
+    candidate_buses = np.asarray(candidate_buses, dtype=int)
+
+    s_base = v * np.conj(ybus @ v)
+    base_loss = float(np.real(np.sum(s_base)))
+    lu = OrderedLU(build_jacobian(ybus, v, pv, pq), jacobian_order(get_ordering(ybus), pv, pq))
+
+    losses = np.empty(len(candidate_buses))
+    min_voltage = np.empty(len(candidate_buses))
+    converged = np.zeros(len(candidate_buses), dtype=bool)
+    for start in range(0, len(candidate_buses), block_size):
+        block = slice(start, start + block_size)
+        V, converged[block] = _sweep_block(ybus, v, pv, pq, lu, s_base, new_load,
+                                           candidate_buses[block], tol, max_iter, max_chord)
+        losses[block] = np.real(np.sum(V * np.conj(ybus @ V), axis=0))
+        min_voltage[block] = np.min(np.abs(V), axis=0)
+
+    order = np.lexsort((losses, ~converged))
+    return [
+        {
+            "bus": int(candidate_buses[k]) + 1,
+            "total_loss": float(losses[k]),
+            "loss_increase": float(losses[k] - base_loss),
+            "min_voltage": float(min_voltage[k]),
+            "converged": bool(converged[k]),
+        }
+        for k in order
+    ]
+
 
 def get_total_loss_matlab(ybus_np, v_np, new_load, bus_at_py):
     """
@@ -31,6 +239,7 @@ def get_total_loss_matlab(ybus_np, v_np, new_load, bus_at_py):
     Returns:
         float: The total real power loss, or None if an error occurs.
     """
+    import matlab.engine
     
     print("Starting MATLAB engine...")
     try:
@@ -0,0 +1,433 @@
+import os
+import zipfile
+import numpy as np
+import scipy.sparse as sp
+from case_files import DEFAULT_CACHE_DIR, load_case
+from factor_cache import get_cache
+
+# Field name and dtype of every table column. Units follow the MATPOWER case
+# format: powers in MW / MVAr (shunts at 1 pu voltage), angles in degrees,
+# branch impedances in pu. Buses are 0-based internal indices, slack first.
+BUS_FIELDS = (
+    ("id", np.int64),                     # bus number of the source data
+    ("type", np.int8),                    # 1 = PQ, 2 = PV, 3 = slack, 4 = isolated
+    ("pd", np.float64), ("qd", np.float64),
+    ("gs", np.float64), ("bs", np.float64),
+    ("vm", np.float64), ("va", np.float64),
+    ("base_kv", np.float64),
+    ("vmax", np.float64), ("vmin", np.float64),
+)
+BRANCH_FIELDS = (
+    ("f", np.int64), ("t", np.int64),
+    ("r", np.float64), ("x", np.float64), ("b", np.float64),
+    ("rate", np.float64),                 # MVA rating (0 = unrated)
+    ("tap", np.float64),                  # off-nominal turns ratio (1 = line)
+    ("shift", np.float64),                # phase shift (degrees)
+    ("status", np.bool_),
+)
+GEN_FIELDS = (
+    ("bus", np.int64),
+    ("pg", np.float64), ("qg", np.float64),
+    ("qmax", np.float64), ("qmin", np.float64),
+    ("vg", np.float64),
+    ("status", np.bool_),
+)
+
+_DEFAULTS = {"type": 1, "vm": 1.0, "vmax": 1.1, "vmin": 0.9, "tap": 1.0, "status": True}
+
+
+class _Table:
+    """
+    Struct-of-arrays table: one contiguous typed 1-D array per field.
+
+    Columns are taken without copying when they already have the field's
+    dtype (e.g. memory-mapped .npz members); missing columns get defaults.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, size=None, **columns):
+        if size is None:
+            size = len(next(iter(columns.values())))
+        for name, dtype in self.FIELDS:
+            if name in columns:
+                col = np.ascontiguousarray(columns[name], dtype=dtype)
+                if col.shape != (size,):
+                    raise ValueError(f"{type(self).__name__}.{name} has shape {col.shape}, expected ({size},)")
+            else:
+                col = np.full(size, _DEFAULTS.get(name, 0), dtype=dtype)
+            setattr(self, name, col)
+
+    def __len__(self):
+        return len(getattr(self, self.FIELDS[0][0]))
+
+    def columns(self):
+        return {name: getattr(self, name) for name, _ in self.FIELDS}
+
+
+class BusTable(_Table):
+    __slots__ = tuple(name for name, _ in BUS_FIELDS)
+    FIELDS = BUS_FIELDS
+
+
+class BranchTable(_Table):
+    __slots__ = tuple(name for name, _ in BRANCH_FIELDS)
+    FIELDS = BRANCH_FIELDS
+
+
+class GenTable(_Table):
+    __slots__ = tuple(name for name, _ in GEN_FIELDS)
+    FIELDS = GEN_FIELDS
+
+
+class Network:
+    """
+    Array-backed network model shared by the solvers and agents.
+
+    Holds the bus, branch and generator tables as contiguous typed arrays and
+    builds the sparse Ybus on first use, keeping it for later calls. Every
+    tool function that takes a Ybus or line_data also takes a Network (see
+    as_ybus / as_line_data), so a network is parsed once and passed around
+    instead of being re-read from nested lists.
+
+    tap_model selects the transformer model of ybus(): "pi" is the standard
+    pi model of case files (tap and phase shift on the from side), and
+    "line_data" is the build_ybus convention of the line_data tools (tap at
+    both ends, no phase shift). Call invalidate() after editing branch or
+    shunt arrays in place.
+    """
+    __slots__ = ("base_mva", "bus", "branch", "gen", "name", "tap_model", "_ybus")
+
+    def __init__(self, bus, branch, gen=None, base_mva=100.0, name="", tap_model="pi", ybus=None):
+        if tap_model not in ("pi", "line_data"):
+            raise ValueError(f"unknown tap_model {tap_model!r}")
+        self.base_mva = float(base_mva)
+        self.bus = bus
+        self.branch = branch
+        self.gen = GenTable(0) if gen is None else gen
+        self.name = name
+        self.tap_model = tap_model
+        self._ybus = ybus
+
+    @property
+    def n_bus(self):
+        return len(self.bus)
+
+    @property
+    def bus_ids(self):
+        return self.bus.id
+
+    def positions(self, bus_numbers):
+        """
+        0-based internal positions of bus numbers of the source data (bus_ids),
+        e.g. of the bus arguments of a tool call on a case file. A single bus
+        number gives a single position.
+        """
+        lookup = {int(b): k for k, b in enumerate(self.bus.id)}
+        try:
+            pos = np.array([lookup[int(b)] for b in np.ravel(bus_numbers)], dtype=np.int64)
+        except KeyError as exc:
+            raise ValueError(f"network {self.name!r} has no bus {exc.args[0]}") from None
+        return int(pos[0]) if np.ndim(bus_numbers) == 0 else pos
+
+    def invalidate(self):
+        self._ybus = None
+
+    @property
+    def nbytes(self):
+        """Memory held by the tables and the built Ybus (for the factor cache bound)."""
+        total = sum(col.nbytes for table in (self.bus, self.branch, self.gen)
+                    for col in table.columns().values())
+        if self._ybus is not None:
+            total += self._ybus.data.nbytes + self._ybus.indices.nbytes + self._ybus.indptr.nbytes
+        return total
+
+    # --- Construction ---
+
+    @classmethod
+    def from_case(cls, case):
+        """Network of a parsed case file (case_files.CaseData)."""
+        bus, br, gen = case.bus, case.branch, case.gen
+        return cls(
+            BusTable(id=case.bus_ids, type=bus[:, 1], pd=bus[:, 2], qd=bus[:, 3], gs=bus[:, 4],
+                     bs=bus[:, 5], vm=bus[:, 7], va=bus[:, 8], base_kv=bus[:, 9],
+                     vmax=bus[:, 11], vmin=bus[:, 12]),
+            BranchTable(f=br[:, 0] - 1, t=br[:, 1] - 1, r=br[:, 2], x=br[:, 3], b=br[:, 4],
+                        rate=br[:, 5], tap=np.where(br[:, 8] == 0, 1.0, br[:, 8]),
+                        shift=br[:, 9], status=br[:, 10] > 0),
+            GenTable(bus=gen[:, 0] - 1, pg=gen[:, 1], qg=gen[:, 2], qmax=gen[:, 3],
+                     qmin=gen[:, 4], vg=gen[:, 5], status=gen[:, 7] > 0),
+            base_mva=case.base_mva, name=case.name, tap_model="pi",
+        )
+
+    @classmethod
+    def from_line_data(cls, line_data, n_bus=None, base_mva=100.0):
+        """
+        Network of branch rows [from_bus, to_bus, R, X, a, shunt(, rating pu)]
+        (1-based) in the build_ybus convention; bus 1 is the slack.
+        """
+        ldata = np.asarray(line_data, dtype=float)
+        if ldata.ndim != 2 or ldata.shape[1] < 6:
+            raise ValueError("line_data must have rows of [from_bus, to_bus, R, X, a, shunt]")
+        f = ldata[:, 0].astype(np.int64) - 1
+        t = ldata[:, 1].astype(np.int64) - 1
+        if n_bus is None:
+            n_bus = int(max(f.max(), t.max())) + 1
+        rate = ldata[:, 6] * base_mva if ldata.shape[1] > 6 else np.zeros(len(f))
+        bus = BusTable(n_bus, id=np.arange(1, n_bus + 1))
+        bus.type[0] = 3
+        branch = BranchTable(len(f), f=f, t=t, r=ldata[:, 2], x=ldata[:, 3], b=ldata[:, 5],
+                             rate=rate, tap=ldata[:, 4])
+        return cls(bus, branch, base_mva=base_mva, tap_model="line_data")
+
+    @classmethod
+    def from_ybus(cls, Ybus, base_mva=100.0):
+        """
+        Network of a given Ybus: one branch per nonzero upper off-diagonal
+        (series admittance -Y_ij) and the row sums as bus shunts. ybus()
+        returns the given matrix itself.
+        """
+        Y = sp.csr_matrix(Ybus, dtype=complex)
+        Y.sum_duplicates()
+        n = Y.shape[0]
+        off = sp.triu(Y, k=1).tocoo()
+        nz = off.data != 0
+        z = -1.0 / off.data[nz]
+        shunt = np.asarray(Y.sum(axis=1)).ravel() * base_mva
+        bus = BusTable(n, id=np.arange(1, n + 1), gs=shunt.real, bs=shunt.imag)
+        bus.type[0] = 3
+        branch = BranchTable(int(nz.sum()), f=off.row[nz], t=off.col[nz], r=z.real, x=z.imag)
+        return cls(bus, branch, base_mva=base_mva, tap_model="pi", ybus=Y)
+
+    # --- Derived data ---
+
+    def branch_admittances(self):
+        """
+        Two-port stamps of the in-service branches.
+
+        Returns:
+            Tuple (f, t, yff, yft, ytf, ytt): 0-based end buses and the
+            admittances with I_from = yff V_f + yft V_t, I_to = ytf V_f + ytt V_t
+        """
+        br = self.branch
+        on = br.status
+        ys = 1.0 / (br.r[on] + 1j * br.x[on])
+        bc = br.b[on]
+        if self.tap_model == "line_data":
+            a = br.tap[on]
+            y_diag = ys / a ** 2 + 1j * bc / 2
+            y_off = -ys / a
+            return br.f[on], br.t[on], y_diag, y_off, y_off, y_diag
+        tap = br.tap[on] * np.exp(1j * np.deg2rad(br.shift[on]))
+        ytt = ys + 1j * bc / 2
+        return br.f[on], br.t[on], ytt / (tap * np.conj(tap)), -ys / np.conj(tap), -ys / tap, ytt
+
+    def ybus(self):
+        """Sparse (CSR) Ybus, built on the first call and kept afterwards."""
+        if self._ybus is None:
+            n = self.n_bus
+            f, t, yff, yft, ytf, ytt = self.branch_admittances()
+            ysh = (self.bus.gs + 1j * self.bus.bs) / self.base_mva
+            rows = np.r_[f, f, t, t, np.arange(n)]
+            cols = np.r_[f, t, f, t, np.arange(n)]
+            vals = np.r_[yff, yft, ytf, ytt, ysh]
+            Y = sp.coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsr()
+            Y.sum_duplicates()
+            self._ybus = Y
+        return self._ybus
+
+    def line_data(self, exact=True):
+        """
+        In-service branches as [from_bus, to_bus, R, X, a, shunt, rating] rows
+        (1-based, rating in pu) for the tools built on line_data.
+
+        Those rows apply the tap at both ends and have no phase shifts or bus
+        shunts, so a pi-model network with any of these has no exact line_data
+        form; with exact it raises instead of returning rows whose build_ybus
+        differs from ybus(). Pass exact=False where only the branch ends and
+        impedances are used (topology, DC sensitivities).
+        """
+        br = self.branch
+        on = br.status
+        if exact and self.tap_model == "pi" and (
+                np.any(br.tap[on] != 1) or np.any(br.shift[on] != 0)
+                or np.any(self.bus.gs != 0) or np.any(self.bus.bs != 0)):
+            raise ValueError(f"network {self.name!r} has off-nominal taps, phase shifts or bus "
+                             "shunts, which line_data rows cannot represent; use its "
+                             "branch_admittances() and ybus()")
+        return np.column_stack([br.f[on] + 1, br.t[on] + 1, br.r[on], br.x[on], br.tap[on],
+                                br.b[on], br.rate[on] / self.base_mva])
+
+    def loadflow_inputs(self):
+        """
+        Keyword arguments for the load flow solvers (gauss_seidel_loadflow,
+        newton_raphson_loadflow, ...) as in CaseData.loadflow_inputs, with the
+        cached sparse Ybus.
+        """
+        n = self.n_bus
+        bus, gen = self.bus, self.gen
+        on = gen.status
+        gbus = gen.bus[on]
+        pg = np.bincount(gbus, gen.pg[on], n)
+        qg = np.bincount(gbus, gen.qg[on], n)
+        has_gen = np.bincount(gbus, minlength=n) > 0
+
+        bus_type = np.where((bus.type == 2) & has_gen, 2, 1)
+        q_min = np.where(bus_type == 2, np.bincount(gbus, gen.qmin[on], n) / self.base_mva, -np.inf)
+        q_max = np.where(bus_type == 2, np.bincount(gbus, gen.qmax[on], n) / self.base_mva, np.inf)
+
+        Vm = np.where(bus.vm > 0, bus.vm, 1.0)
+        vg = np.zeros(n)
+        vg[gbus] = gen.vg[on]
+        Vm = np.where((bus_type == 2) | (np.arange(n) == 0), np.where(vg > 0, vg, Vm), Vm)
+        V_init = Vm * np.exp(1j * np.deg2rad(bus.va - bus.va[0]))
+
+        return {
+            "Ybus": self.ybus(),
+            "bus_type": bus_type,
+            "p_spec": (pg - bus.pd) / self.base_mva,
+            "q_spec": (qg - bus.qd) / self.base_mva,
+            "q_min": q_min,
+            "q_max": q_max,
+            "V_init": V_init,
+        }
+
+    def summary(self):
+        """Short description of the network, e.g. for JSON tool output."""
+        return {
+            "name": self.name,
+            "base_mva": self.base_mva,
+            "buses": self.n_bus,
+            "branches": len(self.branch),
+            "in_service_branches": int(self.branch.status.sum()),
+            "generators": len(self.gen),
+            "slack_bus": int(self.bus.id[0]),
+            "total_load_mw": float(self.bus.pd.sum()),
+            "total_load_mvar": float(self.bus.qd.sum()),
+        }
+
+    # --- Persistence ---
+
+    def save(self, path):
+        """
+        Write the network (and its Ybus, if built) to an uncompressed .npz
+        with one member per column, which load() can memory-map.
+        """
+        arrays = {"base_mva": np.float64(self.base_mva), "name": np.array(self.name),
+                  "tap_model": np.array(self.tap_model)}
+        for table in ("bus", "branch", "gen"):
+            for name, col in getattr(self, table).columns().items():
+                arrays[f"{table}.{name}"] = col
+        if self._ybus is not None:
+            arrays.update({"ybus.data": self._ybus.data, "ybus.indices": self._ybus.indices,
+                           "ybus.indptr": self._ybus.indptr})
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Open a network written by save().
+
+        With mmap every column is a copy-on-write memory map of its .npz
+        member, so opening a large network reads no table data up front.
+        """
+        arrays = _npz_memmap(path) if mmap else dict(np.load(path))
+        tables = {}
+        for table, table_cls in (("bus", BusTable), ("branch", BranchTable), ("gen", GenTable)):
+            columns = {name: arrays[f"{table}.{name}"] for name, _ in table_cls.FIELDS}
+            tables[table] = table_cls(len(columns[table_cls.FIELDS[0][0]]), **columns)
+        ybus = None
+        if "ybus.data" in arrays:
+            n = len(tables["bus"])
+            ybus = sp.csr_matrix((arrays["ybus.data"], arrays["ybus.indices"], arrays["ybus.indptr"]),
+                                 shape=(n, n), copy=False)
+        return cls(**tables, base_mva=float(arrays["base_mva"]), name=str(arrays["name"][()]),
+                   tap_model=str(arrays["tap_model"][()]), ybus=ybus)
+
+
+def _npz_memmap(path):
+    """
+    Members of an uncompressed .npz as copy-on-write memory maps.
+
+    np.load reads every member of an .npz into memory; the members of an
+    np.savez archive are stored uncompressed, so each .npy payload can be
+    mapped straight from its offset in the zip file instead.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as fh:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: compressed member {info.filename}, save it with np.savez")
+            # Local file header: 30 bytes, then the file name and extra field
+            fh.seek(info.header_offset + 26)
+            name_len, extra_len = np.frombuffer(fh.read(4), dtype="<u2")
+            fh.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+            version = np.lib.format.read_magic(fh)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(fh)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(fh)
+            key = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if len(shape) == 0 or np.prod(shape) == 0 or dtype.hasobject:
+                arrays[key] = np.load(zf.open(info.filename), allow_pickle=False)
+            else:
+                arrays[key] = np.memmap(fh.name, dtype=dtype, mode="c", offset=fh.tell(), shape=shape,
+                                        order="F" if fortran else "C")
+    return arrays
+
+
+def as_ybus(Ybus, dense=False):
+    """
+    The Ybus of a Network (dense if requested), any other Ybus unchanged.
+
+    Networks are recognized by their ybus() method rather than their class,
+    so a CaseData is accepted as well.
+    """
+    if hasattr(Ybus, "ybus"):
+        return Ybus.ybus().toarray() if dense else Ybus.ybus()
+    return Ybus
+
+
+def as_line_data(line_data, exact=True):
+    """
+    The line_data rows of a Network (see Network.line_data for exact), any
+    other line_data unchanged.
+    """
+    if hasattr(line_data, "line_data"):
+        return line_data.line_data(exact=exact)
+    return line_data
+
+
+# JSON schema of the network_file argument of the agent tools that accept a Network
+NETWORK_FILE_SCHEMA = {
+    "type": "string",
+    "description": "Path of a case file (MATPOWER .m / IEEE CDF) or saved network (.npz) to use instead "
+                   "of inline branch data or matrices. Bus arguments and results then use the file's bus "
+                   "numbers; per-bus value lists (voltages, bus types) follow the network's bus order, "
+                   "slack bus first, as reported by load_case_file / solve_case_file"
+}
+
+
+def load_network(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Network from a case file (MATPOWER .m / IEEE CDF) or a saved network .npz.
+
+    Loaded networks are kept in the shared cache under the file's path,
+    size and modification time, so every tool call of a session that refers
+    to the same file gets the same Network (and its already built Ybus).
+    """
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+    def compute():
+        if path.lower().endswith(".npz"):
+            network = Network.load(path)
+        else:
+            network = Network.from_case(load_case(path, cache_dir=cache_dir))
+        # Built before the entry is sized, so the cache bound covers the Ybus too
+        network.ybus()
+        return network
+
+    return get_cache().get_or_compute(key, "network", compute)
@@ -0,0 +1,115 @@
+import hashlib
+import numpy as np
+import scipy.sparse as sp
+from dataclasses import dataclass
+from bus_ordering import OrderedLU, get_ordering
+from factor_cache import fingerprint, get_cache
+from network import as_ybus
+
+
+@dataclass
+class KronReduction:
+    y_reduced: np.ndarray                 # (k, k) complex equivalent admittance between retained buses
+    retained: np.ndarray                  # (k,) 0-based retained buses, in y_reduced order
+    eliminated: np.ndarray                # (n - k,) 0-based eliminated buses
+    n_bus: int                            # size of the full network
+    lu_ee: object                         # SuperLU of Y_EE (eliminated block)
+    y_er: sp.csr_matrix                   # (n - k, k) coupling block Y_ER
+    y_re: sp.csr_matrix                   # (k, n - k) coupling block Y_RE
+
+    def equivalent_injections(self, i_bus):
+        """
+        Retained-bus currents of the equivalent, I_R - Y_RE Y_EE^-1 I_E.
+
+        Args:
+            i_bus: (n,) current injections of the full network
+
+        Returns:
+            (k,) currents for which y_reduced @ V_R gives the same V_R
+        """
+        i_bus = np.asarray(i_bus, dtype=complex)
+        i_e = i_bus[self.eliminated]
+        if not np.any(i_e):
+            return i_bus[self.retained].copy()
+        return i_bus[self.retained] - self.y_re @ self.lu_ee.solve(i_e)
+
+    def recover(self, v_retained, i_eliminated=None):
+        """
+        Full network voltages from the retained-bus voltages.
+
+        V_E = Y_EE^-1 (I_E - Y_ER V_R), with I_E the current injections at the
+        eliminated buses (zero, i.e. pure network buses, by default).
+
+        Args:
+            v_retained: (k,) retained-bus voltages (or (k, m) for m cases)
+            i_eliminated: Optional (n - k,) eliminated-bus current injections
+
+        Returns:
+            (n,) (or (n, m)) complex bus voltages
+        """
+        v_r = np.asarray(v_retained, dtype=complex)
+        rhs = -(self.y_er @ v_r)
+        if i_eliminated is not None:
+            i_e = np.asarray(i_eliminated, dtype=complex)
+            rhs = rhs + (i_e if v_r.ndim == 1 else i_e[:, None])
+        v = np.zeros((self.n_bus,) + v_r.shape[1:], dtype=complex)
+        v[self.retained] = v_r
+        if len(self.eliminated):
+            v[self.eliminated] = self.lu_ee.solve(np.ascontiguousarray(rhs))
+        return v
+
+    def as_dict(self):
+        """Reduced matrix (1-based buses) in the {real, imag} form of the tool schemas."""
+        return {
+            "retained_buses": (self.retained + 1).tolist(),
+            "Ybus_reduced": [[{"real": float(y.real), "imag": float(y.imag)} for y in row]
+                             for row in self.y_reduced],
+            "eliminated_buses": len(self.eliminated),
+        }
+
+
+def kron_reduce(Ybus, retained):
+    """
+    Kron reduction of a network onto a set of retained buses.
+
+    Y_red = Y_RR - Y_RE Y_EE^-1 Y_ER. Only the eliminated block Y_EE is
+    factored (sparse LU in the network's minimum degree bus order), and it
+    is solved for the k columns of Y_ER, so the cost grows with the number
+    of retained buses rather than with a dense inverse of the full network.
+    The factorization is kept in the shared factor cache and in the result,
+    where recover() uses it to get internal voltages back on demand.
+
+    Args:
+        Ybus: (n, n) complex admittance matrix (dense or sparse) or a Network
+        retained: 0-based indices of the buses to keep
+
+    Returns:
+        KronReduction
+    """
+    Y = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    n = Y.shape[0]
+    retained = np.asarray(retained, dtype=np.int64).ravel()
+    if len(np.unique(retained)) != len(retained) or np.any((retained < 0) | (retained >= n)):
+        raise ValueError("retained buses must be distinct indices of the network")
+    mask = np.zeros(n, dtype=bool)
+    mask[retained] = True
+    eliminated = np.flatnonzero(~mask)
+
+    y_rr = Y[retained][:, retained].toarray()
+    y_re = Y[retained][:, eliminated]
+    y_er = Y[eliminated][:, retained]
+    if len(eliminated) == 0:
+        return KronReduction(y_rr, retained, eliminated, n, None, y_er, y_re)
+
+    def compute():
+        y_ee = Y[eliminated][:, eliminated].tocsc()
+        try:
+            lu = OrderedLU(y_ee, np.argsort(get_ordering(Y).position[eliminated]))
+        except RuntimeError as exc:
+            raise ValueError("eliminated buses form a part of the network without a path "
+                             "to a retained bus or shunt (Y_EE is singular)") from exc
+        return lu, y_rr - y_re @ lu.solve(y_er.toarray())
+
+    key = hashlib.sha1(retained.tobytes()).hexdigest()
+    lu, y_reduced = get_cache().get_or_compute(fingerprint(Y), "kron", compute, key=key)
+    return KronReduction(y_reduced, retained, eliminated, n, lu, y_er, y_re)
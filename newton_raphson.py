@@ -0,0 +1,213 @@
+import numpy as np
+import scipy.sparse as sp
+from bus_ordering import OrderedLU, get_ordering, jacobian_order
+from factor_cache import fingerprint, get_cache
+from network import as_ybus
+
+
+def power_mismatch(Ybus, V, S_spec):
+    """
+    Complex power mismatch V .* conj(Ybus @ V) - S_spec at every bus.
+    """
+    return V * np.conj(Ybus @ V) - S_spec
+
+
+def solution_converged(Ybus, V, bus_type, S_spec, tol, S=None):
+    """
+    Whether V is accepted as a load flow solution, whatever solver produced it.
+
+    The power mismatch is checked at every non-slack bus (P) and at the PQ
+    buses (Q). Gauss-Seidel style solvers stop on the voltage change rather
+    than the mismatch, so the mismatch is accepted up to max(100 * tol, 1e-3).
+
+    Args:
+        Ybus: (n, n) complex admittance matrix
+        V: (n,) complex bus voltages
+        bus_type: Bus types (2 = PV, anything else = PQ; bus 0 is slack)
+        S_spec: (n,) complex specified injections
+        tol: Tolerance the solver was run with
+        S: Optional V .* conj(Ybus V), if already computed
+
+    Returns:
+        bool
+    """
+    V = np.asarray(V)
+    if not np.all(np.isfinite(V)):
+        return False
+    if S is None:
+        S = V * np.conj(Ybus @ V)
+    mis = S - S_spec
+    pq = np.flatnonzero(np.asarray(bus_type) != 2)
+    pq = pq[pq != 0]
+    worst = max(np.max(np.abs(mis[1:].real), initial=0.0), np.max(np.abs(mis[pq].imag), initial=0.0))
+    return bool(worst < max(100 * tol, 1e-3))
+
+
+def dS_dV(Ybus, V):
+    """
+    Sparse partial derivatives of the bus power injections with respect to
+    voltage angle and magnitude (polar form).
+
+    Returns:
+        Tuple (dS_dVa, dS_dVm) of complex CSR matrices
+    """
+    n = len(V)
+    Ibus = Ybus @ V
+    diagV = sp.diags(V, format="csr", shape=(n, n))
+    diagIbus = sp.diags(Ibus, format="csr", shape=(n, n))
+    diagVnorm = sp.diags(V / np.abs(V), format="csr", shape=(n, n))
+
+    dS_dVm = diagV @ (Ybus @ diagVnorm).conj() + diagIbus.conj() @ diagVnorm
+    dS_dVa = 1j * diagV @ (diagIbus - Ybus @ diagV).conj()
+    return dS_dVa.tocsr(), dS_dVm.tocsr()
+
+
+def build_jacobian(Ybus, V, pv, pq):
+    """
+    Assemble the sparse load flow Jacobian
+
+        [ dP/dδ (pv+pq, pv+pq)   dP/d|V| (pv+pq, pq) ]
+        [ dQ/dδ (pq, pv+pq)      dQ/d|V| (pq, pq)    ]
+    """
+    pvpq = np.r_[pv, pq]
+    dS_dVa, dS_dVm = dS_dV(Ybus, V)
+
+    J11 = dS_dVa[pvpq][:, pvpq].real
+    J12 = dS_dVm[pvpq][:, pq].real
+    J21 = dS_dVa[pq][:, pvpq].imag
+    J22 = dS_dVm[pq][:, pq].imag
+    return sp.bmat([[J11, J12], [J21, J22]], format="csc")
+
+
+def newton_raphson(Ybus, V0, pv, pq, S_spec, tol=1e-8, max_iter=20):
+    """
+    Core sparse Newton-Raphson iteration in polar coordinates.
+
+    The slack bus is every bus that is neither in pv nor in pq. PV buses keep
+    the magnitude they have in V0. The Jacobian is factored in the cached
+    minimum degree order of the network's buses (see bus_ordering).
+
+    Args:
+        Ybus: (n, n) complex sparse (or dense) admittance matrix
+        V0: (n,) complex initial voltages
+        pv, pq: Integer index arrays of PV and PQ buses
+        S_spec: (n,) complex specified injections P + jQ (generation positive)
+        tol: Convergence tolerance on the largest power mismatch (pu)
+        max_iter: Maximum number of Newton steps
+
+    Returns:
+        Tuple (V, converged, iterations)
+    """
+    Ybus = sp.csr_matrix(Ybus)
+    pv = np.asarray(pv, dtype=np.int64)
+    pq = np.asarray(pq, dtype=np.int64)
+    pvpq = np.r_[pv, pq]
+    n_pvpq = len(pvpq)
+
+    V = np.array(V0, dtype=complex)
+    Va = np.angle(V)
+    Vm = np.abs(V)
+
+    mis = power_mismatch(Ybus, V, S_spec)
+    F = np.r_[mis[pvpq].real, mis[pq].imag]
+    if len(F) == 0 or np.max(np.abs(F)) < tol:
+        return V, True, 0
+
+    order = jacobian_order(get_ordering(Ybus), pv, pq)
+    for it in range(1, max_iter + 1):
+        J = build_jacobian(Ybus, V, pv, pq)
+        dx = -OrderedLU(J, order).solve(F)
+
+        Va[pvpq] += dx[:n_pvpq]
+        Vm[pq] += dx[n_pvpq:]
+        V = Vm * np.exp(1j * Va)
+
+        mis = power_mismatch(Ybus, V, S_spec)
+        F = np.r_[mis[pvpq].real, mis[pq].imag]
+        if np.max(np.abs(F)) < tol:
+            return V, True, it
+
+    return V, False, max_iter
+
+
+def newton_raphson_loadflow(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
+                            V_init=None, tol=1e-6, max_iter=20):
+    """
+    Newton-Raphson load flow with the same interface as gauss_seidel_loadflow.
+
+    Bus 0 is the slack bus, buses with bus_type == 2 are PV buses and every
+    other bus is PQ. PV buses hold the voltage magnitude given in V_init; when
+    a converged PV bus violates its reactive power limits it is switched to a
+    PQ bus at that limit and the case is re-solved. The converged voltages are
+    stored in the shared factor cache; a later solve of the same network
+    without V_init starts from them instead of a flat start.
+
+    Args:
+        Ybus: (n, n) complex admittance matrix, dense or scipy sparse, or a Network
+        bus_type: Bus types (2 = PV, anything else = PQ; bus 0 is slack)
+        p_spec, q_spec: Specified active and reactive injections (pu)
+        q_min, q_max: Reactive power limits for PV buses (may be empty)
+        V_init: Initial complex voltages (last converged voltages of this
+            network, else a flat start, if None)
+        tol: Convergence tolerance on the largest power mismatch (pu)
+        max_iter: Maximum Newton iterations per solve
+
+    Returns:
+        (n,) complex ndarray of final bus voltages
+    """
+    Ybus = sp.csr_matrix(as_ybus(Ybus))
+    n_bus = Ybus.shape[0]
+    bus_type = np.asarray(bus_type)
+    q_spec = np.array(q_spec, dtype=float)
+    cache = get_cache()
+    fp = fingerprint(Ybus)
+
+    if V_init is None or len(V_init) == 0:
+        V = np.ones(n_bus, dtype=complex)
+        V_last = cache.get(fp, "voltage")
+        if V_last is not None:
+            # Warm start: previous angles and PQ magnitudes, flat slack/PV setpoints
+            Vm = np.where(bus_type == 2, 1.0, np.abs(V_last))
+            Vm[0] = 1.0
+            V = Vm * np.exp(1j * np.angle(V_last))
+    else:
+        V = np.array(V_init, dtype=complex)
+
+    if q_min is None or len(q_min) == 0:
+        q_min = np.full(n_bus, -np.inf)
+    else:
+        q_min = np.array(q_min, dtype=float)
+
+    if q_max is None or len(q_max) == 0:
+        q_max = np.full(n_bus, np.inf)
+    else:
+        q_max = np.array(q_max, dtype=float)
+
+    is_pv = bus_type == 2
+    is_pv[0] = False
+
+    # Each pass can only move PV buses to PQ, so n_bus passes always suffice
+    for _ in range(n_bus):
+        pv = np.flatnonzero(is_pv)
+        pq = np.flatnonzero(~is_pv)
+        pq = pq[pq != 0]
+
+        S_spec = np.asarray(p_spec, dtype=float) + 1j * q_spec
+        V, converged, _ = newton_raphson(Ybus, V, pv, pq, S_spec, tol, max_iter)
+        if not converged:
+            break
+
+        q_calc = (V * np.conj(Ybus @ V)).imag
+        over = is_pv & (q_calc > q_max)
+        under = is_pv & (q_calc < q_min)
+        if not (over.any() or under.any()):
+            break
+
+        q_spec[over] = q_max[over]
+        q_spec[under] = q_min[under]
+        is_pv &= ~(over | under)
+
+    if converged:
+        cache.put(fp, "voltage", V)
+
+    return V
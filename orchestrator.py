@@ -1,6 +1,7 @@
 # orchestrator.py
 from agents.websearch_agent import run_websearch_agent
 from agents.matlab_executor_agent import run_matlab_executor_agent
+from agents.power_flow_agent import run_power_flow_agent
 from dotenv import load_dotenv
 import os
 from groq import Groq
@@ -156,12 +157,23 @@ def contextualize_matlab_query(user_query, conversation_history=None):
     rewritten_query = response.choices[0].message.content
     return rewritten_query.strip() if rewritten_query else user_query
 
-def orchestrate(user_query, image_base64=None, csv_files: list = None, conversation_history=None):
+def orchestrate(user_query, image_base64=None, csv_files: list = None, conversation_history=None,
+                case_file: str = None):
     """Orchestrate query handling with optional image, multiple CSV files, and conversation history support.
     
     csv_files: list of dicts with keys 'path' and 'preview', one per CSV file.
                e.g. [{"path": "/data/a.csv", "preview": "col1,col2\\n1,2\\n..."}, ...]
+    case_file: path of an uploaded MATPOWER / IEEE CDF case; the query then goes to the
+               power system agents, which read the file directly (CSV files attached
+               with it are passed on with their header row, as load profiles for
+               time-series studies or measurement tables for state estimation).
     """
+    if case_file:
+        attached = ""
+        for f in csv_files or []:
+            header = (f.get("preview") or "").split("\n")[0]
+            attached += f"\nCSV file: {f['path']} (header: {header or 'unknown'})"
+        return run_power_flow_agent(f"{user_query}\n\nCase file: {case_file}{attached}")
     answer, query = classify_query(user_query, image_base64, conversation_history)
     print(f"Classified query as: {answer}")
     if answer == "web_search":
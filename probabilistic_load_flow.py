@@ -0,0 +1,337 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+import scipy.sparse as sp
+from bus_ordering import OrderedLU, get_ordering, jacobian_order
+from newton_raphson import build_jacobian, newton_raphson, newton_raphson_loadflow
+from network import as_ybus
+
+DISTRIBUTIONS = ("normal", "uniform", "beta", "weibull")
+
+# Default wind turbine power curve speeds (m/s) for weibull wind speed terms
+_WIND_CURVE = {"cut_in": 3.0, "rated": 12.0, "cut_out": 25.0}
+
+
+@dataclass
+class Uncertainty:
+    bus: int                              # 0-based bus
+    distribution: str                     # one of DISTRIBUTIONS
+    params: dict                          # parameters of the distribution
+    power_factor: float = 1.0             # Q follows P at this power factor
+
+    def sample(self, rng, size):
+        """Active power deviations (pu, generation positive) of size samples."""
+        p = self.params
+        if self.distribution == "normal":
+            return rng.normal(p.get("mean", 0.0), p["std"], size)
+        if self.distribution == "uniform":
+            return rng.uniform(p["low"], p["high"], size)
+        if self.distribution == "beta":
+            # e.g. solar output as a fraction of the installed capacity
+            return p.get("scale", 1.0) * rng.beta(p["a"], p["b"], size)
+        # Weibull wind speed through a linear turbine power curve
+        speed = p["scale"] * rng.weibull(p["shape"], size)
+        c = {k: p.get(k, v) for k, v in _WIND_CURVE.items()}
+        ramp = np.clip((speed - c["cut_in"]) / (c["rated"] - c["cut_in"]), 0.0, 1.0)
+        return p["p_rated"] * np.where(speed < c["cut_out"], ramp, 0.0)
+
+
+def parse_uncertainties(specs):
+    """
+    Uncertainty terms from JSON style dicts with a 1-based "bus", a
+    "distribution" and its parameters:
+
+        normal   mean (default 0), std
+        uniform  low, high
+        beta     a, b, scale (default 1)
+        weibull  shape, scale (wind speed, m/s), p_rated, optional cut_in,
+                 rated, cut_out speeds
+
+    plus an optional "power_factor" (default 1, Q unchanged).
+    """
+    required = {"normal": ("std",), "uniform": ("low", "high"), "beta": ("a", "b"),
+                "weibull": ("shape", "scale", "p_rated")}
+    terms = []
+    for spec in specs:
+        spec = dict(spec)
+        dist = str(spec.pop("distribution", "normal")).lower()
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(f"unknown distribution {dist!r}; use one of {DISTRIBUTIONS}")
+        bus = int(spec.pop("bus")) - 1
+        pf = float(spec.pop("power_factor", 1.0))
+        missing = [k for k in required[dist] if k not in spec]
+        if missing:
+            raise ValueError(f"{dist} uncertainty at bus {bus + 1} needs {missing}")
+        terms.append(Uncertainty(bus, dist, {k: float(v) for k, v in spec.items()}, pf))
+    return terms
+
+
+def sample_injections(uncertainties, n_bus, size, rng):
+    """
+    Injection deviations of size scenarios, one vectorized draw per term.
+
+    Returns:
+        (dP, dQ): (size, n_bus) arrays added to the base-case injections
+    """
+    dP = np.zeros((size, n_bus))
+    dQ = np.zeros((size, n_bus))
+    for u in uncertainties:
+        x = u.sample(rng, size)
+        dP[:, u.bus] += x
+        if u.power_factor < 1.0:
+            dQ[:, u.bus] += x * np.tan(np.arccos(u.power_factor))
+    return dP, dQ
+
+
+@dataclass
+class RunningStats:
+    count: int                            # converged samples
+    mean: np.ndarray                      # (n,) running mean of |V|
+    m2: np.ndarray                        # (n,) running sum of squared deviations of |V|
+    hist: np.ndarray                      # (n, n_bins + 2) |V| histogram with under/overflow bins
+    violations: np.ndarray                # (n,) samples with |V| outside the limits
+    any_violation: int                    # samples with at least one bus outside the limits
+    loss_mean: float                      # running mean of the total loss
+    loss_m2: float                        # running sum of squared loss deviations
+    diverged: int                         # samples whose load flow did not converge
+
+    @classmethod
+    def from_block(cls, vm, loss, v_min, v_max, edges, diverged=0):
+        """Statistics of a block of converged samples: vm (k, n), loss (k,)."""
+        k, n = vm.shape
+        n_bins = len(edges) - 1
+        bins = np.searchsorted(edges, vm, side="right")      # 0 = underflow, n_bins + 1 = overflow
+        hist = np.bincount((np.arange(n) * (n_bins + 2) + bins).ravel(),
+                           minlength=n * (n_bins + 2)).reshape(n, n_bins + 2)
+        out = (vm < v_min) | (vm > v_max)
+        mean = vm.mean(axis=0) if k else np.zeros(n)
+        return cls(count=k, mean=mean, m2=((vm - mean) ** 2).sum(axis=0), hist=hist,
+                   violations=out.sum(axis=0), any_violation=int(out.any(axis=1).sum()),
+                   loss_mean=float(loss.mean()) if k else 0.0,
+                   loss_m2=float(((loss - loss.mean()) ** 2).sum()) if k else 0.0,
+                   diverged=diverged)
+
+    def merge(self, other):
+        """Combine with the statistics of another block (Chan et al. parallel update)."""
+        n_a, n_b = self.count, other.count
+        total = n_a + n_b
+        if total:
+            delta = other.mean - self.mean
+            self.mean = self.mean + delta * (n_b / total)
+            self.m2 = self.m2 + other.m2 + delta ** 2 * (n_a * n_b / total)
+            d_loss = other.loss_mean - self.loss_mean
+            self.loss_mean += d_loss * n_b / total
+            self.loss_m2 += other.loss_m2 + d_loss ** 2 * n_a * n_b / total
+        self.count = total
+        self.hist = self.hist + other.hist
+        self.violations = self.violations + other.violations
+        self.any_violation += other.any_violation
+        self.diverged += other.diverged
+        return self
+
+    def quantile(self, q, edges):
+        """(n,) per-bus |V| quantile q, interpolated linearly inside the histogram bins."""
+        cdf = np.cumsum(self.hist, axis=1)
+        target = q * self.count
+        j = np.argmax(cdf >= target, axis=1)
+        j = np.clip(j, 1, len(edges) - 1)                    # under/overflow clamp to the range
+        below = np.take_along_axis(cdf, (j - 1)[:, None], axis=1)[:, 0]
+        inside = self.hist[np.arange(len(j)), j]
+        frac = np.divide(target - below, inside, out=np.zeros(len(j)), where=inside > 0)
+        return edges[j - 1] + np.clip(frac, 0.0, 1.0) * (edges[j] - edges[j - 1])
+
+
+@dataclass
+class PLFResult:
+    n_samples: int                        # samples drawn
+    n_converged: int                      # samples whose load flow converged
+    mean: np.ndarray                      # (n,) mean |V| (pu)
+    std: np.ndarray                       # (n,) standard deviation of |V| (pu)
+    quantiles: dict                       # q -> (n,) |V| quantile
+    p_violation: np.ndarray               # (n,) probability of |V| outside the limits
+    p_any_violation: float                # probability that any bus is outside the limits
+    loss_mean: float                      # mean total active loss (pu)
+    loss_std: float                       # standard deviation of the total loss (pu)
+
+    def as_rows(self):
+        """One dict per bus (1-based), e.g. for JSON tool output."""
+        return [
+            {"bus": i + 1, "mean": float(self.mean[i]), "std": float(self.std[i]),
+             **{f"q{int(round(q * 100)):02d}": float(v[i]) for q, v in self.quantiles.items()},
+             "p_violation": float(self.p_violation[i])}
+            for i in range(len(self.mean))
+        ]
+
+    def as_dict(self):
+        return {
+            "n_samples": self.n_samples,
+            "n_converged": self.n_converged,
+            "p_any_violation": self.p_any_violation,
+            "loss_mean": self.loss_mean,
+            "loss_std": self.loss_std,
+            "buses": self.as_rows(),
+        }
+
+
+_WORKER = {}
+
+
+def _base_factors(ctx):
+    """Factors of the base-case Jacobian, shared by every scenario."""
+    Y, V_base, pv, pq = ctx["Ybus"], ctx["V_base"], ctx["pv"], ctx["pq"]
+    return OrderedLU(build_jacobian(Y, V_base, pv, pq), jacobian_order(get_ordering(Y), pv, pq))
+
+
+def _init_worker(ctx):
+    # Factor once per worker process
+    _WORKER["ctx"] = ctx
+    _WORKER["lu"] = _base_factors(ctx)
+
+
+def _solve_block(ctx, lu, dP, dQ):
+    """
+    Load flow of a block of scenarios, all iterated together.
+
+    Chord (fixed Jacobian) iterations reuse the base-case factors for every
+    scenario, so each iteration is one sparse product and one multi-column
+    triangular solve for the whole block. Scenarios that have not converged
+    after max_chord iterations are finished with a full Newton-Raphson solve.
+
+    Returns:
+        (vm, loss, converged): (k, n) magnitudes, (k,) losses and flags
+    """
+    Y, V_base, pv, pq, tol = ctx["Ybus"], ctx["V_base"], ctx["pv"], ctx["pq"], ctx["tol"]
+    pvpq = np.r_[pv, pq]
+    m = len(pvpq)
+    S = (ctx["S_base"] + dP + 1j * dQ).T                     # (n, k)
+    k = S.shape[1]
+    Va = np.repeat(np.angle(V_base)[:, None], k, axis=1)
+    Vm = np.repeat(np.abs(V_base)[:, None], k, axis=1)
+    V = Vm * np.exp(1j * Va)
+    active = np.arange(k)
+    for _ in range(ctx["max_chord"]):
+        Va_a, Vm_a = Va[:, active], Vm[:, active]
+        V_a = Vm_a * np.exp(1j * Va_a)
+        mis = V_a * np.conj(Y @ V_a) - S[:, active]
+        F = np.vstack([mis[pvpq].real, mis[pq].imag])
+        done = np.max(np.abs(F), axis=0, initial=0.0) < tol
+        V[:, active[done]] = V_a[:, done]
+        active, F = active[~done], F[:, ~done]
+        if len(active) == 0:
+            break
+        dx = -lu.solve(F)
+        Va[np.ix_(pvpq, active)] += dx[:m]
+        Vm[np.ix_(pq, active)] += dx[m:]
+
+    converged = np.ones(k, dtype=bool)
+    for s in active:
+        V[:, s], converged[s], _ = newton_raphson(Y, V_base, pv, pq, S[:, s], tol, ctx["max_iter"])
+    converged &= np.all(np.isfinite(V), axis=0)
+    loss = (V * np.conj(Y @ V)).real.sum(axis=0)
+    return np.abs(V).T, loss, converged
+
+
+def _run_block(ctx, lu, block):
+    index, size = block
+    rng = np.random.default_rng([ctx["seed"], index])
+    dP, dQ = sample_injections(ctx["uncertainties"], len(ctx["V_base"]), size, rng)
+    vm, loss, ok = _solve_block(ctx, lu, dP, dQ)
+    return RunningStats.from_block(vm[ok], loss[ok], ctx["v_min"], ctx["v_max"], ctx["edges"],
+                                   diverged=int(np.count_nonzero(~ok)))
+
+
+def _worker_block(block):
+    return _run_block(_WORKER["ctx"], _WORKER["lu"], block)
+
+
+def probabilistic_load_flow(Ybus, bus_type, p_spec, q_spec, uncertainties, V_init=None,
+                            n_samples=10000, block_size=500, v_min=0.95, v_max=1.05,
+                            quantiles=(0.05, 0.5, 0.95), v_range=(0.8, 1.2), n_bins=400,
+                            tol=1e-6, max_iter=20, max_chord=15, seed=0, workers=None):
+    """
+    Monte Carlo probabilistic load flow.
+
+    Injection scenarios are drawn from the given uncertainties in vectorized
+    blocks of block_size samples and solved block by block (see _solve_block)
+    from the base-case solution. Each worker process factors the base-case
+    Jacobian once and reuses it for all its blocks. Every block is reduced
+    to running statistics at once (Welford mean and variance, |V| histograms
+    for the quantiles, violation counts), which are merged as blocks finish,
+    so no sample is stored. Block b always uses the random stream
+    (seed, b), so results do not depend on the number of workers. Reactive
+    power limits are not enforced.
+
+    Args:
+        Ybus, bus_type, p_spec, q_spec, V_init: Base case as for
+            newton_raphson_loadflow (bus 0 is the slack)
+        uncertainties: Uncertainty terms or dicts for parse_uncertainties
+        n_samples: Number of scenarios
+        block_size: Scenarios drawn and solved together
+        v_min, v_max: Voltage limits (scalars or (n,) arrays, pu)
+        quantiles: |V| quantiles to report
+        v_range, n_bins: Histogram range and bins used for the quantiles
+            (values outside the range clamp to its ends)
+        tol, max_iter: Mismatch tolerance and Newton iterations of the fallback
+        max_chord: Fixed-Jacobian iterations before the Newton fallback
+        seed: Random seed
+        workers: Number of worker processes (default os.cpu_count(); 1 runs
+            in this process)
+
+    Returns:
+        PLFResult
+    """
+    Y = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    n = Y.shape[0]
+    bus_type = np.asarray(bus_type)
+    p_spec = np.asarray(p_spec, dtype=float)
+    q_spec = np.asarray(q_spec, dtype=float)
+    terms = [u if isinstance(u, Uncertainty) else parse_uncertainties([u])[0] for u in uncertainties]
+    if any(not 0 < u.bus < n for u in terms):
+        raise ValueError("uncertain injections must be at non-slack buses of the network")
+
+    V_base = newton_raphson_loadflow(Y, bus_type, p_spec, q_spec, [], [], V_init,
+                                     tol=min(tol, 1e-8), max_iter=max_iter)
+    pv = np.flatnonzero(bus_type == 2)
+    pv = pv[pv != 0]
+    pq = np.setdiff1d(np.arange(1, n), pv)
+    ctx = {
+        "Ybus": Y, "V_base": V_base, "pv": pv, "pq": pq, "S_base": p_spec + 1j * q_spec,
+        "uncertainties": terms, "seed": seed, "tol": tol, "max_iter": max_iter,
+        "max_chord": max_chord, "v_min": np.broadcast_to(np.asarray(v_min, dtype=float), (n,)),
+        "v_max": np.broadcast_to(np.asarray(v_max, dtype=float), (n,)),
+        "edges": np.linspace(v_range[0], v_range[1], n_bins + 1),
+    }
+    blocks = [(b, min(block_size, n_samples - start))
+              for b, start in enumerate(range(0, n_samples, block_size))]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(blocks)))
+    if workers == 1:
+        lu = _base_factors(ctx)
+        stats = _merge(_run_block(ctx, lu, b) for b in blocks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ctx,)) as pool:
+            stats = _merge(pool.map(_worker_block, blocks))
+
+    count = max(stats.count, 1)
+    return PLFResult(
+        n_samples=n_samples,
+        n_converged=stats.count,
+        mean=stats.mean,
+        std=np.sqrt(stats.m2 / max(stats.count - 1, 1)),
+        quantiles={q: stats.quantile(q, ctx["edges"]) for q in quantiles},
+        p_violation=stats.violations / count,
+        p_any_violation=stats.any_violation / count,
+        loss_mean=stats.loss_mean,
+        loss_std=float(np.sqrt(stats.loss_m2 / max(stats.count - 1, 1))),
+    )
+
+
+def _merge(partials):
+    stats = None
+    for part in partials:
+        stats = part if stats is None else stats.merge(part)
+    return stats
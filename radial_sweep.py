@@ -0,0 +1,217 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, shortest_path
+from scipy.sparse.linalg import splu
+from dataclasses import dataclass
+from factor_cache import fingerprint, get_cache
+from network import as_ybus
+from newton_raphson import newton_raphson_loadflow
+
+
+@dataclass
+class RadialFeeder:
+    order: np.ndarray                     # (n,) buses in BFS order from the root (order[0] == 0)
+    parent: np.ndarray                    # (n,) upstream bus of every bus (-1 at the root)
+    depth: np.ndarray                     # (n,) branches between each bus and the root
+    y_series: np.ndarray                  # (n,) series admittance of the branch feeding each bus
+    y_shunt: np.ndarray                   # (n,) admittance to ground at each bus (Ybus row sums)
+    lu: object                            # SuperLU of the tree incidence matrix in BFS order
+
+    def backward(self, i_load):
+        """
+        Backward sweep: current of the branch feeding every bus (0 at the root)
+        from the current drawn at every bus.
+        """
+        j = np.zeros(len(self.order), dtype=complex)
+        j[self.order[1:]] = self.lu.solve(np.asarray(i_load, dtype=complex)[self.order[1:]])
+        return j
+
+    def forward(self, v_root, j_branch):
+        """Forward sweep: bus voltages from the root voltage and the branch currents."""
+        c = self.order[1:]
+        V = np.full(len(self.order), v_root, dtype=complex)
+        V[c] -= self.lu.solve(j_branch[c] / self.y_series[c], trans="T")
+        return V
+
+    def path_impedance(self, buses):
+        """
+        Tree impedance matrix between the given buses (shunts ignored): entry
+        (a, b) is the impedance of the path that buses a and b share to the root.
+        """
+        c = self.order[1:]
+        z = np.zeros(len(self.order), dtype=complex)
+        z[c] = 1 / self.y_series[c]
+        cols = np.zeros((len(c), len(buses)), dtype=complex)
+        position = np.empty(len(self.order), dtype=np.int64)
+        position[self.order] = np.arange(len(self.order))
+        cols[position[buses] - 1, np.arange(len(buses))] = 1
+        j = self.lu.solve(cols)
+        drop = self.lu.solve(z[c][:, None] * j, trans="T")
+        return drop[position[buses] - 1]
+
+    def as_dict(self):
+        """Feeder topology summary (1-based buses), e.g. for JSON tool output."""
+        ends = np.setdiff1d(self.order, self.parent)
+        return {
+            "n_bus": len(self.order),
+            "max_depth": int(self.depth.max()),
+            "n_laterals": int(len(ends)),
+            "deepest_bus": int(np.argmax(self.depth)) + 1,
+        }
+
+
+def feeder_topology(from_bus, to_bus, n_bus, root=0):
+    """
+    BFS ordering of a radial branch list.
+
+    Parallel branches between the same pair of buses count once. The network
+    is radial when the remaining branches form a single tree, i.e. there are
+    exactly n_bus - 1 of them and all buses are reached from the root.
+
+    Args:
+        from_bus, to_bus: 0-based end buses of every branch
+        n_bus: Number of buses
+        root: Root (slack) bus
+
+    Returns:
+        (order, parent, depth) arrays as in RadialFeeder, or None when the
+        branch list has loops or is not connected
+    """
+    fb, tb = np.asarray(from_bus, dtype=np.int64), np.asarray(to_bus, dtype=np.int64)
+    keep = fb != tb
+    lo, hi = np.minimum(fb[keep], tb[keep]), np.maximum(fb[keep], tb[keep])
+    G = sp.coo_matrix((np.ones(len(lo)), (lo, hi)), shape=(n_bus, n_bus)).tocsr()
+    G.sum_duplicates()
+    if G.nnz != n_bus - 1:
+        return None
+    order, parent = breadth_first_order(G, root, directed=False, return_predecessors=True)
+    if len(order) != n_bus:
+        return None
+    parent = parent.astype(np.int64)
+    parent[root] = -1
+    depth = shortest_path(G, indices=root, directed=False, unweighted=True).astype(np.int64)
+    return order.astype(np.int64), parent, depth
+
+
+def radial_feeder(Ybus):
+    """
+    Radial feeder model of a network given as its Ybus, or None if it is meshed.
+
+    Any symmetric Ybus is a set of series branches (-Y_ij) plus a shunt at
+    every bus (the row sum), which folds line charging and off-nominal taps
+    into the bus shunts. With the buses in BFS order from bus 0 the branch
+    incidence matrix of the tree is unit upper triangular, so its SuperLU
+    factors have no fill and each sweep is one O(n) triangular solve. The
+    model (or the finding that the network is meshed) is cached per network.
+
+    Returns:
+        RadialFeeder, or None when the network has loops, is split or is not
+        symmetric (phase shifters)
+    """
+    Y = sp.csr_matrix(Ybus, dtype=complex)
+    Y.sum_duplicates()
+
+    def compute():
+        if abs(Y - Y.T).max() > 1e-12 * max(abs(Y).max(), 1.0):
+            return False
+        off = sp.triu(Y, k=1).tocoo()
+        nz = off.data != 0
+        topology = feeder_topology(off.row[nz], off.col[nz], Y.shape[0])
+        if topology is None:
+            return False
+        order, parent, depth = topology
+        c = order[1:]
+        y_series = np.zeros(len(order), dtype=complex)
+        y_series[c] = -np.asarray(Y[parent[c], c]).ravel()
+        y_shunt = np.asarray(Y.sum(axis=1)).ravel()
+
+        # Incidence matrix over the non-root buses in BFS order: a branch
+        # current is its own bus's current plus the currents of its children
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        inner = c[parent[c] != 0]
+        K = sp.csc_matrix(
+            (np.r_[np.ones(len(c)), -np.ones(len(inner))],
+             (np.r_[position[c], position[parent[inner]]] - 1, np.r_[position[c], position[inner]] - 1)),
+            shape=(len(c), len(c)), dtype=complex)
+        lu = splu(K, permc_spec="NATURAL", diag_pivot_thresh=0.0)
+        return RadialFeeder(order, parent, depth, y_series, y_shunt, lu)
+
+    # A meshed network is cached as False, since the cache treats None as a miss
+    feeder = get_cache().get_or_compute(fingerprint(Y), "radial", compute)
+    return None if feeder is False else feeder
+
+
+def backward_forward_sweep(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
+                           V_init=None, tol=1e-6, max_iter=100,
+                           mesh_solver=newton_raphson_loadflow):
+    """
+    Backward/forward sweep load flow for radial feeders, with the same
+    interface as gauss_seidel_loadflow.
+
+    Every iteration computes the current drawn at each bus from the present
+    voltages, accumulates it into branch currents from the feeder ends to
+    the root (backward sweep) and updates the voltages from the root outwards
+    (forward sweep). Both sweeps are single triangular solves on the BFS
+    ordered tree, so an iteration is O(n) and the convergence does not
+    depend on the R/X ratio of the lines. PV buses hold the magnitude given
+    in V_init through a reactive power compensation computed from the tree
+    impedances between the PV buses; a PV bus that reaches a Q limit is
+    held at it as a PQ bus.
+
+    Meshed networks (and the rare radial case that does not converge) are
+    handed to mesh_solver instead.
+
+    Args:
+        Ybus, bus_type, p_spec, q_spec, q_min, q_max, V_init, tol, max_iter:
+            As for gauss_seidel_loadflow (bus 0 is the slack); tol applies to
+            the largest voltage change of an iteration
+        mesh_solver: Load flow function with that interface used when the
+            network is not radial
+
+    Returns:
+        (n,) complex ndarray of final bus voltages
+    """
+    Ybus = as_ybus(Ybus)
+    feeder = radial_feeder(Ybus)
+    if feeder is None:
+        return mesh_solver(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
+                           V_init=V_init, tol=tol, max_iter=max_iter)
+
+    n = len(feeder.order)
+    bus_type = np.asarray(bus_type)
+    q = np.array(q_spec, dtype=float)
+    q_lo = np.full(n, -np.inf) if q_min is None or len(q_min) == 0 else np.asarray(q_min, dtype=float)
+    q_hi = np.full(n, np.inf) if q_max is None or len(q_max) == 0 else np.asarray(q_max, dtype=float)
+    V = np.ones(n, dtype=complex) if V_init is None or len(V_init) == 0 else np.array(V_init, dtype=complex)
+    v_root = V[0]
+
+    pv = np.flatnonzero(bus_type == 2)
+    pv = pv[pv != 0]
+    v_set = np.abs(V[pv])
+    active = np.ones(len(pv), dtype=bool)
+    x_pv = feeder.path_impedance(pv).imag if len(pv) else None
+
+    for _ in range(max_iter):
+        S = np.asarray(p_spec, dtype=float) + 1j * q
+        i_load = feeder.y_shunt * V - np.conj(S / V)
+        V_new = feeder.forward(v_root, feeder.backward(i_load))
+        dv = np.max(np.abs(V_new - V))
+        V = V_new
+
+        dv_pv = 0.0
+        if active.any():
+            # Reactive compensation that closes the magnitude error of the PV buses
+            k = np.flatnonzero(active)
+            err = v_set[k] - np.abs(V[pv[k]])
+            dv_pv = np.max(np.abs(err))
+            q[pv[k]] += np.linalg.solve(x_pv[np.ix_(k, k)], err * v_set[k])
+            limited = (q[pv] > q_hi[pv]) | (q[pv] < q_lo[pv])
+            q[pv] = np.clip(q[pv], q_lo[pv], q_hi[pv])
+            active &= ~limited
+
+        if dv < tol and dv_pv < tol:
+            return V
+
+    return mesh_solver(Ybus, bus_type, p_spec, q_spec, q_min, q_max,
+                       V_init=V_init, tol=tol, max_iter=max_iter)
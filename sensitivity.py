@@ -0,0 +1,237 @@
+import os
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from factor_cache import fingerprint, get_cache
+from network import as_line_data
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SENSITIVITY_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "chatbot_eee", "sensitivity"),
+)
+
+
+class DCSensitivity:
+    """
+    DC power transfer (PTDF) and line outage (LODF) distribution factors.
+
+    Built from the same branch rows as build_ybus ([from_bus, to_bus, R, X,
+    a, shunt, ...], only X is used). The reduced B matrix is factored once and
+    PTDF columns (one per injection bus) and rows (one per monitored branch)
+    are solved only when first requested, as are LODF columns. Computed
+    vectors are kept in memory and, if cache_dir is set, in a directory named
+    after the network fingerprint, so a later session on the same network
+    starts warm. New vectors are written as separate block files once
+    flush_size of them are pending (and by save()), so the cache I/O grows
+    with the new vectors only.
+
+    PTDF[m, k] is the flow change on branch m (from -> to) for 1 pu injected
+    at bus k and withdrawn at the slack bus. All bus and branch indices are
+    0-based.
+    """
+
+    def __init__(self, line_data, n_bus=None, slack=0, cache_dir=DEFAULT_CACHE_DIR, flush_size=256):
+        # Only the branch ends and reactances enter B, so a Network's rows needn't be exact
+        ldata = np.asarray(as_line_data(line_data, exact=False), dtype=float)
+        fb = ldata[:, 0].astype(np.int64) - 1
+        tb = ldata[:, 1].astype(np.int64) - 1
+        x = ldata[:, 3]
+        if np.any(x == 0):
+            raise ValueError("DC sensitivities need a nonzero reactance on every branch")
+        if n_bus is None:
+            n_bus = int(max(fb.max(), tb.max())) + 1
+
+        self.fb, self.tb = fb, tb
+        self.b = 1.0 / x
+        self.n_bus = n_bus
+        self.n_branch = len(fb)
+        self.slack = slack
+
+        idx = np.arange(self.n_branch)
+        # Branch-bus incidence (+1 at the from bus, -1 at the to bus)
+        self.A = sp.csr_matrix((np.r_[np.ones(self.n_branch), -np.ones(self.n_branch)],
+                                (np.r_[idx, idx], np.r_[fb, tb])),
+                               shape=(self.n_branch, n_bus))
+        self.Bf = sp.diags(self.b) @ self.A
+        self._keep = np.flatnonzero(np.arange(n_bus) != slack)
+
+        self.fingerprint = fingerprint(self.Bf)
+        self._cols = {}
+        self._rows = {}
+        self._lodf = {}
+        self._pending = {"cols": [], "rows": [], "lodf": []}
+        self.flush_size = flush_size
+        self._path = None
+        if cache_dir:
+            self._path = os.path.join(cache_dir, f"ptdf_{self.fingerprint}_{slack}")
+            self._load()
+
+    # --- Persistence ---
+
+    def _store(self, kind):
+        return {"cols": self._cols, "rows": self._rows, "lodf": self._lodf}[kind]
+
+    def _load(self):
+        if not os.path.isdir(self._path):
+            return
+        for name in sorted(os.listdir(self._path)):
+            kind = name.split("_", 1)[0]
+            if not name.endswith(".npz") or kind not in self._pending:
+                continue
+            with np.load(os.path.join(self._path, name)) as data:
+                self._store(kind).update(zip(data["idx"].tolist(), data["data"]))
+
+    def _add(self, kind, index, vectors):
+        """Keep new vectors (one per row of vectors) and flush once enough are pending."""
+        store = self._store(kind)
+        for j, k in enumerate(index):
+            store[k] = vectors[j]
+        self._pending[kind].extend(index)
+        if sum(len(v) for v in self._pending.values()) >= self.flush_size:
+            self.save()
+
+    def save(self):
+        """Write the vectors computed since the last save as new block files."""
+        if self._path is None:
+            return
+        for kind, index in self._pending.items():
+            if not index:
+                continue
+            os.makedirs(self._path, exist_ok=True)
+            store = self._store(kind)
+            # mkstemp names are unique, so concurrent sessions never share a file
+            fd, tmp = tempfile.mkstemp(prefix=f"{kind}_", suffix=".tmp", dir=self._path)
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, idx=np.array(index, dtype=np.int64), data=np.array([store[k] for k in index]))
+            os.replace(tmp, tmp[:-4] + ".npz")
+            self._pending[kind] = []
+
+    # --- Solves ---
+
+    def _solve(self, rhs):
+        """Angles for bus injections rhs (n, k), slack angle fixed at 0."""
+        def factor():
+            B = (self.A.T @ self.Bf).tocsc()
+            return splu(B[self._keep][:, self._keep].tocsc(), permc_spec="MMD_AT_PLUS_A")
+
+        lu = get_cache().get_or_compute(self.fingerprint, "dc_lu", factor, key=self.slack)
+        theta = np.zeros((self.n_bus, rhs.shape[1]))
+        theta[self._keep] = lu.solve(np.ascontiguousarray(rhs[self._keep]))
+        return theta
+
+    def ptdf_columns(self, buses):
+        """PTDF columns for the given injection buses, shape (n_branch, len(buses))."""
+        buses = [int(k) for k in np.atleast_1d(buses)]
+        missing = [k for k in dict.fromkeys(buses) if k not in self._cols]
+        if missing:
+            rhs = np.zeros((self.n_bus, len(missing)))
+            rhs[missing, np.arange(len(missing))] = 1.0
+            self._add("cols", missing, (self.Bf @ self._solve(rhs)).T)
+        return np.column_stack([self._cols[k] for k in buses]) if buses else np.zeros((self.n_branch, 0))
+
+    def ptdf_rows(self, branches):
+        """PTDF rows for the given monitored branches, shape (len(branches), n_bus)."""
+        branches = [int(m) for m in np.atleast_1d(branches)]
+        missing = [m for m in dict.fromkeys(branches) if m not in self._rows]
+        if missing:
+            # B is symmetric, so row m of Bf B^-1 is B^-1 applied to row m of Bf
+            self._add("rows", missing, self._solve(self.Bf[missing].T.toarray()).T)
+        return np.vstack([self._rows[m] for m in branches]) if branches else np.zeros((0, self.n_bus))
+
+    def ptdf(self):
+        """Full (n_branch, n_bus) PTDF matrix."""
+        return self.ptdf_columns(np.arange(self.n_bus))
+
+    def transfer_ptdf(self, from_bus, to_bus):
+        """Flow change on every branch per pu injected at from_bus and withdrawn at to_bus."""
+        cols = self.ptdf_columns([from_bus, to_bus])
+        return cols[:, 0] - cols[:, 1]
+
+    def lodf_columns(self, outages):
+        """
+        LODF columns for the given outaged branches, shape (n_branch, len(outages)).
+
+        Column l holds the share of the pre-outage flow of branch l picked up
+        by every branch (-1 on l itself). Outages that island the network
+        (bridges) have no LODF and get nan columns.
+        """
+        outages = [int(l) for l in np.atleast_1d(outages)]
+        missing = np.array([l for l in dict.fromkeys(outages) if l not in self._lodf], dtype=np.int64)
+        if len(missing):
+            # Flow response to a unit transfer between the ends of each outaged branch
+            rhs = self.A[missing].T.toarray()
+            ptdf = self.Bf @ self._solve(rhs)
+            self_ptdf = ptdf[missing, np.arange(len(missing))]
+            bridge = self.islanding(missing, self_ptdf)
+            lodf = ptdf / np.where(bridge, 1.0, 1 - self_ptdf)
+            lodf[missing, np.arange(len(missing))] = -1.0
+            lodf[:, bridge] = np.nan
+            self._add("lodf", missing.tolist(), lodf.T)
+        return np.column_stack([self._lodf[l] for l in outages]) if outages else np.zeros((self.n_branch, 0))
+
+    def islanding(self, outages, self_ptdf=None):
+        """Boolean mask of the outages that split the network."""
+        outages = np.atleast_1d(outages).astype(np.int64)
+        if self_ptdf is None:
+            self_ptdf = np.diag(self.ptdf_rows(outages) @ self.A[outages].T.toarray())
+        return np.atleast_1d(1 - np.asarray(self_ptdf) < 1e-8)
+
+    # --- Flow questions ---
+
+    def injection_flows(self, delta_p, base_flows=None):
+        """Branch flows after bus injection changes delta_p (n,), balanced by the slack."""
+        delta_p = np.asarray(delta_p, dtype=float)
+        buses = np.flatnonzero(delta_p)
+        base = np.zeros(self.n_branch) if base_flows is None else np.asarray(base_flows, dtype=float)
+        return base + self.ptdf_columns(buses) @ delta_p[buses]
+
+    def transfer_flows(self, from_bus, to_bus, amount, base_flows=None):
+        """Branch flows after moving amount (pu) of injection from from_bus to to_bus."""
+        base = np.zeros(self.n_branch) if base_flows is None else np.asarray(base_flows, dtype=float)
+        return base + amount * self.transfer_ptdf(from_bus, to_bus)
+
+    def outage_flows(self, branch, base_flows):
+        """Branch flows after the outage of one branch (nan if it islands the network)."""
+        base = np.asarray(base_flows, dtype=float)
+        return base + self.lodf_columns([branch])[:, 0] * base[branch]
+
+
+def dc_flow_study(line_data, from_bus=None, to_bus=None, amount=0.0, outage_branch=None,
+                  base_flows=None, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Branch flows after a transfer and/or a branch outage from DC sensitivities.
+
+    Args:
+        line_data: Branch rows [from_bus, to_bus, R, X, a, shunt, ...] or a Network
+        from_bus, to_bus: 1-based buses of the transfer (injected at from_bus,
+            withdrawn at to_bus); omit for an outage-only study
+        amount: Transferred power (pu)
+        outage_branch: Optional 1-based line_data row taken out after the transfer
+        base_flows: Optional (n_branch,) base-case active flows (pu); without
+            them the result is the flow change only
+        cache_dir: Directory of the on-disk PTDF cache (None disables it)
+
+    Returns:
+        List of dicts (1-based) with base flow, new flow and change per branch
+    """
+    sens = DCSensitivity(line_data, cache_dir=cache_dir)
+    base = np.zeros(sens.n_branch) if base_flows is None else np.asarray(base_flows, dtype=float)
+    flows = base
+    if from_bus is not None and to_bus is not None:
+        flows = sens.transfer_flows(from_bus - 1, to_bus - 1, amount, flows)
+    if outage_branch is not None:
+        flows = sens.outage_flows(outage_branch - 1, flows)
+    sens.save()
+
+    return [
+        {
+            "branch": m + 1,
+            "from_bus": int(sens.fb[m]) + 1,
+            "to_bus": int(sens.tb[m]) + 1,
+            "base_flow": float(base[m]),
+            "new_flow": float(flows[m]),
+            "change": float(flows[m] - base[m]),
+        }
+        for m in range(sens.n_branch)
+    ]
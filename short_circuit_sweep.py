@@ -0,0 +1,276 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import spsolve_triangular
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import os
+from factor_cache import fingerprint, get_cache
+from fault_analysis import factorize_ybus
+from network import as_ybus
+
+FAULT_TYPES = ("3ph", "slg", "ll", "dlg")
+
+# Below this many buses a sweep runs in-process by default: starting the pool
+# and attaching the shared factors costs more than the blocks it would spread
+POOL_MIN_BUSES = 2000
+
+# Symmetrical components operator a = 1/120deg and the phase transform
+_A = np.exp(2j * np.pi / 3)
+_PHASE = np.array([
+    [1, 1, 1],
+    [1, _A ** 2, _A],
+    [1, _A, _A ** 2],
+])
+
+
+@dataclass
+class ShortCircuitTable:
+    fault_types: tuple                    # column labels of i_fault / v_min
+    i_fault: np.ndarray                   # (n, 4) largest phase fault current magnitude (pu)
+    v_min: np.ndarray                     # (n, 4) lowest post-fault phase voltage magnitude over all buses (pu)
+    z_thevenin: np.ndarray                # (n, 3) complex Thevenin impedances [Z1, Z2, Z0]
+    z0_assumed: bool = False              # no zero-sequence Ybus given, Z0 taken equal to Z1
+
+    def as_dict(self):
+        """Rows plus the zero-sequence assumption, if any, e.g. for JSON tool output."""
+        result = {"buses": self.as_rows()}
+        if self.z0_assumed:
+            result["warning"] = ("No zero-sequence Ybus was given, so Z0 was taken equal to Z1; "
+                                 "the SLG and DLG results ignore the real grounding and are indicative only")
+        return result
+
+    def as_rows(self):
+        """One dict per bus (1-based), e.g. for JSON tool output."""
+        rows = []
+        for k in range(len(self.i_fault)):
+            row = {"bus": k + 1}
+            for j, name in enumerate(self.fault_types):
+                row[f"i_{name}"] = float(self.i_fault[k, j])
+                row[f"vmin_{name}"] = float(self.v_min[k, j])
+            rows.append(row)
+        return rows
+
+
+def _sequence_currents(z1, z2, z0, v_f, z_fault):
+    """
+    Sequence fault currents [I0, I1, I2] for every fault type.
+
+    Args:
+        z1, z2, z0: (B,) Thevenin impedances at the faulted buses
+        v_f: (B,) pre-fault voltages at the faulted buses
+        z_fault: Fault impedance
+
+    Returns:
+        (4, 3, B) complex array ordered as FAULT_TYPES x [I0, I1, I2]
+    """
+    zero = np.zeros_like(z1)
+    i_seq = np.empty((4, 3, len(z1)), dtype=complex)
+
+    # Three-phase
+    i1 = v_f / (z1 + z_fault)
+    i_seq[0] = [zero, i1, zero]
+
+    # Single line-to-ground
+    i1 = v_f / (z1 + z2 + z0 + 3 * z_fault)
+    i_seq[1] = [i1, i1, i1]
+
+    # Line-to-line
+    i1 = v_f / (z1 + z2 + z_fault)
+    i_seq[2] = [zero, i1, -i1]
+
+    # Double line-to-ground
+    z0f = z0 + 3 * z_fault
+    i1 = v_f / (z1 + z2 * z0f / (z2 + z0f))
+    i_seq[3] = [-i1 * z2 / (z2 + z0f), i1, -i1 * z0f / (z2 + z0f)]
+
+    return i_seq
+
+
+def _block_results(solvers, v_pre, z_fault, buses):
+    """
+    Fault currents and worst post-fault voltages for a block of faulted buses.
+
+    Args:
+        solvers: Three callables returning Zbus columns [Z1, Z2, Z0] for the buses
+        v_pre: (n,) pre-fault voltages
+        z_fault: Fault impedance
+        buses: 0-based faulted buses of this block
+
+    Returns:
+        Tuple (i_fault (B, 4), v_min (B, 4), z_thevenin (B, 3))
+    """
+    buses = np.asarray(buses)
+    cols = [solve(buses) for solve in solvers]          # each (n, B)
+    b_idx = np.arange(len(buses))
+    z_th = np.stack([c[buses, b_idx] for c in cols], axis=1)
+
+    i_seq = _sequence_currents(z_th[:, 0], z_th[:, 1], z_th[:, 2], v_pre[buses], z_fault)
+
+    i_fault = np.empty((len(buses), 4))
+    v_min = np.empty((len(buses), 4))
+    for t in range(4):
+        i0, i1, i2 = i_seq[t]
+        i_fault[:, t] = np.abs(_PHASE @ i_seq[t]).max(axis=0)
+
+        # Sequence voltages at every bus for every faulted bus in the block;
+        # 3ph faults have no negative/zero sequence and LL faults no zero sequence
+        v1 = v_pre[:, None] - cols[0] * i1
+        if FAULT_TYPES[t] == "3ph":
+            v_min[:, t] = np.abs(v1).min(axis=0)
+            continue
+        v2 = -cols[1] * i2
+        v0 = 0 if FAULT_TYPES[t] == "ll" else -cols[2] * i0
+        worst = np.abs(v0 + v1 + v2).min(axis=0)
+        np.minimum(worst, np.abs(v0 + _A ** 2 * v1 + _A * v2).min(axis=0), out=worst)
+        np.minimum(worst, np.abs(v0 + _A * v1 + _A ** 2 * v2).min(axis=0), out=worst)
+        v_min[:, t] = worst
+
+    return i_fault, v_min, z_th
+
+
+def _unit_rhs(n, buses):
+    rhs = np.zeros((n, len(buses)), dtype=complex)
+    rhs[buses, np.arange(len(buses))] = 1.0
+    return rhs
+
+
+# --- Shared-memory factor store for the worker pool ---
+
+def _pack_arrays(arrays):
+    """Copy named arrays into one shared memory block; returns (shm, layout)."""
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = (offset + 63) // 64 * 64
+        layout[name] = (offset, arr.dtype.str, arr.shape)
+        offset += arr.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, arr in arrays.items():
+        start, dtype, shape = layout[name]
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = arr
+    return shm, layout
+
+
+def _attach_arrays(shm, layout):
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+        for name, (start, dtype, shape) in layout.items()
+    }
+
+
+def _factor_arrays(prefix, lu):
+    L = lu.L.tocsr()
+    U = lu.U.tocsr()
+    return {
+        f"{prefix}_L_data": L.data, f"{prefix}_L_indices": L.indices, f"{prefix}_L_indptr": L.indptr,
+        f"{prefix}_U_data": U.data, f"{prefix}_U_indices": U.indices, f"{prefix}_U_indptr": U.indptr,
+        f"{prefix}_perm_r": lu.perm_r, f"{prefix}_perm_c": lu.perm_c,
+    }
+
+
+def _triangular_solver(arrays, prefix, n):
+    """Zbus column solver built on L/U factors that live in shared memory."""
+    L = sp.csr_matrix((arrays[f"{prefix}_L_data"], arrays[f"{prefix}_L_indices"],
+                       arrays[f"{prefix}_L_indptr"]), shape=(n, n), copy=False)
+    U = sp.csr_matrix((arrays[f"{prefix}_U_data"], arrays[f"{prefix}_U_indices"],
+                       arrays[f"{prefix}_U_indptr"]), shape=(n, n), copy=False)
+    perm_r = arrays[f"{prefix}_perm_r"]
+    perm_c = arrays[f"{prefix}_perm_c"]
+
+    def solve(buses):
+        # Pr A Pc = L U  =>  x = Pc U^-1 L^-1 Pr b
+        rhs = np.zeros((n, len(buses)), dtype=complex)
+        rhs[perm_r[buses], np.arange(len(buses))] = 1.0
+        y = spsolve_triangular(L, rhs, lower=True, unit_diagonal=True)
+        w = spsolve_triangular(U, y, lower=False)
+        return w[perm_c]
+
+    return solve
+
+
+_WORKER = {}
+
+
+def _init_worker(shm_name, layout, n, z_fault):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    arrays = _attach_arrays(shm, layout)
+    _WORKER["shm"] = shm
+    _WORKER["solvers"] = [_triangular_solver(arrays, seq, n) for seq in ("z1", "z2", "z0")]
+    _WORKER["v_pre"] = arrays["v_pre"]
+    _WORKER["z_fault"] = z_fault
+
+
+def _worker_block(buses):
+    return _block_results(_WORKER["solvers"], _WORKER["v_pre"], _WORKER["z_fault"], buses)
+
+
+def short_circuit_sweep(y1, y2=None, y0=None, v_pre=None, z_fault=0.0,
+                        workers=None, block_size=32):
+    """
+    Three-phase, SLG, LL and DLG fault study at every bus.
+
+    The positive, negative and zero-sequence Ybus matrices are each factored
+    once with sparse LU; the Thevenin impedances and transfer impedances of
+    all buses are then solved from those shared factorizations in blocks of
+    buses. With more than one worker the L/U factors are placed in shared
+    memory and the blocks are spread across a process pool.
+
+    Args:
+        y1: (n, n) positive-sequence Ybus (dense, sparse or a Network, including
+            generator/grounding admittances so it is nonsingular)
+        y2: Negative-sequence Ybus (defaults to y1)
+        y0: Zero-sequence Ybus. Without it Z0 is taken equal to Z1 and the
+            table is flagged (z0_assumed), since SLG and DLG currents depend
+            on the grounding
+        v_pre: (n,) pre-fault voltages (default 1.0 pu everywhere)
+        z_fault: Fault impedance (0 for bolted faults)
+        workers: Number of worker processes (default: CPU count from POOL_MIN_BUSES
+            buses up, in-process below; 1 runs in-process)
+        block_size: Faulted buses solved per block
+
+    Returns:
+        ShortCircuitTable with fault current and worst post-fault voltage per
+        bus and fault type
+    """
+    y1 = sp.csc_matrix(as_ybus(y1), dtype=complex)
+    y2 = y1 if y2 is None else sp.csc_matrix(as_ybus(y2), dtype=complex)
+    z0_assumed = y0 is None
+    y0 = y1 if y0 is None else sp.csc_matrix(as_ybus(y0), dtype=complex)
+    n = y1.shape[0]
+    v_pre = np.ones(n, dtype=complex) if v_pre is None else np.asarray(v_pre, dtype=complex).ravel()
+
+    # Factorizations come from (and stay in) the shared factor cache
+    cache = get_cache()
+    lus = {}
+    for name, y in (("z1", y1), ("z2", y2), ("z0", y0)):
+        lus[name] = cache.get_or_compute(fingerprint(y), "lu", lambda y=y: factorize_ybus(y))
+
+    blocks = [np.arange(s, min(s + block_size, n)) for s in range(0, n, block_size)]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if n >= POOL_MIN_BUSES else 1
+    workers = max(1, min(workers, len(blocks)))
+
+    if workers == 1:
+        solvers = [lambda b, lu=lus[k]: lu.solve(_unit_rhs(n, b)) for k in ("z1", "z2", "z0")]
+        results = [_block_results(solvers, v_pre, z_fault, b) for b in blocks]
+    else:
+        arrays = {"v_pre": v_pre}
+        for name, lu in lus.items():
+            arrays.update(_factor_arrays(name, lu))
+        shm, layout = _pack_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name, layout, n, z_fault)) as pool:
+                results = list(pool.map(_worker_block, blocks))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return ShortCircuitTable(
+        fault_types=FAULT_TYPES,
+        i_fault=np.vstack([r[0] for r in results]),
+        v_min=np.vstack([r[1] for r in results]),
+        z_thevenin=np.vstack([r[2] for r in results]),
+        z0_assumed=z0_assumed,
+    )
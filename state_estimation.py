@@ -0,0 +1,316 @@
+import csv
+from dataclasses import dataclass
+import numpy as np
+import scipy.sparse as sp
+from scipy.stats import chi2
+from bus_ordering import OrderedLU, get_ordering
+from newton_raphson import dS_dV
+from network import as_ybus
+
+# vm / va: bus voltage magnitude / angle (rad), p / q: bus injection,
+# pf / qf: flow leaving bus towards to_bus
+MEASUREMENT_TYPES = ("vm", "va", "p", "q", "pf", "qf")
+
+
+@dataclass
+class MeasurementSet:
+    kind: np.ndarray                      # (m,) measurement type, one of MEASUREMENT_TYPES
+    bus: np.ndarray                       # (m,) 0-based bus (sending bus of a flow)
+    to_bus: np.ndarray                    # (m,) 0-based receiving bus of a flow (-1 otherwise)
+    value: np.ndarray                     # (m,) measured value (pu, rad)
+    sigma: np.ndarray                     # (m,) standard deviation of the meter (pu, rad)
+
+    def __len__(self):
+        return len(self.value)
+
+    def subset(self, keep):
+        return MeasurementSet(self.kind[keep], self.bus[keep], self.to_bus[keep],
+                              self.value[keep], self.sigma[keep])
+
+    def as_rows(self, index=None):
+        """One dict per measurement (1-based buses), e.g. for JSON tool output."""
+        index = range(len(self)) if index is None else index
+        return [{"type": str(self.kind[i]), "bus": int(self.bus[i]) + 1,
+                 "to_bus": int(self.to_bus[i]) + 1 if self.to_bus[i] >= 0 else None,
+                 "value": float(self.value[i]), "sigma": float(self.sigma[i])} for i in index]
+
+
+def parse_measurements(rows):
+    """
+    Measurement set from dicts (or CSV rows) with "type", 1-based "bus",
+    "to_bus" for flows, "value" and "sigma".
+    """
+    kind, bus, to_bus, value, sigma = [], [], [], [], []
+    for row in rows:
+        row = {str(k).strip().lower(): v for k, v in row.items()}
+        k = str(row["type"]).strip().lower()
+        if k not in MEASUREMENT_TYPES:
+            raise ValueError(f"unknown measurement type {k!r}; use one of {MEASUREMENT_TYPES}")
+        to = row.get("to_bus")
+        if k in ("pf", "qf") and to in (None, ""):
+            raise ValueError(f"{k} measurement at bus {row['bus']} needs a to_bus")
+        kind.append(k)
+        bus.append(int(float(row["bus"])) - 1)
+        to_bus.append(int(float(to)) - 1 if k in ("pf", "qf") else -1)
+        value.append(float(row["value"]))
+        sigma.append(float(row["sigma"]))
+    if min(sigma, default=1.0) <= 0:
+        raise ValueError("measurement sigmas must be positive")
+    return MeasurementSet(np.array(kind, dtype="<U2"), np.array(bus, dtype=np.int64),
+                          np.array(to_bus, dtype=np.int64), np.array(value, dtype=float),
+                          np.array(sigma, dtype=float))
+
+
+def read_measurements(path):
+    """
+    Measurement table from a CSV with a header row containing the columns
+    type, bus, to_bus (flows only), value and sigma.
+    """
+    with open(path, "r", newline="", encoding="utf-8") as fh:
+        return parse_measurements(r for r in csv.DictReader(fh) if any(v.strip() for v in r.values() if v))
+
+
+def _flow_stamps(measurements, Ybus, branches):
+    """
+    (y_s, y_m) of every flow measurement, with S = V_bus conj(y_s V_bus + y_m V_to).
+
+    Parallel branches between the same buses are combined (the meter sees
+    the whole corridor). Without branch data the flow is that of the series
+    element -Y_ij alone, i.e. line charging is ignored.
+    """
+    flows = np.flatnonzero(np.isin(measurements.kind, ("pf", "qf")))
+    i, j = measurements.bus[flows], measurements.to_bus[flows]
+    if branches is None:
+        y_m = np.asarray(sp.csr_matrix(Ybus)[i, j]).ravel()
+        y_s = -y_m
+    else:
+        f, t, yff, yft, ytf, ytt = branches
+        stamps = {}
+        for a, b, ys, ym in zip(np.r_[f, t].tolist(), np.r_[t, f].tolist(),
+                                np.r_[yff, ytt].tolist(), np.r_[yft, ytf].tolist()):
+            s0, m0 = stamps.get((a, b), (0j, 0j))
+            stamps[(a, b)] = (s0 + ys, m0 + ym)
+        y_s, y_m = np.zeros(len(flows), dtype=complex), np.zeros(len(flows), dtype=complex)
+        for k, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+            y_s[k], y_m[k] = stamps.get((a, b), (0j, 0j))
+    if np.any(y_m == 0):
+        raise ValueError("flow measurement on buses that are not connected")
+    return flows, y_s, y_m
+
+
+def _measurement_model(Ybus, V, measurements, flows, y_s, y_m):
+    """
+    Measurement function h(V) and its sparse Jacobian with respect to
+    [Va (all buses), Vm (all buses)].
+    """
+    n = len(V)
+    m = len(measurements)
+    kind, bus = measurements.kind, measurements.bus
+    h = np.zeros(m)
+    S = V * np.conj(Ybus @ V)
+    dSa, dSm = dS_dV(Ybus, V)
+    blocks = []
+
+    for k in ("vm", "va"):
+        rows = np.flatnonzero(kind == k)
+        h[rows] = np.abs(V[bus[rows]]) if k == "vm" else np.angle(V[bus[rows]])
+        col = bus[rows] + (n if k == "vm" else 0)
+        blocks.append((rows, sp.csr_matrix((np.ones(len(rows)), (np.arange(len(rows)), col)),
+                                           shape=(len(rows), 2 * n))))
+    for k, part in (("p", np.real), ("q", np.imag)):
+        rows = np.flatnonzero(kind == k)
+        h[rows] = part(S[bus[rows]])
+        blocks.append((rows, sp.hstack([part(dSa[bus[rows]]), part(dSm[bus[rows]])], format="csr")))
+
+    if len(flows):
+        # dS/dV of the flows, as in the branch flow derivatives of MATPOWER
+        i, j = bus[flows], measurements.to_bus[flows]
+        nf = len(flows)
+        Cf = sp.csr_matrix((np.ones(nf), (np.arange(nf), i)), shape=(nf, n))
+        Yf = sp.csr_matrix((np.r_[y_s, y_m], (np.r_[np.arange(nf), np.arange(nf)], np.r_[i, j])),
+                           shape=(nf, n))
+        If = Yf @ V
+        Sf = V[i] * np.conj(If)
+        dVa = sp.diags(1j * V)
+        dVm = sp.diags(V / np.abs(V))
+        dSf_a = sp.diags(np.conj(If)) @ Cf @ dVa + sp.diags(V[i]) @ np.conj(Yf @ dVa)
+        dSf_m = sp.diags(np.conj(If)) @ Cf @ dVm + sp.diags(V[i]) @ np.conj(Yf @ dVm)
+        for k, part in (("pf", np.real), ("qf", np.imag)):
+            sel = np.flatnonzero(kind[flows] == k)
+            h[flows[sel]] = part(Sf[sel])
+            blocks.append((flows[sel], sp.hstack([part(dSf_a[sel]), part(dSf_m[sel])], format="csr")))
+
+    order = np.concatenate([rows for rows, _ in blocks])
+    H = sp.vstack([b for _, b in blocks], format="csr")
+    position = np.empty(m, dtype=np.int64)
+    position[order] = np.arange(m)
+    return h, H[position]
+
+
+@dataclass
+class StateEstimate:
+    V: np.ndarray                         # (n,) estimated complex bus voltages
+    converged: bool                       # Gauss-Newton iterations converged
+    iterations: int                       # Gauss-Newton iterations
+    factorizations: int                   # gain matrix factorizations (reused in between)
+    objective: float                      # weighted sum of squared residuals J(x)
+    chi2_limit: float                     # 99% chi-square limit of J(x) for the redundancy
+    residuals: np.ndarray                 # (m,) residuals of the kept measurements
+    normalized_residuals: np.ndarray      # (m,) |r| / sqrt(Omega_ii) of the kept measurements
+    measurements: MeasurementSet          # measurements kept in the final estimate
+    bad_data: list                        # dicts of the removed measurements
+
+    def as_rows(self):
+        """One dict per bus (1-based), e.g. for JSON tool output."""
+        return [{"bus": i + 1, "magnitude": float(abs(v)), "angle_deg": float(np.degrees(np.angle(v)))}
+                for i, v in enumerate(self.V)]
+
+    def as_dict(self):
+        return {
+            "converged": self.converged,
+            "iterations": self.iterations,
+            "factorizations": self.factorizations,
+            "objective": self.objective,
+            "chi2_limit": self.chi2_limit,
+            "largest_normalized_residual": float(self.normalized_residuals.max(initial=0.0)),
+            "bad_data": self.bad_data,
+            "voltages": self.as_rows(),
+        }
+
+
+def _normalized_residuals(lu, H, r, sigma, block_size=256):
+    """
+    |r_i| / sqrt(Omega_ii) with the residual covariance Omega = R - H G^-1 H',
+    from blocks of solves with the gain matrix factors. Critical measurements
+    (Omega_ii ~ 0) get 0 since their errors cannot be detected.
+    """
+    Ht = H.T.tocsc()
+    omega = sigma ** 2
+    for start in range(0, H.shape[0], block_size):
+        cols = slice(start, start + block_size)
+        X = lu.solve(Ht[:, cols].toarray())
+        omega[cols] -= np.asarray(H[cols].multiply(X.T).sum(axis=1)).ravel()
+    ok = omega > 1e-10 * sigma ** 2
+    return np.divide(np.abs(r), np.sqrt(np.where(ok, omega, 1.0)), out=np.zeros_like(r), where=ok)
+
+
+def wls_state_estimation(Ybus, measurements, branches=None, V_init=None, tol=1e-6,
+                         max_iter=30, detect_bad_data=True, threshold=3.0, max_bad=5):
+    """
+    Weighted least squares state estimation.
+
+    The state is the angle of every bus but the reference (bus 0) and the
+    magnitude of every bus. Each Gauss-Newton iteration assembles the sparse
+    measurement Jacobian H for voltage, injection and flow measurements and
+    solves the gain matrix system G dx = H' W r with G = H' W H. G is
+    factored (SuperLU in symmetric mode, in the cached minimum degree order
+    of its pattern) and the factors are reused for the following iterations
+    as long as the steps keep shrinking fast; a slowing iteration triggers a
+    refactorization at the current state.
+
+    Bad data is removed with the largest normalized residual test: while the
+    largest |r_i| / sqrt(Omega_ii) exceeds threshold, that measurement is
+    dropped and the state re-estimated (at most max_bad times).
+
+    Args:
+        Ybus: (n, n) complex admittance matrix, dense or scipy sparse, or a
+            Network (whose branch stamps are then used for flow measurements)
+        measurements: MeasurementSet, or dicts / CSV path for parse_measurements
+            / read_measurements
+        branches: Optional branch stamps (f, t, yff, yft, ytf, ytt) for flow
+            measurements (see CaseData.branch_admittances); without them
+            flows use the series admittances of Ybus and ignore line charging
+        V_init: Initial voltages (flat start if None)
+        tol: Convergence tolerance on the largest state update
+        max_iter: Maximum Gauss-Newton iterations per estimate
+        detect_bad_data: Run the largest normalized residual test
+        threshold: Normalized residual above which a measurement is bad
+        max_bad: Maximum number of measurements removed
+
+    Returns:
+        StateEstimate
+    """
+    if hasattr(Ybus, "branch_admittances") and branches is None:
+        branches = Ybus.branch_admittances()
+    if isinstance(measurements, str):
+        measurements = read_measurements(measurements)
+    elif not isinstance(measurements, MeasurementSet):
+        measurements = parse_measurements(measurements)
+    Y = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    n = Y.shape[0]
+    if np.any((measurements.bus < 0) | (measurements.bus >= n) | (measurements.to_bus >= n)):
+        raise ValueError("measurement on a bus outside the network")
+    V0 = np.ones(n, dtype=complex) if V_init is None or len(V_init) == 0 else np.array(V_init, dtype=complex)
+    original = np.arange(len(measurements))
+    bad_data = []
+
+    while True:
+        est = _estimate(Y, measurements, branches, V0, tol, max_iter)
+        V, converged, iterations, factorizations, r, H, lu = est
+        sigma = measurements.sigma
+        objective = float(np.sum((r / sigma) ** 2))
+        dof = len(measurements) - (2 * n - 1)
+        r_norm = _normalized_residuals(lu, H, r, sigma.copy())
+        worst = int(np.argmax(r_norm)) if len(r_norm) else -1
+        if not (detect_bad_data and converged and worst >= 0 and r_norm[worst] > threshold
+                and len(bad_data) < max_bad and dof > 0):
+            break
+        row = measurements.as_rows([worst])[0]
+        row["normalized_residual"] = float(r_norm[worst])
+        row["row"] = int(original[worst]) + 1
+        bad_data.append(row)
+        keep = np.arange(len(measurements)) != worst
+        measurements = measurements.subset(keep)
+        original = original[keep]
+        V0 = V
+
+    return StateEstimate(
+        V=V, converged=converged, iterations=iterations, factorizations=factorizations,
+        objective=objective, chi2_limit=float(chi2.ppf(0.99, dof)) if dof > 0 else 0.0,
+        residuals=r, normalized_residuals=r_norm, measurements=measurements, bad_data=bad_data,
+    )
+
+
+def _estimate(Y, measurements, branches, V0, tol, max_iter):
+    """Gauss-Newton iterations with gain matrix factor reuse."""
+    n = Y.shape[0]
+    flows, y_s, y_m = _flow_stamps(measurements, Y, branches)
+    w = 1.0 / measurements.sigma ** 2
+    W = sp.diags(w)
+    Va, Vm = np.angle(V0), np.abs(V0)
+    if len(measurements) < 2 * n - 1:
+        raise ValueError(f"the network is not observable from {len(measurements)} measurements "
+                         f"({2 * n - 1} states)")
+    lu, order, refactor = None, None, True
+    prev_step, factorizations, converged = np.inf, 0, False
+
+    for it in range(1, max_iter + 1):
+        V = Vm * np.exp(1j * Va)
+        h, H = _measurement_model(Y, V, measurements, flows, y_s, y_m)
+        H = H[:, 1:]                                          # bus 0 is the angle reference
+        r = measurements.value - h
+        if refactor:
+            G = (H.T @ W @ H).tocsc()
+            if order is None:
+                order = get_ordering(G).perm
+            try:
+                lu = OrderedLU(G, order)
+            except RuntimeError:
+                raise ValueError("the network is not observable from these measurements") from None
+            factorizations += 1
+        dx = lu.solve(H.T @ (w * r))
+        Va[1:] += dx[:n - 1]
+        Vm += dx[n - 1:]
+        step = np.max(np.abs(dx))
+        refactor = step > 0.25 * prev_step
+        prev_step = step
+        if step < tol:
+            converged = True
+            break
+
+    # Residuals and gain matrix factors at the estimate for the bad data test
+    V = Vm * np.exp(1j * Va)
+    h, H = _measurement_model(Y, V, measurements, flows, y_s, y_m)
+    H = H[:, 1:]
+    lu = OrderedLU((H.T @ W @ H).tocsc(), order)
+    return V, converged, it, factorizations, measurements.value - h, H, lu
@@ -0,0 +1,67 @@
+# Tests for the fill-reducing bus ordering
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot.bus_ordering import (OrderedLU, fill_statistics, get_ordering,
+                                  minimum_degree_order, symbolic_fill)
+from chatbot.fault_analysis import factorize_ybus
+from chatbot.newton_raphson import newton_raphson
+from chatbot.ybus_builder import build_ybus
+
+
+def _star(n):
+    """Hub at bus 0 connected to every other bus; the worst case for natural order."""
+    line_data = np.array([[1, k, 0.01, 0.05, 1, 0.02] for k in range(2, n + 1)])
+    return build_ybus(line_data, n_bus=n)
+
+
+class TestBusOrdering(unittest.TestCase):
+
+    def test_star_hub_is_eliminated_last(self):
+        ybus = _star(8)
+        ordering = minimum_degree_order(ybus)
+        # Once a single leaf is left the hub ties with it
+        self.assertIn(0, ordering.perm[-2:])
+        self.assertEqual(ordering.fill_in, 0)
+        self.assertEqual(sorted(ordering.perm), list(range(8)))
+        np.testing.assert_array_equal(ordering.position[ordering.perm], np.arange(8))
+        # Eliminating the hub first joins every other bus
+        self.assertEqual(symbolic_fill(ybus), 7 * 6 // 2)
+        stats = fill_statistics(ybus)
+        self.assertEqual(stats["nnz_factor"], 8 + 2 * 7)
+        self.assertEqual(stats["nnz_factor_natural"], 64)
+
+    def test_symbolic_fill_matches_lu(self):
+        ybus = _star(8)
+        lu = OrderedLU(ybus, minimum_degree_order(ybus).perm)
+        self.assertEqual(lu.L.nnz + lu.U.nnz - 8, minimum_degree_order(ybus).nnz_factor)
+        # Explicit factors are only formed on request, not kept with every factorization
+        self.assertNotIn("L", vars(lu))
+        self.assertNotIn("U", vars(lu))
+
+    def test_ordering_is_cached_per_pattern(self):
+        ybus = _star(6)
+        first = get_ordering(ybus)
+        self.assertIs(get_ordering(2 * ybus), first)
+        self.assertIsNot(get_ordering(_star(7)), first)
+
+    def test_solvers_work_in_user_numbering(self):
+        ybus = _star(6) + sp.diags(np.full(6, -0.5j))
+        lu = factorize_ybus(ybus)
+        rhs = np.eye(6, dtype=complex)[:, [0, 4]]
+        np.testing.assert_allclose(lu.solve(rhs), np.linalg.inv(ybus.toarray())[:, [0, 4]],
+                                   atol=1e-12)
+
+        S = np.array([0, -0.3 - 0.1j, 0.2, -0.1, -0.2 - 0.05j, -0.1])
+        V, converged, _ = newton_raphson(ybus, np.ones(6, dtype=complex), [2], [1, 3, 4, 5], S,
+                                         tol=1e-12)
+        self.assertTrue(converged)
+        mis = V * np.conj(ybus @ V) - S
+        self.assertLess(np.max(np.abs(np.r_[mis[1:].real, mis[[1, 3, 4, 5]].imag])), 1e-10)
+
+
+if __name__ == "__main__":
+    unittest.main()
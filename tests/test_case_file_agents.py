@@ -0,0 +1,140 @@
+# Tests for the argument handling of the agent tools (network_file bus numbering, Ybus inputs)
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from chatbot.agents import fault_agent, gs_agent, loss_agent, ybus_agent
+from chatbot.network import load_network
+from chatbot.network_reduction import kron_reduce
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.short_circuit_sweep import short_circuit_sweep
+
+# Slack is bus 30, so the internal (slack first) order is 30, 10, 20, 40
+_CASE4 = """function mpc = case4
+mpc.version = '2';
+mpc.baseMVA = 100;
+mpc.bus = [
+	10	1	30	10	0	0	1	1	0	230	1	1.1	0.9;
+	20	2	20	5	0	0	1	1	0	230	1	1.1	0.9;
+	30	3	0	0	0	0	1	1.02	0	230	1	1.1	0.9;
+	40	1	40	10	0	10	1	1	0	230	1	1.1	0.9;
+];
+mpc.gen = [
+	30	0	0	300	-300	1.02	100	1	250	10;
+	20	30	0	30	-10	1.0	100	1	100	10;
+];
+mpc.branch = [
+	10	20	0.02	0.06	0.06	100	0	0	0	0	1;
+	10	30	0.08	0.24	0.05	100	0	0	0	0	1;
+	20	30	0.06	0.18	0.04	100	0	0	0	0	1;
+	20	40	0.06	0.18	0.04	100	0	0	0	0	1;
+	30	40	0.01	0.03	0.02	100	0	0	0	0	1;
+];
+"""
+
+
+def _complex_list(v):
+    return [{"real": float(x.real), "imag": float(x.imag)} for x in v]
+
+
+def _tool_response(agent, run, name, args):
+    """Run an agent on one scripted tool call and return the tool message content."""
+    call = SimpleNamespace(id="call_0", function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+    first = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=[call]))])
+    final = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="done", tool_calls=None))])
+    with patch.object(agent, "client") as client, patch("builtins.print"):
+        client.chat.completions.create.side_effect = [first, final]
+        run("prompt")
+    messages = client.chat.completions.create.call_args.kwargs["messages"]
+    return next(m["content"] for m in messages if isinstance(m, dict) and m.get("role") == "tool")
+
+
+class TestCaseFileAgents(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "case4.m")
+        with open(self.path, "w") as fh:
+            fh.write(_CASE4)
+        self.net = load_network(self.path, cache_dir=None)
+        self.V = newton_raphson_loadflow(**self.net.loadflow_inputs(), tol=1e-12)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_network_positions(self):
+        np.testing.assert_array_equal(self.net.bus_ids, [30, 10, 20, 40])
+        self.assertEqual(self.net.positions(40), 3)
+        np.testing.assert_array_equal(self.net.positions([10, 30]), [1, 0])
+        with self.assertRaises(ValueError):
+            self.net.positions(1)
+
+    def test_kron_reduce_uses_case_bus_numbers(self):
+        result = json.loads(_tool_response(ybus_agent, ybus_agent.run_ybus_agent, "kron_reduce",
+                                           {"network_file": self.path, "retained_buses": [40, 10]}))
+        self.assertEqual(result["retained_buses"], [40, 10])
+        expected = kron_reduce(self.net, [3, 1]).y_reduced
+        got = np.array([[y["real"] + 1j * y["imag"] for y in row] for row in result["Ybus_reduced"]])
+        np.testing.assert_allclose(got, expected, atol=1e-12)
+
+    def test_contingency_and_flows_report_case_bus_numbers(self):
+        result = json.loads(_tool_response(ybus_agent, ybus_agent.run_ybus_agent, "n1_contingency",
+                                           {"network_file": self.path, "v_base": _complex_list(self.V)}))
+        self.assertEqual(result["islanding_outages"], [])
+        ends = {(r["from_bus"], r["to_bus"]) for r in result["outages"]}
+        self.assertEqual(ends, {(10, 20), (10, 30), (20, 30), (20, 40), (30, 40)})
+
+        rows = json.loads(_tool_response(ybus_agent, ybus_agent.run_ybus_agent, "dc_flow_sensitivity",
+                                         {"network_file": self.path, "from_bus": 40, "to_bus": 10,
+                                          "amount": 0.1}))
+        change = {(r["from_bus"], r["to_bus"]): r["change"] for r in rows}
+        # Injected at 40, withdrawn at 10: both branches out of 40 carry the transfer away
+        self.assertAlmostEqual(change[(20, 40)] + change[(30, 40)], -0.1)
+
+    def test_fault_tools_use_case_bus_numbers(self):
+        result = json.loads(_tool_response(fault_agent, fault_agent.run_conversation, "short_circuit_sweep",
+                                           {"network_file": self.path}))
+        self.assertEqual([row["bus"] for row in result["buses"]], [30, 10, 20, 40])
+        table = short_circuit_sweep(self.net)
+        self.assertAlmostEqual(result["buses"][3]["i_3ph"], table.i_fault[3, 0])
+
+        text = _tool_response(fault_agent, fault_agent.run_conversation, "get_fault_analysis",
+                              {"network_file": self.path, "is_zbus": False, "fault_bus_py": 40,
+                               "v_pre_np": _complex_list(np.ones(4))})
+        i_fault = 1.0 / table.z_thevenin[3, 0]
+        self.assertIn(f"Fault current (pu): {i_fault}", text)
+
+    def test_loss_sweep_uses_case_bus_numbers(self):
+        rows = json.loads(_tool_response(loss_agent, loss_agent.run_conversation, "sweep_new_load",
+                                         {"network_file": self.path, "v_np": _complex_list(self.V),
+                                          "new_load": {"real": 0.1, "imag": 0.02},
+                                          "candidate_buses": [40, 10]}))
+        self.assertEqual({row["bus"] for row in rows}, {40, 10})
+
+        result = json.loads(_tool_response(loss_agent, loss_agent.run_conversation, "study_new_load",
+                                           {"network_file": self.path, "v_np": _complex_list(self.V),
+                                            "new_load": {"real": 0.1, "imag": 0.02}, "bus_at_py": 40}))
+        self.assertEqual(result["buses"], [30, 10, 20, 40])
+        by_site = {row["bus"]: row["total_loss"] for row in rows}
+        self.assertAlmostEqual(result["total_loss"], by_site[40], places=10)
+
+
+class TestLoadFlowAgentArguments(unittest.TestCase):
+
+    def test_missing_or_duplicate_ybus_is_a_tool_error(self):
+        args = {"bus_type": [1, 3], "p_spec": [0, -0.1], "q_spec": [0, 0],
+                "V_init": _complex_list(np.ones(2))}
+        for extra in ({}, {"Ybus": [[{"real": 1, "imag": -10}]], "Ybus_file": "ybus.csv"}):
+            content = _tool_response(gs_agent, gs_agent.run_conversation, "newton_raphson_loadflow",
+                                     {**args, **extra})
+            self.assertIn("Ybus_file", json.loads(content)["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+# Tests for the MATPOWER / IEEE CDF case file parsers
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.case_files import load_case, parse_ieee_cdf, parse_matpower
+from chatbot.newton_raphson import newton_raphson_loadflow
+
+# MATPOWER case9 with the slack moved to bus 30 and the buses renumbered
+_CASE9 = """function mpc = case9
+%% MATPOWER Case Format : Version 2
+mpc.version = '2';
+mpc.baseMVA = 100;
+
+%% bus data
+%	bus_i	type	Pd	Qd	Gs	Bs	area	Vm	Va	baseKV	zone	Vmax	Vmin
+mpc.bus = [
+	10	2	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	20	2	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	30	3	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	40	1	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	50	1	90	30	0	0	1	1	0	345	1	1.1	0.9;
+	60	1	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	70	1	100	35	0	0	1	1	0	345	1	1.1	0.9;
+	80	1	0	0	0	0	1	1	0	345	1	1.1	0.9;
+	90	1	125	50	0	0	1	1	0	345	1	1.1	0.9;
+];
+
+%% generator data
+mpc.gen = [
+	30	72.3	27.03	300	-300	1.04	100	1	250	10;
+	10	163	6.54	300	-300	1.025	100	1	300	10;
+	20	85	-10.95	300	-300	1.025	100	1	270	10;
+];
+
+%% branch data
+mpc.branch = [
+	30	40	0	0.0576	0	250	250	250	0	0	1;
+	40	50	0.017	0.092	0.158	250	250	250	0	0	1;
+	50	60	0.039	0.17	0.358	150	150	150	0	0	1;
+	20	60	0	0.0586	0	300	300	300	0	0	1;
+	60	70	0.0119	0.1008	0.209	150	150	150	0	0	1;
+	70	80	0.0085	0.072	0.149	250	250	250	0	0	1;
+	80	10	0	0.0625	0	250	250	250	0	0	1;
+	80	90	0.032	0.161	0.306	250	250	250	0	0	1;
+	90	40	0.01	0.085	0.176	250	250	250	0	0	1;
+];
+
+mpc.gencost = [
+	2	1500	0	3	0.11	5	150;
+];
+"""
+
+
+def _cdf_bus(num, name, kind, vm, pd, qd, pg, qg, vset, qmax, qmin, b=0.0):
+    return (f"{num:4d} {name:<12s} 1{1:3d}{kind:3d} {vm:6.3f}{0.0:7.2f}{pd:9.1f}{qd:10.1f}"
+            f"{pg:9.1f}{qg:8.1f}{0.0:7.1f} {vset:6.3f}{qmax:8.1f}{qmin:8.1f}{0.0:8.2f}{b:8.2f}    0")
+
+
+def _cdf_branch(f, t, r, x, b, ratio=0.0):
+    return (f"{f:4d} {t:4d}  1  1 1 0 {r:10.5f}{x:11.5f}{b:10.4f}     0     0     0    0 0"
+            f"  {ratio:6.3f}     0.0 0.0    0.0     0.0    0.0   0.0")
+
+
+# 4-bus CDF case with a tap-changing transformer and a shunt capacitor
+_CDF = "\n".join([
+    f"{'08/19/93 UW ARCHIVE':<31}{100.0:6.1f} 1993 W 4 Bus Test Case",
+    "BUS DATA FOLLOWS                            4 ITEMS",
+    _cdf_bus(1, "Bus 1     HV", 3, 1.06, 0.0, 0.0, 50.0, 0.0, 1.06, 0.0, 0.0),
+    _cdf_bus(2, "Bus 2     HV", 2, 1.04, 20.0, 10.0, 40.0, 5.0, 1.04, 50.0, -40.0),
+    _cdf_bus(3, "Bus 3     LV", 0, 1.00, 45.0, 15.0, 0.0, 0.0, 0.0, 0.0, 0.0, b=0.19),
+    _cdf_bus(4, "Bus 4     LV", 0, 1.00, 40.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+    "-999",
+    "BRANCH DATA FOLLOWS                         4 ITEMS",
+    _cdf_branch(1, 2, 0.02, 0.06, 0.06),
+    _cdf_branch(1, 3, 0.08, 0.24, 0.05),
+    _cdf_branch(2, 4, 0.0, 0.25, 0.0, ratio=0.978),
+    _cdf_branch(3, 4, 0.01, 0.03, 0.02),
+    "-999",
+    "END OF DATA",
+])
+
+
+class TestCaseFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.m_path = os.path.join(self.tmp.name, "case9.m")
+        self.cdf_path = os.path.join(self.tmp.name, "case4.cdf")
+        with open(self.m_path, "w") as fh:
+            fh.write(_CASE9)
+        with open(self.cdf_path, "w") as fh:
+            fh.write(_CDF)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matpower_case9_load_flow(self):
+        case = parse_matpower(self.m_path)
+        self.assertEqual(case.bus_ids.tolist(), [30, 10, 20, 40, 50, 60, 70, 80, 90])
+        self.assertEqual(case.summary()["total_load_mw"], 315.0)
+        V = newton_raphson_loadflow(**case.loadflow_inputs(), tol=1e-10)
+        # Published MATPOWER solution of case9 (bus 9 of the original numbering)
+        self.assertAlmostEqual(abs(V[8]), 0.9956, places=4)
+        self.assertAlmostEqual(np.degrees(np.angle(V[8])), -3.989, places=3)
+        loss = (V * np.conj(case.ybus() @ V)).real.sum() * case.base_mva
+        self.assertAlmostEqual(loss, 4.641, places=3)
+
+    def test_ieee_cdf_tables(self):
+        case = parse_ieee_cdf(self.cdf_path)
+        self.assertEqual(case.name, "4 Bus Test Case")
+        self.assertEqual(case.bus[:, 1].tolist(), [3, 2, 1, 1])
+        self.assertEqual(case.bus[2, 5], 19.0)
+        self.assertEqual(case.gen[:, 0].tolist(), [1, 2])
+        self.assertEqual(case.gen[1, 3:6].tolist(), [50.0, -40.0, 1.04])
+
+        Y = case.ybus().toarray()
+        # Transformer 2-4 with its tap on the from side, shunt capacitor at bus 3
+        ys = 1 / 0.25j
+        self.assertAlmostEqual(Y[1, 3], -ys / 0.978)
+        self.assertAlmostEqual(Y[1, 1], 1 / (0.02 + 0.06j) + 0.03j + ys / 0.978 ** 2)
+        self.assertAlmostEqual(Y[3, 3], ys + 1 / (0.01 + 0.03j) + 0.01j)
+        self.assertAlmostEqual(Y[2, 2], 1 / (0.08 + 0.24j) + 1 / (0.01 + 0.03j) + 0.035j + 0.19j)
+
+        kw = case.loadflow_inputs()
+        np.testing.assert_allclose(kw["p_spec"], [0.5, 0.2, -0.45, -0.4])
+        self.assertEqual(kw["bus_type"].tolist(), [1, 2, 1, 1])
+        V = newton_raphson_loadflow(**kw, tol=1e-10)
+        S = V * np.conj(case.ybus() @ V)
+        np.testing.assert_allclose(S[1:].real, kw["p_spec"][1:], atol=1e-9)
+        self.assertAlmostEqual(abs(V[1]), 1.04)
+
+    def test_load_case_uses_npz_cache(self):
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        first = load_case(self.m_path, cache_dir=cache_dir)
+        files = os.listdir(cache_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith("case_") and files[0].endswith(".npz"))
+        second = load_case(self.m_path, cache_dir=cache_dir)
+        np.testing.assert_array_equal(second.branch, first.branch)
+        np.testing.assert_array_equal(second.bus_ids, first.bus_ids)
+        self.assertEqual(second.name, "case9")
+
+        cdf = load_case(self.cdf_path, cache_dir=cache_dir)
+        self.assertEqual(cdf.n_bus, 4)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
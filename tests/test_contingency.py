@@ -0,0 +1,69 @@
+# Tests for the N-1 contingency analysis
+
+import unittest
+
+import numpy as np
+
+from chatbot.contingency import dc_screen, n1_contingency
+from chatbot.newton_raphson import newton_raphson
+from chatbot.ybus_builder import build_ybus
+
+# 5-bus meshed system with a radial spur to bus 5
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.06, 1.0],
+    [1, 3, 0.08, 0.24, 1, 0.05, 0.5],
+    [2, 3, 0.06, 0.18, 1, 0.04, 0.5],
+    [2, 4, 0.06, 0.18, 1, 0.04, 0.5],
+    [3, 4, 0.01, 0.03, 1, 0.02, 0.5],
+    [4, 5, 0.02, 0.08, 1, 0.02, 0.5],
+])
+_S = np.array([0, -0.2 - 0.1j, -0.45 - 0.15j, -0.4 - 0.05j, -0.1 - 0.05j])
+_PQ = np.arange(1, 5)
+
+
+def _solve(line_data):
+    ybus = build_ybus(line_data, n_bus=5)
+    V, converged, _ = newton_raphson(ybus, np.ones(5, dtype=complex), [], _PQ, _S, tol=1e-12)
+    return V, converged
+
+
+class TestContingency(unittest.TestCase):
+
+    def setUp(self):
+        self.v_base, _ = _solve(_LINE_DATA)
+
+    def test_ac_outage_matches_rebuilt_network(self):
+        results = n1_contingency(_LINE_DATA, self.v_base, tol=1e-12, v_min=0.97)
+        for res in results:
+            if res.islanded:
+                continue
+            V, converged = _solve(np.delete(_LINE_DATA, res.branch - 1, axis=0))
+            self.assertTrue(converged and res.converged)
+            vm = np.abs(V)
+            self.assertAlmostEqual(res.min_voltage, vm.min(), places=9)
+            self.assertEqual([b for b, _ in res.voltage_violations],
+                             [k + 1 for k in np.flatnonzero(vm < 0.97)])
+
+    def test_radial_branch_is_islanding(self):
+        results = {r.branch: r for r in dc_screen(_LINE_DATA, self.v_base)}
+        self.assertTrue(results[6].islanded)
+        self.assertEqual(sum(r.islanded for r in results.values()), 1)
+
+    def test_ranking_and_top_k(self):
+        results = n1_contingency(_LINE_DATA, self.v_base, top_k=2)
+        severity = [r.dc_severity for r in results]
+        self.assertEqual(sorted(severity, reverse=True), severity)
+        self.assertEqual(results[0].branch, 6)
+        # The islanding outage is ranked but not solved in AC, nor counted in top_k
+        self.assertEqual([r.verified for r in results], [False, True, True, False, False, False])
+
+    def test_overloads_use_rate_column(self):
+        rates = np.full(6, 0.05)
+        result = n1_contingency(_LINE_DATA, self.v_base, rates=rates)[1]
+        self.assertTrue(result.overloads)
+        self.assertTrue(all(loading > 1 for _, loading in result.overloads))
+        self.assertNotIn(result.branch, [b for b, _ in result.overloads])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# Tests for the continuation power flow
+
+import unittest
+
+import numpy as np
+
+from chatbot.continuation_power_flow import continuation_power_flow
+from chatbot.newton_raphson import newton_raphson, power_mismatch
+from chatbot.ybus_builder import build_ybus
+
+# 5-bus meshed system, PV generator at bus 3
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+    [4, 5, 0.02, 0.08, 1, 0.02],
+])
+_BUS_TYPE = np.array([1, 3, 2, 3, 3])
+_P = np.array([0.0, -0.2, 0.4, -0.45, -0.4])
+_Q = np.array([0.0, -0.1, 0.0, -0.15, -0.05])
+_V0 = np.array([1.05, 1, 1.02, 1, 1], dtype=complex)
+
+
+class TestContinuationPowerFlow(unittest.TestCase):
+
+    def test_two_bus_nose_matches_analytic_limit(self):
+        # Lossless line, unity power factor load: P_max = V^2 / (2 X)
+        x = 0.1
+        ybus = np.array([[1, -1], [-1, 1]]) / (1j * x)
+        curve = continuation_power_flow(ybus, [1, 3], [0, -1.0], [0, 0])
+        self.assertTrue(curve.converged)
+        self.assertAlmostEqual(1 + curve.max_lambda, 1 / (2 * x), places=3)
+        self.assertAlmostEqual(abs(curve.V[curve.nose_index, 1]), np.sqrt(0.5), places=2)
+        # The lower branch is traced back below the base load
+        self.assertLess(curve.lam[-1], 0)
+
+    def test_points_solve_the_load_flow(self):
+        ybus = build_ybus(_LINE_DATA, n_bus=5)
+        p_dir, q_dir = np.minimum(_P, 0), np.minimum(_Q, 0)
+        curve = continuation_power_flow(ybus, _BUS_TYPE, _P, _Q, p_dir, q_dir, V_init=_V0,
+                                        tol=1e-10)
+        self.assertTrue(curve.converged)
+        S0, d = _P + 1j * _Q, p_dir + 1j * q_dir
+        for lam, V in zip(curve.lam, curve.V):
+            mis = power_mismatch(ybus, V, S0 + lam * d)
+            self.assertLess(np.max(np.abs(np.r_[mis[1:].real, mis[[1, 3, 4]].imag])), 1e-9)
+            self.assertAlmostEqual(abs(V[2]), 1.02)
+
+        # Base point is the Newton-Raphson solution
+        V_nr, _, _ = newton_raphson(ybus, _V0, [2], [1, 3, 4], S0, tol=1e-10)
+        np.testing.assert_allclose(curve.V[0], V_nr, atol=1e-9)
+
+        # Newton-Raphson solves just below the nose and fails just above it
+        lam = curve.max_lambda
+        self.assertTrue(newton_raphson(ybus, _V0, [2], [1, 3, 4], S0 + 0.99 * lam * d)[1])
+        self.assertFalse(newton_raphson(ybus, _V0, [2], [1, 3, 4], S0 + 1.01 * lam * d)[1])
+        self.assertAlmostEqual(curve.margin_p, lam * 1.05)
+
+    def test_stop_at_nose(self):
+        ybus = build_ybus(_LINE_DATA, n_bus=5)
+        curve = continuation_power_flow(ybus, _BUS_TYPE, _P, _Q, np.minimum(_P, 0),
+                                        np.minimum(_Q, 0), V_init=_V0, stop_at_nose=True)
+        # Tracing ends on the first point past the nose
+        self.assertGreaterEqual(curve.nose_index, len(curve.lam) - 2)
+        self.assertTrue(np.all(np.diff(curve.lam[:curve.nose_index + 1]) > 0))
+        self.assertGreater(curve.lam[-1], 0.99 * curve.max_lambda)
+        self.assertEqual(curve.as_dict()["critical_bus"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
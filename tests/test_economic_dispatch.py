@@ -0,0 +1,77 @@
+# Tests for the vectorized economic dispatch
+
+import unittest
+
+import numpy as np
+
+from chatbot.economic_dispatch import economic_dispatch
+
+# Two-unit case of matlab_scripts/point_by_point.m
+_ALPHA = np.array([0.02, 0.04])
+_BETA = np.array([16.0, 20.0])
+_B = np.array([[0.001, 0.0], [0.0, 0.0]])
+
+
+def _fleet(m=120, seed=0):
+    rng = np.random.default_rng(seed)
+    alpha = rng.uniform(0.002, 0.02, m)
+    beta = rng.uniform(10, 30, m)
+    p_min = rng.uniform(10, 50, m)
+    p_max = p_min + rng.uniform(100, 400, m)
+    B = rng.uniform(0, 2e-6, (m, m))
+    B = (B + B.T) / 2 + np.diag(rng.uniform(1e-6, 1e-5, m))
+    return alpha, beta, p_min, p_max, B
+
+
+class TestEconomicDispatch(unittest.TestCase):
+
+    def test_point_by_point_case_meets_coordination_equations(self):
+        result = economic_dispatch(_ALPHA, _BETA, 0, 250, 237.4, B=_B)
+        self.assertTrue(result.converged[0])
+        p, lam = result.p[0], result.lam[0]
+        np.testing.assert_allclose(_ALPHA * p + _BETA, lam * (1 - 2 * _B @ p), atol=1e-6)
+        self.assertAlmostEqual(result.losses[0], p @ _B @ p)
+        self.assertAlmostEqual(p.sum(), 237.4 + result.losses[0], places=5)
+
+    def test_lossless_fleet_matches_closed_form(self):
+        alpha, beta, _, _, _ = _fleet()
+        # High enough that no unit sits at its zero lower limit
+        demand = np.sum((40 - beta) / alpha)
+        result = economic_dispatch(alpha, beta, 0, np.inf, demand)
+        lam = (demand + np.sum(beta / alpha)) / np.sum(1 / alpha)
+        self.assertAlmostEqual(lam, 40)
+        self.assertAlmostEqual(result.lam[0], lam, places=8)
+        np.testing.assert_allclose(result.p[0], (lam - beta) / alpha, atol=1e-6)
+
+    def test_limits_are_enforced_at_equal_incremental_cost(self):
+        alpha, beta, p_min, p_max, B = _fleet()
+        result = economic_dispatch(alpha, beta, p_min, p_max, 0.5 * p_max.sum(), B=B)
+        p, lam = result.p[0], result.lam[0]
+        self.assertTrue(result.converged[0])
+        self.assertTrue(np.all((p >= p_min) & (p <= p_max)))
+        # Free units run at lambda, units at a limit would be on the other side of it
+        pf = 1 - 2 * B @ p
+        ic = alpha * p + beta
+        free = (p > p_min) & (p < p_max)
+        np.testing.assert_allclose(ic[free], lam * pf[free], rtol=1e-6)
+        self.assertTrue(np.all(ic[p >= p_max] <= lam * pf[p >= p_max] + 1e-9))
+        self.assertTrue(np.all(ic[p <= p_min] >= lam * pf[p <= p_min] - 1e-9))
+
+    def test_batch_matches_single_solves(self):
+        alpha, beta, p_min, p_max, B = _fleet(40)
+        demands = np.linspace(p_min.sum() + 10, 0.9 * p_max.sum(), 25)
+        curve = economic_dispatch(alpha, beta, p_min, p_max, demands, B=B)
+        self.assertTrue(curve.converged.all())
+        self.assertTrue(np.all(np.diff(curve.lam) > 0))
+        for k in (0, 12, 24):
+            single = economic_dispatch(alpha, beta, p_min, p_max, demands[k], B=B)
+            self.assertAlmostEqual(single.lam[0], curve.lam[k], places=8)
+
+    def test_infeasible_demand_is_flagged(self):
+        result = economic_dispatch(_ALPHA, _BETA, 10, 250, [5.0, 237.4, 600.0])
+        self.assertEqual(result.feasible.tolist(), [False, True, False])
+        self.assertEqual(result.converged.tolist(), [False, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Tests for the shared factorization cache
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot import fault_analysis, newton_raphson
+from chatbot.factor_cache import FactorCache, fingerprint
+
+_YBUS = np.array([
+    [3 - 8.95j, -2 + 6j, -1 + 3j, 0],
+    [-2 + 6j, 3.774 - 11.306j, -0.674 + 2.024j, -1.044 + 3.134j],
+    [-1 + 3j, -0.674 + 2.024j, 3.666 - 10.96j, -2 + 6j],
+    [0, -1.044 + 3.134j, -2 + 6j, 3 - 8.99j],
+])
+
+
+class TestFactorCache(unittest.TestCase):
+
+    def test_fingerprint_ignores_storage_format(self):
+        coo = sp.coo_matrix(_YBUS)
+        # Split one entry into two duplicates; the summed matrix is the same
+        rows = np.r_[coo.row, 0]
+        cols = np.r_[coo.col, 0]
+        data = np.r_[coo.data, 0]
+        data[0], data[-1] = 1, coo.data[0] - 1
+        dup = sp.coo_matrix((data, (rows, cols)), shape=coo.shape)
+        fp = fingerprint(_YBUS)
+        self.assertEqual(fp, fingerprint(sp.csr_matrix(_YBUS)))
+        self.assertEqual(fp, fingerprint(dup))
+        changed = _YBUS.copy()
+        changed[3, 3] += 1e-9
+        self.assertNotEqual(fp, fingerprint(changed))
+
+    def test_hits_misses_and_lru_eviction(self):
+        cache = FactorCache(max_bytes=3 * 800)
+        calls = []
+
+        def compute(i):
+            calls.append(i)
+            return np.zeros(100)          # 800 bytes
+
+        for i in range(3):
+            cache.get_or_compute("net", "col", lambda: compute(i), key=i)
+        cache.get_or_compute("net", "col", lambda: compute(0), key=0)       # hit, 0 now most recent
+        cache.get_or_compute("net", "col", lambda: compute(3), key=3)       # evicts 1
+        self.assertEqual(calls, [0, 1, 2, 3])
+        self.assertIsNone(cache.get("net", "col", key=1))
+        self.assertIsNotNone(cache.get("net", "col", key=0))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 3)
+        self.assertEqual(stats["bytes"], 3 * 800)
+
+    def test_cached_arrays_are_private_and_read_only(self):
+        cache = FactorCache()
+        v = np.ones(4, dtype=complex)
+        cache.put("net", "voltage", v)
+        v[0] = 0.0
+        cached = cache.get("net", "voltage")
+        self.assertEqual(cached[0], 1.0)
+        with self.assertRaises(ValueError):
+            cached[0] = 0.0
+        lu, column = cache.get_or_compute("net", "pair", lambda: (None, np.zeros(3)))
+        self.assertFalse(column.flags.writeable)
+
+    def test_fault_analysis_reuses_factorization(self):
+        cache = fault_analysis.get_cache()
+        cache.clear()
+        v_pre = np.ones(4, dtype=complex)
+        for k in range(4):
+            fault_analysis.get_fault_analysis(_YBUS, False, v_pre, k)
+        misses = cache.stats()["misses"]
+        # One bus ordering and one LU miss plus one column miss per bus
+        self.assertEqual(misses, 6)
+        fault_analysis.get_fault_analysis(_YBUS, False, v_pre, 2)
+        self.assertEqual(cache.stats()["misses"], misses)
+
+    def test_load_flow_warm_starts_from_last_solution(self):
+        cache = newton_raphson.get_cache()
+        cache.clear()
+        args = ([0, 1, 1, 1], [0, 0.45, -0.98, 0.32], [0, 0.22, 0.40, -0.15], [], [])
+        V = newton_raphson.newton_raphson_loadflow(_YBUS, *args, tol=1e-10)
+        np.testing.assert_allclose(cache.get(fingerprint(_YBUS), "voltage"), V)
+        V_warm = newton_raphson.newton_raphson_loadflow(_YBUS, *args, tol=1e-10)
+        np.testing.assert_allclose(V_warm, V, atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
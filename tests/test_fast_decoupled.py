@@ -0,0 +1,54 @@
+# Tests for the fast-decoupled load flow in the GS agent
+
+import unittest
+
+import numpy as np
+
+from chatbot.agents import gs_agent
+from chatbot.newton_raphson import newton_raphson_loadflow
+
+_YBUS = np.array([
+    [3 - 8.95j, -2 + 6j, -1 + 3j, 0],
+    [-2 + 6j, 3.774 - 11.306j, -0.674 + 2.024j, -1.044 + 3.134j],
+    [-1 + 3j, -0.674 + 2.024j, 3.666 - 10.96j, -2 + 6j],
+    [0, -1.044 + 3.134j, -2 + 6j, 3 - 8.99j],
+])
+_ARGS = ([0, 2, 1, 1], [0, 0.45, -0.98, 0.32], [0, 0.22, 0.40, -0.15],
+         [0, -0.1, 0, 0], [0, 0.1, 0, 0], [1.05, 1.1, 1, 1])
+
+
+class TestFastDecoupledLoadflow(unittest.TestCase):
+
+    def test_matches_newton_raphson(self):
+        expected = newton_raphson_loadflow(_YBUS, *_ARGS, tol=1e-10)
+        for method in ("xb", "bx"):
+            V = gs_agent.fast_decoupled_loadflow(_YBUS, *_ARGS, tol=1e-10, method=method)
+            np.testing.assert_allclose(V, expected, atol=1e-8)
+
+    def test_factors_reused_for_same_network(self):
+        cache = gs_agent.get_cache()
+        cache.clear()
+        gs_agent.fast_decoupled_loadflow(_YBUS, [0, 1, 1, 1], *_ARGS[1:])
+        n_cached = cache.stats()["entries"]
+        hits = cache.stats()["hits"]
+        gs_agent.fast_decoupled_loadflow(_YBUS, [0, 1, 1, 1], *_ARGS[1:])
+        self.assertEqual(cache.stats()["entries"], n_cached)
+        self.assertGreater(cache.stats()["hits"], hits)
+
+
+    def test_flat_start_and_explicit_zeros(self):
+        expected = newton_raphson_loadflow(_YBUS, *_ARGS, tol=1e-10)
+        # Bus 1 - bus 4 has no branch but an explicitly stored zero entry
+        ybus = gs_agent.sp.csr_matrix(_YBUS)
+        ybus[0, 3] = ybus[3, 0] = 0.0
+        self.assertEqual(ybus.nnz, 16)
+        for v_init in (None, []):
+            args = _ARGS[:5] + (v_init,)
+            V = gs_agent.fast_decoupled_loadflow(ybus, *args, tol=1e-10)
+            np.testing.assert_allclose(np.abs(V[[0, 1]]), [1.0, 1.0])
+        V = gs_agent.fast_decoupled_loadflow(ybus, *_ARGS, tol=1e-10)
+        np.testing.assert_allclose(V, expected, atol=1e-8)
+
+
+if __name__ == "__main__":
+    unittest.main()
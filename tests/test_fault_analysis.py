@@ -0,0 +1,51 @@
+# Tests for the native sparse fault analysis
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot.fault_analysis import factorize_ybus, get_fault_analysis, zbus_columns
+
+# 3-bus system with generator reactances to ground at buses 1 and 2
+_YBUS = np.array([
+    [-16j, 5j, 5j],
+    [5j, -22.5j, 12.5j],
+    [5j, 12.5j, -17.5j],
+])
+_V_PRE = np.array([1.0, 1.0, 1.0], dtype=complex)
+
+
+def _reference(ybus, v_pre, k):
+    """Dense port of calculate_fault.m."""
+    zbus = np.linalg.inv(ybus)
+    i_fault = v_pre[k] / zbus[k, k]
+    v_post = v_pre - zbus[:, k] * i_fault
+    return v_post, i_fault, ybus @ v_post
+
+
+class TestFaultAnalysis(unittest.TestCase):
+
+    def test_ybus_input_matches_calculate_fault(self):
+        for k in range(3):
+            v_post, i_fault, i_post = get_fault_analysis(sp.csr_matrix(_YBUS), False, _V_PRE, k)
+            ref = _reference(_YBUS, _V_PRE, k)
+            np.testing.assert_allclose(v_post, ref[0], atol=1e-12)
+            self.assertAlmostEqual(i_fault, ref[1])
+            np.testing.assert_allclose(i_post, ref[2], atol=1e-12)
+            self.assertAlmostEqual(abs(v_post[k]), 0.0)
+
+    def test_zbus_input_matches_ybus_input(self):
+        zbus = np.linalg.inv(_YBUS)
+        from_y = get_fault_analysis(_YBUS, False, _V_PRE, 2)
+        from_z = get_fault_analysis(zbus, True, _V_PRE, 2)
+        for a, b in zip(from_y, from_z):
+            np.testing.assert_allclose(a, b, atol=1e-12)
+
+    def test_zbus_columns(self):
+        cols = zbus_columns(factorize_ybus(_YBUS), [0, 2])
+        np.testing.assert_allclose(cols, np.linalg.inv(_YBUS)[:, [0, 2]], atol=1e-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# Tests for the sparse Gauss-Seidel kernel in gs_solver
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot.gs_solver import gauss_seidel, gauss_seidel_batch
+from chatbot.ybus_builder import build_ybus
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [2, 5, 0.04, 0.12, 1, 0.03],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+    [4, 5, 0.08, 0.24, 1, 0.05],
+]
+_P = np.conj(np.array([0, -0.2 - 0.1j, -0.45 - 0.15j, -0.4 - 0.05j, -0.6 - 0.1j]))
+
+
+def _dense_reference(Ybus, P, tol, max_iter):
+    """The original O(n^2) generator-based sweep."""
+    n = len(P)
+    V = np.ones(n, dtype=complex)
+    for _ in range(max_iter):
+        V_prev = V.copy()
+        for i in range(1, n):
+            sigma = sum(Ybus[i, j] * V[j] for j in range(n) if j != i)
+            V[i] = (1 / Ybus[i, i]) * ((P[i] / np.conj(V[i])) - sigma)
+        if np.max(np.abs(V - V_prev)) < tol:
+            break
+    return V
+
+
+class TestGaussSeidel(unittest.TestCase):
+
+    def setUp(self):
+        self.ybus = build_ybus(_LINE_DATA)
+
+    def test_matches_dense_reference_at_unit_omega(self):
+        for max_iter in (1, 5, 100):
+            expected = _dense_reference(self.ybus.toarray(), _P, 1e-8, max_iter)
+            V = gauss_seidel(self.ybus.toarray(), _P, tol=1e-8, max_iter=max_iter)
+            np.testing.assert_allclose(V, expected, rtol=0, atol=1e-14)
+
+    def test_sor_converges_to_same_solution(self):
+        expected = gauss_seidel(self.ybus, _P, tol=1e-12, max_iter=1000)
+        V = gauss_seidel(sp.csc_matrix(self.ybus), _P, tol=1e-12, max_iter=1000, omega=1.3)
+        np.testing.assert_allclose(V, expected, atol=1e-9)
+
+    def test_auto_tune_recovers_from_divergent_omega(self):
+        expected = gauss_seidel(self.ybus, _P, tol=1e-12, max_iter=1000)
+        V = gauss_seidel(self.ybus, _P, tol=1e-12, max_iter=200, omega=2.5, auto_tune=True)
+        np.testing.assert_allclose(V, expected, atol=1e-8)
+
+
+class TestGaussSeidelBatch(unittest.TestCase):
+
+    def test_each_scenario_matches_single_solve(self):
+        ybus = build_ybus(_LINE_DATA)
+        scales = np.array([0.5, 1.0, 1.5])[:, None]
+        V, iters, converged = gauss_seidel_batch(ybus, _P * scales, tol=1e-10, max_iter=500)
+        self.assertTrue(converged.all())
+        for row, scale in enumerate(scales[:, 0]):
+            expected = gauss_seidel(ybus, _P * scale, tol=1e-10, max_iter=500)
+            np.testing.assert_allclose(V[row], expected, atol=1e-13)
+        # Lighter loading converges in fewer sweeps
+        self.assertLess(iters[0], iters[2])
+
+    def test_reports_non_converged_scenarios(self):
+        ybus = build_ybus(_LINE_DATA)
+        V, iters, converged = gauss_seidel_batch(ybus, np.vstack([_P, _P]), tol=1e-12, max_iter=3)
+        self.assertFalse(converged.any())
+        self.assertTrue((iters == 3).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# Tests for island detection and per-island load flow
+
+import unittest
+
+import numpy as np
+
+from chatbot.islands import find_islands, solve_islands, union_find, ybus_islands
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.ybus_builder import build_ybus
+
+# Two 3-bus meshes (buses 1-3 and 4-6), a lone load at bus 7 and an empty bus 8
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.03],
+    [2, 3, 0.02, 0.06, 1, 0.03],
+    [1, 3, 0.02, 0.06, 1, 0.03],
+    [4, 5, 0.02, 0.06, 1, 0.03],
+    [5, 6, 0.02, 0.06, 1, 0.03],
+    [4, 6, 0.02, 0.06, 1, 0.03],
+])
+_BUS_TYPE = np.array([1, 3, 3, 3, 2, 3, 3, 3])
+_P = np.array([0, -0.3, -0.2, 0, 0.5, -0.4, -0.1, 0])
+_Q = np.array([0, -0.1, -0.1, 0, 0, -0.1, 0, 0])
+_V0 = np.array([1, 1, 1, 1, 1.02, 1, 1, 1], dtype=complex)
+
+
+class TestIslands(unittest.TestCase):
+
+    def test_union_find_labels(self):
+        np.testing.assert_array_equal(union_find([3, 0, 5], [4, 1, 4], 6), [0, 0, 1, 2, 2, 2])
+        np.testing.assert_array_equal(find_islands(_LINE_DATA, 8), [0, 0, 0, 1, 1, 1, 2, 3])
+        ybus = build_ybus(_LINE_DATA, n_bus=8)
+        np.testing.assert_array_equal(ybus_islands(ybus), find_islands(_LINE_DATA, 8))
+
+    def test_slack_assignment_and_dead_islands(self):
+        ybus = build_ybus(_LINE_DATA, n_bus=8)
+        sol = solve_islands(ybus, _BUS_TYPE, _P, _Q, V_init=_V0, tol=1e-10, workers=1)
+        self.assertTrue(sol.converged)
+        self.assertEqual([isl.slack for isl in sol.islands], [0, 4, -1, -1])
+        self.assertEqual([isl.status for isl in sol.islands], ["solved", "solved", "dead", "dead"])
+        np.testing.assert_array_equal(sol.V[6:], 0)
+        self.assertAlmostEqual(sol.V[4], 1.02)
+
+    def test_islands_match_separate_solves(self):
+        ybus = build_ybus(_LINE_DATA, n_bus=8)
+        sol = solve_islands(ybus, _BUS_TYPE, _P, _Q, V_init=_V0, tol=1e-10, workers=2)
+
+        first = newton_raphson_loadflow(ybus[:3, :3], _BUS_TYPE[:3], _P[:3], _Q[:3], [], [],
+                                        V_init=_V0[:3], tol=1e-10)
+        np.testing.assert_allclose(sol.V[:3], first, atol=1e-9)
+
+        # Second island renumbered with its PV bus (bus 5) as slack
+        idx = [4, 3, 5]
+        second = newton_raphson_loadflow(ybus[idx][:, idx], [1, 3, 3], _P[idx], _Q[idx], [], [],
+                                         V_init=_V0[idx], tol=1e-10)
+        np.testing.assert_allclose(sol.V[idx], second, atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# Tests for the native loss study in loss_after_new_load
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from chatbot.loss_after_new_load import branch_losses, study_new_load, sweep_new_load
+from chatbot.newton_raphson import newton_raphson
+from chatbot.ybus_builder import build_ybus
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+]
+_S = np.array([0, -0.2 - 0.1j, -0.45 - 0.15j, -0.4 - 0.05j])
+
+
+class TestLossStudy(unittest.TestCase):
+
+    def setUp(self):
+        self.ybus = build_ybus(_LINE_DATA)
+        self.v_base, _, _ = newton_raphson(self.ybus, np.ones(4, dtype=complex), [], [1, 2, 3],
+                                           _S, tol=1e-12)
+
+    def test_re_solve_matches_direct_solution(self):
+        result = study_new_load(self.ybus, self.v_base, 0.1 + 0.05j, 3)
+        S = _S.copy()
+        S[3] -= 0.1 + 0.05j
+        expected, _, _ = newton_raphson(self.ybus, np.ones(4, dtype=complex), [], [1, 2, 3], S,
+                                        tol=1e-12)
+        self.assertTrue(result["converged"])
+        np.testing.assert_allclose(result["voltages"], expected, atol=1e-8)
+
+    def test_branch_losses_sum_to_total(self):
+        result = study_new_load(self.ybus, self.v_base, 0.1 + 0.05j, 3)
+        self.assertEqual(len(result["branch_losses"]), len(_LINE_DATA))
+        total = sum(row["loss"] for row in result["branch_losses"])
+        self.assertAlmostEqual(total, result["total_loss"], places=10)
+        _, _, loss = branch_losses(self.ybus, result["voltages"])
+        self.assertTrue((loss > 0).all())
+
+    def test_branch_losses_from_line_data(self):
+        # A parallel circuit and a tapped transformer, both lost when read off Ybus
+        line_data = _LINE_DATA + [[1, 2, 0.04, 0.12, 1, 0.02], [3, 4, 0.0, 0.05, 0.95, 0]]
+        ybus = build_ybus(line_data)
+        v, _, _ = newton_raphson(ybus, np.ones(4, dtype=complex), [], [1, 2, 3], _S, tol=1e-12)
+        fb, tb, loss = branch_losses(ybus, v, line_data)
+        self.assertEqual(len(loss), len(line_data))
+        self.assertAlmostEqual(loss.sum(), np.real(np.sum(v * np.conj(ybus @ v))), places=12)
+        self.assertAlmostEqual(loss[-1], 0.0, places=12)
+        self.assertEqual(len(branch_losses(ybus, v)[2]), len(_LINE_DATA))
+
+    def test_sweep_is_ranked_and_consistent_with_single_study(self):
+        table = sweep_new_load(self.ybus, self.v_base, 0.1 + 0.05j)
+        losses = [row["total_loss"] for row in table]
+        self.assertEqual(sorted(losses), losses)
+        self.assertEqual(sorted(row["bus"] for row in table), [2, 3, 4])
+        for row in table:
+            single = study_new_load(self.ybus, self.v_base, 0.1 + 0.05j, row["bus"] - 1)
+            self.assertAlmostEqual(row["total_loss"], single["total_loss"], places=8)
+
+    def test_sweep_is_solved_as_one_batch(self):
+        # A small load converges on the shared base-case Jacobian, without per-site Newton solves
+        with patch("chatbot.loss_after_new_load.newton_raphson") as nr:
+            table = sweep_new_load(self.ybus, self.v_base, 0.1 + 0.05j, block_size=2)
+        nr.assert_not_called()
+        self.assertTrue(all(row["converged"] for row in table))
+        whole = sweep_new_load(self.ybus, self.v_base, 0.1 + 0.05j)
+        self.assertEqual([row["bus"] for row in table], [row["bus"] for row in whole])
+        np.testing.assert_allclose([row["total_loss"] for row in table],
+                                   [row["total_loss"] for row in whole], rtol=1e-12)
+
+    def test_pv_buses_keep_their_voltage(self):
+        bus_type = [1, 2, 1, 1]
+        result = study_new_load(self.ybus, self.v_base, 0.1 + 0.05j, 3, bus_type=bus_type)
+        self.assertTrue(result["converged"])
+        self.assertAlmostEqual(abs(result["voltages"][1]), abs(self.v_base[1]), places=12)
+        table = sweep_new_load(self.ybus, self.v_base, 0.1 + 0.05j, bus_type=bus_type)
+        row = next(r for r in table if r["bus"] == 4)
+        self.assertAlmostEqual(row["total_loss"], result["total_loss"], places=10)
+
+    def test_failed_candidates_rank_last(self):
+        table = sweep_new_load(self.ybus, self.v_base, 2 + 1j)
+        flags = [row["converged"] for row in table]
+        self.assertTrue(flags[0])
+        self.assertFalse(all(flags))
+        self.assertEqual(flags, sorted(flags, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
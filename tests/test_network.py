@@ -0,0 +1,178 @@
+# Tests for the array-backed Network model
+
+import mmap
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.case_files import parse_matpower
+from chatbot.contingency import n1_contingency
+from chatbot.factor_cache import _nbytes
+from chatbot.network import Network, as_line_data, as_ybus, load_network
+from chatbot.network_reduction import kron_reduce
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.short_circuit_sweep import short_circuit_sweep
+from chatbot.state_estimation import wls_state_estimation
+from chatbot.ybus_builder import branch_admittances, build_ybus
+
+# 5-bus case with an off-nominal tap, a phase shifter and a branch out of service
+_CASE5 = """function mpc = case5
+mpc.version = '2';
+mpc.baseMVA = 100;
+mpc.bus = [
+	1	3	0	0	0	0	1	1.06	0	230	1	1.1	0.9;
+	2	2	20	10	0	0	1	1	0	230	1	1.1	0.9;
+	3	1	45	15	0	5	1	1	0	230	1	1.1	0.9;
+	4	1	40	5	0	0	1	1	0	230	1	1.1	0.9;
+	5	1	60	10	2	0	1	1	0	230	1	1.1	0.9;
+];
+mpc.gen = [
+	1	0	0	300	-300	1.06	100	1	250	10;
+	2	40	0	30	-10	1.0	100	1	100	10;
+];
+mpc.branch = [
+	1	2	0.02	0.06	0.06	100	0	0	0	0	1;
+	1	3	0.08	0.24	0.05	100	0	0	0	0	1;
+	2	3	0.06	0.18	0.04	100	0	0	0.98	0	1;
+	2	4	0.06	0.18	0.04	100	0	0	0	2	1;
+	2	5	0.04	0.12	0.03	100	0	0	0	0	1;
+	3	4	0.01	0.03	0.02	100	0	0	0	0	1;
+	4	5	0.08	0.24	0.05	100	0	0	0	0	1;
+	1	5	0.08	0.24	0.05	100	0	0	0	0	0;
+];
+"""
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06, 1.0],
+    [1, 3, 0.08, 0.24, 1, 0.05, 1.0],
+    [2, 3, 0.06, 0.18, 0.98, 0.04, 0.5],
+    [2, 4, 0.06, 0.18, 1, 0.04, 0.5],
+    [3, 4, 0.01, 0.03, 1, 0.02, 1.0],
+    [4, 5, 0.08, 0.24, 1, 0.05, 0.3],
+    [2, 5, 0.04, 0.12, 1, 0.03, 0.5],
+]
+
+
+def _is_mapped(a):
+    while a is not None and not isinstance(a, mmap.mmap):
+        a = getattr(a, "base", None)
+    return a is not None
+
+
+class TestNetwork(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.case_path = os.path.join(self.tmp.name, "case5.m")
+        with open(self.case_path, "w") as fh:
+            fh.write(_CASE5)
+        self.case = parse_matpower(self.case_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_from_case_matches_case_data(self):
+        net = Network.from_case(self.case)
+        self.assertEqual(net.bus.vm.dtype, np.float64)
+        self.assertEqual(net.branch.status.dtype, np.bool_)
+        self.assertTrue(net.bus.pd.flags.c_contiguous)
+        self.assertLess(abs(net.ybus() - self.case.ybus()).max(), 1e-14)
+        self.assertIs(net.ybus(), net.ybus())
+        for key, value in self.case.loadflow_inputs().items():
+            if key != "Ybus":
+                np.testing.assert_array_equal(net.loadflow_inputs()[key], value)
+        self.assertEqual(net.summary(), self.case.summary())
+        np.testing.assert_array_equal(net.line_data(exact=False), self.case.line_data(exact=False))
+        with self.assertRaises(AttributeError):
+            net.bus.extra = np.zeros(5)
+
+    def test_from_line_data_matches_build_ybus(self):
+        net = Network.from_line_data(_LINE_DATA)
+        self.assertLess(abs(net.ybus() - build_ybus(_LINE_DATA)).max(), 1e-12)
+        np.testing.assert_allclose(net.line_data(), _LINE_DATA)
+        Y = build_ybus(_LINE_DATA)
+        self.assertTrue(np.shares_memory(Network.from_ybus(Y).ybus().data, Y.data))
+        rebuilt = Network.from_ybus(Y)
+        rebuilt.invalidate()
+        self.assertLess(abs(rebuilt.ybus() - Y).max(), 1e-12)
+
+    def test_contingency_uses_exact_branch_model(self):
+        # case5 has a 0.98 tap on branch 3, a 2 degree shift on branch 4 and bus shunts
+        net = Network.from_case(self.case)
+        with self.assertRaises(ValueError):
+            net.line_data()
+        with self.assertRaises(ValueError):
+            branch_admittances(net)
+        # A parsed case is accepted the same way
+        with self.assertRaises(ValueError):
+            as_line_data(self.case)
+        np.testing.assert_array_equal(as_line_data(self.case, exact=False), net.line_data(exact=False))
+        V = newton_raphson_loadflow(**net.loadflow_inputs(), tol=1e-12)
+        s_base = V * np.conj(net.ybus() @ V)
+        results = {r.branch: r for r in n1_contingency(net, V)}
+        self.assertEqual([r.as_dict() for r in n1_contingency(self.case, V)],
+                         [r.as_dict() for r in results.values()])
+        for branch in (3, 4):
+            out = Network.from_case(self.case)
+            out.branch.status[branch - 1] = False
+            V_out = newton_raphson_loadflow(out, np.ones(5), s_base.real, s_base.imag, None, None,
+                                            V_init=V, tol=1e-12)
+            self.assertTrue(results[branch].converged)
+            self.assertAlmostEqual(results[branch].min_voltage, np.abs(V_out).min(), places=6)
+            self.assertAlmostEqual(results[branch].max_voltage, np.abs(V_out).max(), places=6)
+
+    def test_npz_round_trip_is_memory_mapped(self):
+        net = Network.from_case(self.case)
+        net.ybus()
+        path = os.path.join(self.tmp.name, "net.npz")
+        net.save(path)
+        loaded = Network.load(path)
+        self.assertTrue(_is_mapped(loaded.branch.x))
+        self.assertTrue(_is_mapped(loaded.ybus().data))
+        self.assertEqual((loaded.name, loaded.tap_model, loaded.base_mva), ("case5", "pi", 100.0))
+        for table in ("bus", "branch", "gen"):
+            for name, col in getattr(net, table).columns().items():
+                np.testing.assert_array_equal(getattr(getattr(loaded, table), name), col)
+        self.assertEqual(abs(loaded.ybus() - net.ybus()).max(), 0.0)
+        # In-place edits of a loaded network never reach the file
+        loaded.bus.pd[:] = 0.0
+        self.assertEqual(Network.load(path, mmap=False).bus.pd.sum(), net.bus.pd.sum())
+
+    def test_tools_accept_network(self):
+        net = load_network(self.case_path, cache_dir=None)
+        self.assertIs(load_network(self.case_path, cache_dir=None), net)
+        ybus = net.ybus()
+        self.assertEqual(_nbytes(net), net.nbytes)
+        self.assertGreater(net.nbytes, ybus.data.nbytes + net.bus.pd.nbytes * 11)
+        inputs = net.loadflow_inputs()
+        V = newton_raphson_loadflow(**inputs)
+        np.testing.assert_allclose(newton_raphson_loadflow(**dict(inputs, Ybus=net)), V)
+        self.assertIs(build_ybus(net), net.ybus())
+        self.assertIs(as_ybus(net), net.ybus())
+
+        reduced = kron_reduce(net, [0, 1])
+        np.testing.assert_allclose(reduced.y_reduced, kron_reduce(net.ybus(), [0, 1]).y_reduced)
+        grounded = net.ybus() + np.eye(5) * 5j
+        self.assertEqual(short_circuit_sweep(Network.from_ybus(grounded), workers=1).as_rows(),
+                         short_circuit_sweep(grounded, workers=1).as_rows())
+
+        ln = Network.from_line_data(_LINE_DATA)
+        V = newton_raphson_loadflow(ln, [1, 2, 1, 1, 1], [0, 0.4, -0.45, -0.4, -0.6],
+                                    [0, 0, -0.15, -0.05, -0.1], None, None,
+                                    V_init=np.array([1.06, 1, 1, 1, 1], dtype=complex))
+        by_rows = n1_contingency(_LINE_DATA, V, top_k=3)
+        by_net = n1_contingency(ln, V, top_k=3)
+        self.assertEqual([r.branch for r in by_net], [r.branch for r in by_rows])
+        np.testing.assert_allclose([r.min_voltage for r in by_net], [r.min_voltage for r in by_rows])
+
+        S = V * np.conj(ln.ybus() @ V)
+        rows = [{"type": t, "bus": i + 1, "value": v, "sigma": 0.01}
+                for i in range(5) for t, v in (("vm", abs(V[i])), ("p", S[i].real), ("q", S[i].imag))]
+        estimate = wls_state_estimation(ln, rows)
+        self.assertLess(np.abs(estimate.V - V).max(), 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# Tests for the Kron network reduction
+
+import unittest
+
+import numpy as np
+
+from chatbot.fault_analysis import get_fault_analysis
+from chatbot.network_reduction import kron_reduce
+from chatbot.ybus_builder import build_ybus
+
+# 6-bus network with line charging (nonsingular Ybus)
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+    [4, 5, 0.02, 0.08, 1, 0.02],
+    [5, 6, 0.03, 0.09, 1, 0.02],
+    [3, 6, 0.04, 0.12, 1, 0.03],
+])
+_RETAINED = [0, 3, 5]
+
+
+class TestKronReduction(unittest.TestCase):
+
+    def setUp(self):
+        self.ybus = build_ybus(_LINE_DATA, n_bus=6)
+        self.zbus = np.linalg.inv(self.ybus.toarray())
+        self.kr = kron_reduce(self.ybus, _RETAINED)
+
+    def test_reduced_zbus_is_submatrix(self):
+        self.assertEqual(self.kr.y_reduced.shape, (3, 3))
+        np.testing.assert_allclose(np.linalg.inv(self.kr.y_reduced),
+                                   self.zbus[np.ix_(_RETAINED, _RETAINED)], atol=1e-10)
+        np.testing.assert_allclose(self.kr.y_reduced, self.kr.y_reduced.T, atol=1e-12)
+
+    def test_recover_internal_voltages(self):
+        rng = np.random.default_rng(3)
+        i_bus = rng.normal(size=6) + 1j * rng.normal(size=6)
+        v = self.zbus @ i_bus
+        v_r = np.linalg.solve(self.kr.y_reduced, self.kr.equivalent_injections(i_bus))
+        np.testing.assert_allclose(v_r, v[_RETAINED], atol=1e-10)
+        np.testing.assert_allclose(self.kr.recover(v_r, i_bus[self.kr.eliminated]), v, atol=1e-10)
+
+    def test_fault_on_reduced_network(self):
+        v_pre = np.full(6, 1.0 + 0j)
+        v_full, i_full, _ = get_fault_analysis(self.ybus, False, v_pre, 3)
+        v_red, i_red, _ = get_fault_analysis(self.kr.y_reduced, False, v_pre[_RETAINED], 1)
+        self.assertAlmostEqual(i_red, i_full, places=10)
+        np.testing.assert_allclose(v_red, v_full[_RETAINED], atol=1e-10)
+        # Internal post-fault voltages follow from the retained ones and the
+        # unchanged pre-fault injections at the eliminated buses
+        i_pre = self.ybus @ v_pre
+        np.testing.assert_allclose(self.kr.recover(v_red, i_pre[self.kr.eliminated]), v_full,
+                                   atol=1e-10)
+
+    def test_invalid_retained_buses(self):
+        with self.assertRaises(ValueError):
+            kron_reduce(self.ybus, [0, 0, 2])
+        with self.assertRaises(ValueError):
+            kron_reduce(self.ybus, [0, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# Tests for the sparse Newton-Raphson load flow
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot.newton_raphson import newton_raphson_loadflow
+
+# 4-bus system from matlab_scripts/NR_2.m
+_YBUS = np.array([
+    [3 - 8.95j, -2 + 6j, -1 + 3j, 0],
+    [-2 + 6j, 3.774 - 11.306j, -0.674 + 2.024j, -1.044 + 3.134j],
+    [-1 + 3j, -0.674 + 2.024j, 3.666 - 10.96j, -2 + 6j],
+    [0, -1.044 + 3.134j, -2 + 6j, 3 - 8.99j],
+])
+_P = [0, 0.45, -0.98, 0.32]
+_Q = [0, 0.22, 0.40, -0.15]
+
+
+def _injections(V):
+    return V * np.conj(_YBUS @ V)
+
+
+class TestNewtonRaphsonLoadflow(unittest.TestCase):
+
+    def test_pq_buses_meet_specified_injections(self):
+        V = newton_raphson_loadflow(_YBUS, [0, 1, 1, 1], _P, _Q, [], [],
+                                    [1.05, 1, 1, 1], tol=1e-10)
+        S = _injections(V)
+        np.testing.assert_allclose(S.real[1:], _P[1:], atol=1e-8)
+        np.testing.assert_allclose(S.imag[1:], _Q[1:], atol=1e-8)
+        self.assertAlmostEqual(V[0], 1.05)
+
+    def test_accepts_sparse_ybus(self):
+        dense = newton_raphson_loadflow(_YBUS, [0, 1, 1, 1], _P, _Q, [], [], [1.05, 1, 1, 1])
+        sparse = newton_raphson_loadflow(sp.csr_matrix(_YBUS), [0, 1, 1, 1], _P, _Q, [], [],
+                                         [1.05, 1, 1, 1])
+        np.testing.assert_allclose(dense, sparse)
+
+    def test_pv_bus_holds_voltage_magnitude(self):
+        V = newton_raphson_loadflow(_YBUS, [0, 2, 1, 1], _P, _Q, [], [],
+                                    [1.05, 1.02, 1, 1], tol=1e-10)
+        self.assertAlmostEqual(abs(V[1]), 1.02)
+        self.assertAlmostEqual(_injections(V).real[1], _P[1])
+
+    def test_pv_bus_switches_to_pq_at_q_limit(self):
+        V = newton_raphson_loadflow(_YBUS, [0, 2, 1, 1], _P, _Q, [0, -0.1, 0, 0],
+                                    [0, 0.1, 0, 0], [1.05, 1.1, 1, 1], tol=1e-10)
+        self.assertAlmostEqual(_injections(V).imag[1], 0.1)
+        self.assertLess(abs(V[1]), 1.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
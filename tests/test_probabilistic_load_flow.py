@@ -0,0 +1,101 @@
+# Tests for the Monte Carlo probabilistic load flow
+
+import unittest
+
+import numpy as np
+
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.probabilistic_load_flow import (RunningStats, parse_uncertainties,
+                                             probabilistic_load_flow, sample_injections)
+from chatbot.ybus_builder import build_ybus
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [2, 5, 0.04, 0.12, 1, 0.03],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+    [4, 5, 0.08, 0.24, 1, 0.05],
+]
+_BUS_TYPE = np.array([1, 2, 3, 3, 3])
+_P = np.array([0.0, 0.4, -0.45, -0.4, -0.6])
+_Q = np.array([0.0, 0.0, -0.15, -0.05, -0.1])
+_V0 = np.array([1.06, 1.0, 1.0, 1.0, 1.0], dtype=complex)
+_SPECS = [
+    {"bus": 3, "distribution": "normal", "std": 0.05, "power_factor": 0.95},
+    {"bus": 5, "distribution": "uniform", "low": -0.15, "high": 0.1},
+    {"bus": 4, "distribution": "weibull", "shape": 2.0, "scale": 9.0, "p_rated": 0.3},
+    {"bus": 2, "distribution": "beta", "a": 2.0, "b": 3.0, "scale": 0.2},
+]
+
+
+class TestProbabilisticLoadFlow(unittest.TestCase):
+
+    def setUp(self):
+        self.ybus = build_ybus(_LINE_DATA)
+
+    def _exact(self, n_samples, block_size):
+        """|V| of the same samples solved one by one with Newton-Raphson."""
+        terms = parse_uncertainties(_SPECS)
+        vm = []
+        for b, start in enumerate(range(0, n_samples, block_size)):
+            size = min(block_size, n_samples - start)
+            dP, dQ = sample_injections(terms, 5, size, np.random.default_rng([0, b]))
+            for s in range(size):
+                V = newton_raphson_loadflow(self.ybus, _BUS_TYPE, _P + dP[s], _Q + dQ[s], [], [],
+                                            _V0, tol=1e-10)
+                vm.append(np.abs(V))
+        return np.array(vm)
+
+    def test_statistics_match_sample_by_sample_solves(self):
+        result = probabilistic_load_flow(self.ybus, _BUS_TYPE, _P, _Q, _SPECS, V_init=_V0,
+                                         n_samples=250, block_size=100, v_min=0.98,
+                                         tol=1e-10, workers=1)
+        vm = self._exact(250, 100)
+        self.assertEqual(result.n_converged, 250)
+        np.testing.assert_allclose(result.mean, vm.mean(axis=0), atol=1e-9)
+        np.testing.assert_allclose(result.std, vm.std(axis=0, ddof=1), atol=1e-9)
+        # Histogram quantiles are exact to within one bin (1e-3 pu by default)
+        for q in (0.05, 0.5, 0.95):
+            np.testing.assert_allclose(result.quantiles[q], np.quantile(vm, q, axis=0), atol=1e-3)
+        out = (vm < 0.98) | (vm > 1.05)
+        np.testing.assert_allclose(result.p_violation, out.mean(axis=0))
+        self.assertAlmostEqual(result.p_any_violation, out.any(axis=1).mean())
+        self.assertGreater(result.p_any_violation, 0)
+        self.assertEqual(result.as_rows()[2]["bus"], 3)
+
+    def test_results_do_not_depend_on_workers(self):
+        kwargs = dict(V_init=_V0, n_samples=600, block_size=100, seed=7)
+        one = probabilistic_load_flow(self.ybus, _BUS_TYPE, _P, _Q, _SPECS, workers=1, **kwargs)
+        two = probabilistic_load_flow(self.ybus, _BUS_TYPE, _P, _Q, _SPECS, workers=2, **kwargs)
+        np.testing.assert_allclose(two.mean, one.mean, rtol=0, atol=1e-12)
+        np.testing.assert_allclose(two.quantiles[0.95], one.quantiles[0.95], rtol=0, atol=1e-12)
+        self.assertAlmostEqual(two.loss_std, one.loss_std, places=12)
+
+    def test_running_stats_merge(self):
+        rng = np.random.default_rng(3)
+        vm = rng.normal(1.0, 0.02, (300, 4))
+        loss = rng.uniform(0.01, 0.02, 300)
+        edges = np.linspace(0.8, 1.2, 401)
+        whole = RunningStats.from_block(vm, loss, 0.97, 1.03, edges)
+        merged = RunningStats.from_block(vm[:120], loss[:120], 0.97, 1.03, edges).merge(
+            RunningStats.from_block(vm[120:], loss[120:], 0.97, 1.03, edges))
+        np.testing.assert_allclose(merged.mean, whole.mean)
+        np.testing.assert_allclose(merged.m2, whole.m2)
+        np.testing.assert_array_equal(merged.hist, whole.hist)
+        self.assertAlmostEqual(merged.loss_m2, whole.loss_m2)
+        self.assertEqual(merged.any_violation, whole.any_violation)
+
+    def test_invalid_specs(self):
+        with self.assertRaises(ValueError):
+            parse_uncertainties([{"bus": 3, "distribution": "lognormal", "std": 1}])
+        with self.assertRaises(ValueError):
+            parse_uncertainties([{"bus": 3, "distribution": "uniform", "low": 0}])
+        with self.assertRaises(ValueError):
+            probabilistic_load_flow(self.ybus, _BUS_TYPE, _P, _Q,
+                                    [{"bus": 1, "distribution": "normal", "std": 0.1}], workers=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
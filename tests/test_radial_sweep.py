@@ -0,0 +1,95 @@
+# Tests for the backward/forward sweep radial load flow
+
+import unittest
+
+import numpy as np
+
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot import radial_sweep
+from chatbot.radial_sweep import backward_forward_sweep, feeder_topology, radial_feeder
+from chatbot.ybus_builder import build_ybus
+
+
+def _feeder(n, seed=0):
+    """Random radial feeder with R/X = 3 lines, laterals and charging, plus loads."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(2, n + 1):
+        x = rng.uniform(0.0005, 0.002)
+        rows.append([int(rng.integers(max(1, i - 30), i)), i, 3 * x, x, 1, rng.uniform(0, 1e-4)])
+    p = -rng.uniform(0.2, 1.0, n) * 2.0 / n
+    p[0] = 0
+    return np.array(rows), p, 0.5 * p
+
+
+class TestRadialSweep(unittest.TestCase):
+
+    def test_topology(self):
+        order, parent, depth = feeder_topology([0, 1, 1, 3, 0], [1, 2, 3, 4, 1], 5)
+        self.assertEqual(order[0], 0)
+        np.testing.assert_array_equal(parent, [-1, 0, 1, 1, 3])
+        np.testing.assert_array_equal(depth, [0, 1, 2, 2, 3])
+        self.assertIsNone(feeder_topology([0, 1, 2], [1, 2, 0], 3))     # loop
+        self.assertIsNone(feeder_topology([0, 2], [1, 3], 4))           # two feeders
+
+    def test_matches_newton_raphson(self):
+        line_data, p, q = _feeder(300)
+        ybus = build_ybus(line_data)
+        bus_type = np.full(300, 3)
+        V = backward_forward_sweep(ybus, bus_type, p, q, [], [], tol=1e-10)
+        ref = newton_raphson_loadflow(ybus, bus_type, p, q, [], [], np.ones(300, complex), tol=1e-10)
+        np.testing.assert_allclose(V, ref, atol=1e-9)
+        self.assertLess(np.abs(V).min(), 0.99)
+
+        # Off-nominal taps end up in the bus shunts of the radial model
+        line_data[10, 4] = 0.95
+        ybus = build_ybus(line_data)
+        V = backward_forward_sweep(ybus, bus_type, p, q, [], [], tol=1e-10)
+        ref = newton_raphson_loadflow(ybus, bus_type, p, q, [], [], np.ones(300, complex), tol=1e-10)
+        np.testing.assert_allclose(V, ref, atol=1e-9)
+
+    def test_pv_buses_and_q_limits(self):
+        line_data, p, q = _feeder(300, seed=1)
+        ybus = build_ybus(line_data)
+        bus_type = np.full(300, 3)
+        pv = [120, 250, 251]
+        bus_type[pv] = 2
+        p[pv] = 0.02
+        V0 = np.ones(300, dtype=complex)
+        V0[pv] = [1.0, 0.995, 0.99]
+        q_max = np.full(300, np.inf)
+        for limits in ([], q_max, np.where(np.arange(300) == 120, 0.0, q_max)):
+            V = backward_forward_sweep(ybus, bus_type, p, q, [], limits, V0, tol=1e-10)
+            ref = newton_raphson_loadflow(ybus, bus_type, p, q, [], limits, V0, tol=1e-10)
+            np.testing.assert_allclose(V, ref, atol=1e-8)
+        # Bus 121 hit its limit and is held at Q = 0 instead of 1.0 pu
+        self.assertAlmostEqual((V[120] * np.conj(ybus @ V)[120]).imag, 0.0, places=8)
+        self.assertNotAlmostEqual(abs(V[120]), 1.0, places=4)
+        np.testing.assert_allclose(np.abs(V[[250, 251]]), [0.995, 0.99])
+
+    def test_meshed_network_falls_back(self):
+        line_data, p, q = _feeder(100, seed=2)
+        meshed = np.vstack([line_data, [5, 80, 0.01, 0.02, 1, 0]])
+        ybus = build_ybus(meshed)
+        self.assertIsNone(radial_feeder(ybus))
+        self.assertIsNotNone(radial_feeder(build_ybus(line_data)))
+        bus_type = np.full(100, 3)
+        V = backward_forward_sweep(ybus, bus_type, p, q, [], [], tol=1e-10)
+        ref = newton_raphson_loadflow(ybus, bus_type, p, q, [], [], np.ones(100, complex), tol=1e-10)
+        np.testing.assert_allclose(V, ref, atol=1e-9)
+
+    def test_topology_check_is_cached(self):
+        line_data, _, _ = _feeder(100, seed=3)
+        meshed = build_ybus(np.vstack([line_data, [5, 80, 0.01, 0.02, 1, 0]]))
+        cache = radial_sweep.get_cache()
+        cache.clear()
+        self.assertIsNone(radial_feeder(meshed))
+        self.assertIsNone(radial_feeder(meshed))
+        self.assertEqual((cache.stats()["misses"], cache.stats()["hits"]), (1, 1))
+        radial_feeder(build_ybus(line_data))
+        # Five n-vectors and the LU factors, not a flat per-object estimate
+        self.assertGreater(cache.stats()["bytes"], 5 * 100 * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# Tests for the DC PTDF/LODF sensitivities
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.sensitivity import DCSensitivity, dc_flow_study
+
+# 5-bus meshed system with a radial spur to bus 5
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+    [4, 5, 0.02, 0.08, 1, 0.02],
+])
+_P = np.array([0.0, 0.4, -0.45, -0.3, -0.1])
+_P[0] = -_P[1:].sum()
+
+
+def _dc_flows(line_data, p):
+    """Direct DC power flow with bus 1 as the slack."""
+    n = len(p)
+    fb = line_data[:, 0].astype(int) - 1
+    tb = line_data[:, 1].astype(int) - 1
+    b = 1 / line_data[:, 3]
+    A = np.zeros((len(fb), n))
+    A[np.arange(len(fb)), fb] = 1
+    A[np.arange(len(fb)), tb] = -1
+    B = A.T @ np.diag(b) @ A
+    theta = np.zeros(n)
+    theta[1:] = np.linalg.solve(B[1:, 1:], p[1:])
+    return b * (A @ theta)
+
+
+class TestDCSensitivity(unittest.TestCase):
+
+    def setUp(self):
+        self.sens = DCSensitivity(_LINE_DATA, cache_dir=None)
+        self.f_base = _dc_flows(_LINE_DATA, _P)
+
+    def test_ptdf_rows_and_columns_agree(self):
+        full = self.sens.ptdf()
+        np.testing.assert_allclose(self.sens.ptdf_rows([4, 1]), full[[4, 1]], atol=1e-12)
+        np.testing.assert_allclose(full[:, 0], 0.0)
+        np.testing.assert_allclose(full @ _P, self.f_base, atol=1e-12)
+
+    def test_transfer_matches_dc_power_flow(self):
+        p = _P.copy()
+        p[1] += 0.2
+        p[3] -= 0.2
+        flows = self.sens.transfer_flows(1, 3, 0.2, self.f_base)
+        np.testing.assert_allclose(flows, _dc_flows(_LINE_DATA, p), atol=1e-12)
+        np.testing.assert_allclose(self.sens.injection_flows(p - _P, self.f_base), flows, atol=1e-12)
+
+    def test_outage_matches_dc_power_flow(self):
+        lodf = self.sens.lodf_columns(np.arange(6))
+        for l in range(5):
+            expected = np.insert(_dc_flows(np.delete(_LINE_DATA, l, axis=0), _P), l, 0.0)
+            np.testing.assert_allclose(self.sens.outage_flows(l, self.f_base), expected, atol=1e-12)
+            np.testing.assert_allclose(self.f_base + lodf[:, l] * self.f_base[l], expected, atol=1e-12)
+        self.assertTrue(np.isnan(lodf[:, 5]).all())
+        self.assertEqual(self.sens.islanding(np.arange(6)).tolist(), [False] * 5 + [True])
+
+    def test_flow_study_rows_are_one_based(self):
+        rows = dc_flow_study(_LINE_DATA, from_bus=2, to_bus=4, amount=0.2,
+                             base_flows=self.f_base, cache_dir=None)
+        expected = self.sens.transfer_flows(1, 3, 0.2, self.f_base)
+        self.assertEqual([(r["from_bus"], r["to_bus"]) for r in rows][:2], [(1, 2), (1, 3)])
+        np.testing.assert_allclose([r["new_flow"] for r in rows], expected, atol=1e-12)
+
+    def test_columns_persist_on_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = DCSensitivity(_LINE_DATA, cache_dir=tmp)
+            cols = first.ptdf_columns([2, 4])
+            rows = first.ptdf_rows([3])
+            lodf = first.lodf_columns([0, 5])
+            first.save()
+            self.assertEqual(len(os.listdir(tmp)), 1)
+            first.ptdf_columns([1])
+            first.save()
+            first.save()
+            # One block per save with new vectors; earlier blocks are not rewritten
+            self.assertEqual(len(os.listdir(os.path.join(tmp, os.listdir(tmp)[0]))), 4)
+
+            second = DCSensitivity(_LINE_DATA, cache_dir=tmp)
+            self.assertEqual(sorted(second._cols), [1, 2, 4])
+            np.testing.assert_array_equal(second.ptdf_columns([2, 4]), cols)
+            np.testing.assert_array_equal(second.ptdf_rows([3]), rows)
+            np.testing.assert_array_equal(second.lodf_columns([0, 5]), lodf)
+
+            batched = DCSensitivity(_LINE_DATA, cache_dir=tmp, flush_size=2)
+            batched.ptdf_rows([0, 1])                  # flushed without save()
+            self.assertEqual(sorted(DCSensitivity(_LINE_DATA, cache_dir=tmp)._rows), [0, 1, 3])
+
+            other = DCSensitivity(_LINE_DATA[:5], cache_dir=tmp)
+            self.assertNotEqual(other.fingerprint, first.fingerprint)
+            self.assertEqual(other._cols, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# Tests for the all-bus short-circuit sweep
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from chatbot.fault_analysis import get_fault_analysis
+from chatbot import short_circuit_sweep as short_circuit_sweep_module
+from chatbot.short_circuit_sweep import FAULT_TYPES, short_circuit_sweep
+
+# Positive sequence network with generator reactances to ground at buses 1 and 2
+_Y1 = np.array([
+    [-16j, 5j, 5j],
+    [5j, -22.5j, 12.5j],
+    [5j, 12.5j, -17.5j],
+])
+# Zero sequence network with solidly grounded generator at bus 1 only
+_Y0 = np.array([
+    [-25j, 2.5j, 2.5j],
+    [2.5j, -8.75j, 6.25j],
+    [2.5j, 6.25j, -8.75j],
+])
+
+
+class TestShortCircuitSweep(unittest.TestCase):
+
+    def test_three_phase_column_matches_single_fault(self):
+        table = short_circuit_sweep(_Y1, workers=1)
+        self.assertEqual(table.fault_types, FAULT_TYPES)
+        for k in range(3):
+            v_post, i_fault, _ = get_fault_analysis(_Y1, False, np.ones(3), k)
+            self.assertAlmostEqual(table.i_fault[k, 0], abs(i_fault))
+            self.assertAlmostEqual(table.v_min[k, 0], np.abs(v_post).min())
+
+    def test_unsymmetrical_faults_use_sequence_impedances(self):
+        table = short_circuit_sweep(_Y1, y0=_Y0, workers=1)
+        z1 = np.diag(np.linalg.inv(_Y1))
+        z0 = np.diag(np.linalg.inv(_Y0))
+        np.testing.assert_allclose(table.i_fault[:, 1], np.abs(3 / (2 * z1 + z0)))
+        np.testing.assert_allclose(table.i_fault[:, 2], np.abs(np.sqrt(3) / (2 * z1)))
+        np.testing.assert_allclose(table.z_thevenin[:, 2], z0)
+
+    def test_process_pool_matches_serial(self):
+        serial = short_circuit_sweep(_Y1, y0=_Y0, workers=1, block_size=1)
+        pooled = short_circuit_sweep(_Y1, y0=_Y0, workers=2, block_size=1)
+        np.testing.assert_allclose(pooled.i_fault, serial.i_fault)
+        np.testing.assert_allclose(pooled.v_min, serial.v_min, atol=1e-12)
+
+    def test_as_rows(self):
+        rows = short_circuit_sweep(_Y1, workers=1).as_rows()
+        self.assertEqual([row["bus"] for row in rows], [1, 2, 3])
+        self.assertIn("i_dlg", rows[0])
+
+    def test_missing_zero_sequence_is_flagged(self):
+        assumed = short_circuit_sweep(_Y1, workers=1)
+        self.assertTrue(assumed.z0_assumed)
+        self.assertIn("warning", assumed.as_dict())
+        given = short_circuit_sweep(_Y1, y0=_Y0, workers=1)
+        self.assertFalse(given.z0_assumed)
+        self.assertEqual(given.as_dict(), {"buses": given.as_rows()})
+
+    def test_small_network_runs_in_process_by_default(self):
+        with patch.object(short_circuit_sweep_module, "ProcessPoolExecutor",
+                               side_effect=AssertionError("pool started")):
+            table = short_circuit_sweep(_Y1, y0=_Y0, block_size=1)
+        np.testing.assert_allclose(table.i_fault, short_circuit_sweep(_Y1, y0=_Y0, workers=1).i_fault)
+
+
+if __name__ == "__main__":
+    unittest.main()
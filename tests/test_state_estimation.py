@@ -0,0 +1,109 @@
+# Tests for the weighted least squares state estimator
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.state_estimation import parse_measurements, read_measurements, wls_state_estimation
+from chatbot.ybus_builder import branch_admittances, build_ybus
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [2, 5, 0.04, 0.12, 1, 0.03],
+    [3, 4, 0.01, 0.03, 0.98, 0.02],
+    [4, 5, 0.08, 0.24, 1, 0.05],
+]
+_BUS_TYPE = np.array([1, 2, 3, 3, 3])
+_P = np.array([0.0, 0.4, -0.45, -0.4, -0.6])
+_Q = np.array([0.0, 0.0, -0.15, -0.05, -0.1])
+_V0 = np.array([1.06, 1.0, 1.0, 1.0, 1.0], dtype=complex)
+
+
+class TestStateEstimation(unittest.TestCase):
+
+    def setUp(self):
+        self.ybus = build_ybus(_LINE_DATA)
+        self.V = newton_raphson_loadflow(self.ybus, _BUS_TYPE, _P, _Q, None, None,
+                                         V_init=_V0, tol=1e-12)
+        fb, tb, y_diag, y_off = branch_admittances(_LINE_DATA)
+        self.branches = (fb, tb, y_diag, y_off, y_off, y_diag)
+
+    def _measurements(self, noise=None, seed=0):
+        """Voltage magnitudes, injections and both-end flows of the load flow solution."""
+        V = self.V
+        S = V * np.conj(self.ybus @ V)
+        rows = []
+        for i in range(len(V)):
+            rows += [{"type": "vm", "bus": i + 1, "value": abs(V[i]), "sigma": 0.004},
+                     {"type": "p", "bus": i + 1, "value": S[i].real, "sigma": 0.01},
+                     {"type": "q", "bus": i + 1, "value": S[i].imag, "sigma": 0.01}]
+        fb, tb, y_diag, y_off, _, _ = self.branches
+        for a, b, ys, ym in zip(np.r_[fb, tb], np.r_[tb, fb], np.r_[y_diag, y_diag], np.r_[y_off, y_off]):
+            s = V[a] * np.conj(ys * V[a] + ym * V[b])
+            rows += [{"type": "pf", "bus": a + 1, "to_bus": b + 1, "value": s.real, "sigma": 0.008},
+                     {"type": "qf", "bus": a + 1, "to_bus": b + 1, "value": s.imag, "sigma": 0.008}]
+        if noise:
+            rng = np.random.default_rng(seed)
+            for row in rows:
+                row["value"] += noise * rng.normal(0, row["sigma"])
+        return rows
+
+    def test_exact_measurements_recover_load_flow(self):
+        estimate = wls_state_estimation(self.ybus, self._measurements(), branches=self.branches)
+        self.assertTrue(estimate.converged)
+        self.assertLess(np.abs(estimate.V - self.V).max(), 1e-6)
+        self.assertLess(estimate.objective, 1e-6)
+        self.assertEqual(estimate.bad_data, [])
+        # Factors are reused between Gauss-Newton iterations
+        self.assertLess(estimate.factorizations, estimate.iterations)
+
+    def test_noisy_measurements_pass_chi_square(self):
+        estimate = wls_state_estimation(self.ybus, self._measurements(noise=1.0), branches=self.branches)
+        self.assertTrue(estimate.converged)
+        self.assertEqual(estimate.bad_data, [])
+        self.assertLess(estimate.objective, estimate.chi2_limit)
+        self.assertLess(np.abs(estimate.V - self.V).max(), 0.01)
+
+    def test_gross_error_is_removed(self):
+        rows = self._measurements(noise=1.0)
+        rows[7]["value"] += 0.3                                # p at bus 3
+        estimate = wls_state_estimation(self.ybus, rows, branches=self.branches)
+        self.assertEqual(len(estimate.bad_data), 1)
+        self.assertEqual(estimate.bad_data[0]["row"], 8)
+        self.assertEqual((estimate.bad_data[0]["type"], estimate.bad_data[0]["bus"]), ("p", 3))
+        self.assertEqual(len(estimate.measurements), len(rows) - 1)
+        self.assertLessEqual(estimate.normalized_residuals.max(), 3.0)
+        self.assertLess(np.abs(estimate.V - self.V).max(), 0.01)
+
+    def test_measurement_csv(self):
+        rows = self._measurements()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "meas.csv")
+            with open(path, "w") as fh:
+                fh.write("Type,Bus,To_Bus,Value,Sigma\n")
+                for r in rows:
+                    fh.write(f"{r['type']},{r['bus']},{r.get('to_bus', '')},{r['value']:.17g},{r['sigma']}\n")
+            measurements = read_measurements(path)
+            estimate = wls_state_estimation(self.ybus, path, branches=self.branches)
+        np.testing.assert_array_equal(measurements.value, parse_measurements(rows).value)
+        self.assertEqual(measurements.to_bus[0], -1)
+        self.assertLess(np.abs(estimate.V - self.V).max(), 1e-6)
+        with self.assertRaises(ValueError):
+            parse_measurements([{"type": "pf", "bus": 1, "value": 0.1, "sigma": 0.01}])
+
+    def test_unobservable_network_raises(self):
+        # No measurement reaches bus 5
+        rows = [r for r in self._measurements()
+                if r["bus"] != 5 and r.get("to_bus") != 5 and not (r["type"] in "pq" and r["bus"] in (2, 4))]
+        with self.assertRaises(ValueError):
+            wls_state_estimation(self.ybus, rows, branches=self.branches)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Tests for the quasi-static time-series load flow
+
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from chatbot.newton_raphson import newton_raphson_loadflow
+from chatbot.time_series import (iter_profile, load_time_series, profile_injections,
+                                 time_series_loadflow, _profile_columns)
+from chatbot.ybus_builder import build_ybus
+
+_LINE_DATA = [
+    [1, 2, 0.02, 0.06, 1, 0.06],
+    [1, 3, 0.08, 0.24, 1, 0.05],
+    [2, 3, 0.06, 0.18, 1, 0.04],
+    [2, 4, 0.06, 0.18, 1, 0.04],
+    [3, 4, 0.01, 0.03, 1, 0.02],
+]
+_BUS_TYPE = np.array([1, 2, 3, 3])
+_P = np.array([0.0, 0.4, -0.45, -0.4])
+_Q = np.array([0.0, 0.0, -0.15, -0.05])
+_V0 = np.array([1.06, 1.04, 1.0, 1.0], dtype=complex)
+
+
+class TestTimeSeries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profile = os.path.join(self.tmp.name, "profile.csv")
+        hours = np.arange(30)
+        with open(self.profile, "w") as fh:
+            fh.write("hour,scale,P4\n")
+            for h in hours:
+                fh.write(f"2024-01-01 {h:02d}:00,{1 + 0.5 * np.sin(h / 4):.4f},{40 + 30 * np.cos(h / 5):.2f}\n")
+        self.ybus = build_ybus(_LINE_DATA)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profile_injections(self):
+        columns = _profile_columns(["t", "Scale", "P4", "Q3"], [1, 2, 3, 4])
+        values = np.array([[2.0, 50.0, 10.0]])
+        P, Q = profile_injections(values, columns, _P, _Q, base_mva=100)
+        # Scale doubles the load buses only, bus 4 follows its P column at base power factor
+        np.testing.assert_allclose(P[0], [0.0, 0.4, -0.9, -0.5])
+        np.testing.assert_allclose(Q[0], [0.0, 0.0, -0.1, -0.05 * 0.5 / 0.4])
+        with self.assertRaises(ValueError):
+            _profile_columns(["t", "P9"], [1, 2, 3, 4])
+
+    def test_profile_scales_load_components(self):
+        # Bus 2 generates 0.6 and serves a 0.2 + j0.1 load, bus 3 has a capacitive load
+        p_load = np.array([0.0, 0.2, 0.45, 0.4])
+        q_load = np.array([0.0, 0.1, -0.05, 0.05])
+        p_spec = np.array([0.0, 0.4, -0.45, -0.4])
+        q_spec = np.array([0.0, -0.1, 0.05, -0.05])
+        columns = _profile_columns(["t", "scale", "P2"], [1, 2, 3, 4])
+        P, Q = profile_injections(np.array([[2.0, 30.0]]), columns, p_spec, q_spec, base_mva=100,
+                                  p_load=p_load, q_load=q_load)
+        np.testing.assert_allclose(P[0], [0.0, 0.6 - 0.3, -0.9, -0.8])
+        np.testing.assert_allclose(Q[0], [0.0, -0.15, 0.1, -0.1])
+
+    def test_matches_independent_solves(self):
+        out_dir = os.path.join(self.tmp.name, "out")
+        result = time_series_loadflow(self.ybus, _BUS_TYPE, _P, _Q, self.profile, out_dir,
+                                      V_init=_V0, v_min=1.01, v_max=1.1, base_mva=100, tol=1e-10,
+                                      chunk_size=7)
+        self.assertEqual((result.n_steps, result.n_converged), (30, 30))
+
+        data = load_time_series(out_dir)
+        self.assertEqual(data["vm"].shape, (30, 4))
+        self.assertEqual(data["time"][3], "2024-01-01 03:00")
+        _, times, values = next(iter_profile(self.profile, chunk_size=100))
+        P, Q = profile_injections(values, _profile_columns(["t", "scale", "P4"], [1, 2, 3, 4]),
+                                  _P, _Q, base_mva=100)
+        for t in (0, 13, 29):
+            V = newton_raphson_loadflow(self.ybus, _BUS_TYPE, P[t], Q[t], [], [], _V0, tol=1e-10)
+            np.testing.assert_allclose(data["vm"][t], np.abs(V), atol=1e-9)
+            np.testing.assert_allclose(data["va"][t], np.degrees(np.angle(V)), atol=1e-7)
+            self.assertAlmostEqual(data["loss"][t], (V * np.conj(self.ybus @ V)).real.sum())
+
+        # Running summary agrees with the written columns
+        self.assertAlmostEqual(result.energy_loss, float(np.sum(data["loss"])))
+        self.assertAlmostEqual(result.min_voltage, float(data["vm"].min()))
+        self.assertEqual(result.violation_steps, int(np.count_nonzero(data["violations"])))
+        self.assertGreater(result.violation_steps, 0)
+        np.testing.assert_array_equal(data["violations"], (data["vm"][:] < 1.01).sum(axis=1))
+        self.assertEqual(result.as_dict()["min_voltage_bus"], 4)
+
+
+    def test_empty_and_diverged_profiles_have_no_extremes(self):
+        empty = os.path.join(self.tmp.name, "empty.csv")
+        with open(empty, "w") as fh:
+            fh.write("hour,scale\n")
+        heavy = os.path.join(self.tmp.name, "heavy.csv")
+        with open(heavy, "w") as fh:
+            fh.write("hour,scale\n1,50\n2,60\n")
+        for profile, n_steps in ((empty, 0), (heavy, 2)):
+            result = time_series_loadflow(self.ybus, _BUS_TYPE, _P, _Q, profile,
+                                          os.path.join(self.tmp.name, f"out{n_steps}"), V_init=_V0)
+            self.assertEqual((result.n_steps, result.n_converged), (n_steps, 0))
+            summary = result.as_dict()
+            self.assertEqual((summary["peak_loss"], summary["min_voltage"], summary["max_voltage"]),
+                             (None, None, None))
+            json.dumps(summary, allow_nan=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
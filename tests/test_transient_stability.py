@@ -0,0 +1,140 @@
+# Tests for the multi-machine transient stability simulator
+
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy.optimize import brentq
+
+from chatbot.transient_stability import (GeneratorData, NetworkEvent, critical_clearing_time,
+                                         initial_conditions, simulate, transient_stability)
+
+
+def _smib(x):
+    """Reduced network of one machine against an infinite bus through reactance x."""
+    y = 1 / (1j * x)
+    return np.array([[y, -y], [-y, y]])
+
+
+# Machine of matlab_scripts/swing.m against an infinite bus
+_GEN = GeneratorData(H=np.array([2.52, np.inf]), E=np.array([1.1, 1.0]),
+                     delta0=np.radians([21.64, 0.0]), Pm=np.array([0.9, 0.0]))
+_X_PRE, _X_FAULT = 0.45, 1.25
+
+
+class TestTransientStability(unittest.TestCase):
+
+    def test_max_swing_matches_equal_area_criterion(self):
+        t_clear = 0.3
+        result = transient_stability(_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE),
+                                     t_clear, t_end=1.5, dt=0.001)
+        self.assertTrue(result.stable)
+
+        d0 = _GEN.delta0[0]
+        dc = np.radians(result.delta[np.searchsorted(result.t, t_clear), 0])
+        p_fault, p_post, pm = 1.1 / _X_FAULT, 1.1 / _X_PRE, 0.9
+        accelerating = pm * (dc - d0) + p_fault * (np.cos(dc) - np.cos(d0))
+        d_max = brentq(lambda d: p_post * (np.cos(dc) - np.cos(d)) - pm * (d - dc) - accelerating,
+                       dc, np.pi - np.arcsin(pm / p_post))
+        self.assertAlmostEqual(result.max_angle_diff, np.degrees(d_max), places=3)
+
+    def test_rk4_and_trapezoidal_agree(self):
+        args = (_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE), 0.2)
+        rk4 = transient_stability(*args, t_end=1.0, dt=0.002)
+        trap = transient_stability(*args, t_end=1.0, dt=0.002, method="trapezoidal")
+        np.testing.assert_allclose(rk4.delta, trap.delta, atol=0.05)
+
+    def test_late_clearing_is_unstable_and_can_stop_early(self):
+        args = (_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE), 0.5)
+        full = transient_stability(*args, t_end=2.0)
+        self.assertFalse(full.stable)
+        self.assertEqual(len(full.t), 201)
+
+        events = [NetworkEvent(0.0, _smib(_X_PRE)), NetworkEvent(0.0, _smib(_X_FAULT)),
+                  NetworkEvent(0.5, _smib(_X_PRE))]
+        short = simulate(_GEN, events, 2.0, stop_when_unstable=True)
+        self.assertEqual(short.t_unstable, full.t_unstable)
+        self.assertEqual(short.t[-1], full.t_unstable)
+        np.testing.assert_allclose(short.delta, full.delta[:len(short.t)])
+
+    def test_multi_machine_equilibrium_and_events(self):
+        # Three machines with lossless ties; Pm defaults to the pre-fault output
+        y = 1j * np.array([[0, 4, 2], [4, 0, 3], [2, 3, 0]], dtype=float)
+        np.fill_diagonal(y, -y.sum(axis=1) - 1j)
+        gen = GeneratorData(H=np.array([6.0, 4.0, 3.0]), E=np.array([1.05, 1.02, 1.0]),
+                            delta0=np.array([0.2, 0.1, 0.0]), D=0.5)
+        steady = transient_stability(gen, y, y, y, 0.1, t_end=1.0)
+        np.testing.assert_allclose(np.radians(steady.delta), np.tile(gen.delta0, (101, 1)), atol=1e-12)
+
+        # Trip the 1-2 tie during the fault and reclose it at 0.3 s
+        y_open = y.copy()
+        y_open[0, 1] = y_open[1, 0] = 0
+        y_open[0, 0] += 4j
+        y_open[1, 1] += 4j
+        result = transient_stability(gen, y, y_open, y_open, 0.1, t_end=1.0,
+                                     events=[NetworkEvent(0.3, y, "reclose")])
+        self.assertEqual([label for _, label in result.events],
+                         ["pre-fault", "fault applied", "fault cleared", "reclose"])
+        self.assertTrue(result.stable)
+        self.assertGreater(result.max_angle_diff, np.degrees(0.2))
+
+    def test_initial_conditions(self):
+        E, delta0, pm = initial_conditions([1.0 + 0j], [0.9 + 0.3j], [0.3])
+        e = 1.0 + 0.3j * np.conj(0.9 + 0.3j)
+        self.assertAlmostEqual(E[0], abs(e))
+        self.assertAlmostEqual(delta0[0], np.angle(e))
+        self.assertAlmostEqual(pm[0], 0.9)
+
+
+class TestCriticalClearingTime(unittest.TestCase):
+
+    def test_cct_brackets_equal_area_critical_angle(self):
+        result = critical_clearing_time(_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE),
+                                        tol=0.002, dt=0.001, workers=1)
+        self.assertLessEqual(result.upper - result.lower, 0.002)
+        self.assertTrue(result.stable_run.stable)
+        self.assertFalse(result.unstable_run.stable)
+        # The unstable run stops once synchronism is lost
+        self.assertLess(result.unstable_run.t[-1], 2.0)
+
+        d0 = _GEN.delta0[0]
+        p_fault, p_post, pm = 1.1 / _X_FAULT, 1.1 / _X_PRE, 0.9
+        d_max = np.pi - np.arcsin(pm / p_post)
+        d_cr = np.arccos((pm * (d_max - d0) + p_post * np.cos(d_max) - p_fault * np.cos(d0))
+                         / (p_post - p_fault))
+
+        def clearing_angle(run, t_clear):
+            return np.radians(run.delta[np.searchsorted(run.t, t_clear - 1e-9), 0])
+
+        self.assertLessEqual(clearing_angle(result.stable_run, result.lower), d_cr)
+        self.assertGreaterEqual(clearing_angle(result.unstable_run, result.upper), d_cr)
+
+    def test_process_pool_matches_serial_search(self):
+        args = (_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE))
+        serial = critical_clearing_time(*args, tol=0.01, workers=1)
+        pooled = critical_clearing_time(*args, tol=0.01, workers=2)
+        self.assertLessEqual(pooled.upper - pooled.lower, 0.01)
+        self.assertTrue(pooled.lower <= serial.upper and serial.lower <= pooled.upper)
+
+    def test_stable_at_longest_clearing_time(self):
+        result = critical_clearing_time(_GEN, _smib(_X_PRE), _smib(0.5), _smib(_X_PRE),
+                                        t_max=0.3, workers=1)
+        self.assertEqual(result.cct, 0.3)
+        self.assertEqual(result.upper, np.inf)
+        self.assertIsNone(result.unstable_run)
+        # No unbounded values in the tool output (json.dumps would write Infinity)
+        summary = json.loads(json.dumps(result.as_dict(), allow_nan=False))
+        self.assertIsNone(summary["upper"])
+        self.assertIsNone(summary["tolerance"])
+
+    def test_small_cases_search_in_process(self):
+        args = (_GEN, _smib(_X_PRE), _smib(_X_FAULT), _smib(_X_PRE))
+        with patch("chatbot.transient_stability.ProcessPoolExecutor") as pool:
+            result = critical_clearing_time(*args, tol=0.01)
+        pool.assert_not_called()
+        self.assertLessEqual(result.upper - result.lower, 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
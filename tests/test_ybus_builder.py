@@ -0,0 +1,64 @@
+# Tests for the native sparse Ybus builder
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+
+from chatbot.ybus_builder import build_ybus
+
+
+def _reference_ybus(line_data):
+    """Direct port of the scalar MATLAB loops in compute_ybus_matlab."""
+    ldata = np.asarray(line_data, dtype=float)
+    fb = ldata[:, 0].astype(int) - 1
+    tb = ldata[:, 1].astype(int) - 1
+    z = ldata[:, 2] + 1j * ldata[:, 3]
+    a = ldata[:, 4]
+    sh = ldata[:, 5]
+    nbus = max(fb.max(), tb.max()) + 1
+    ybus = np.zeros((nbus, nbus), dtype=complex)
+    for m in range(len(fb)):
+        ybus[fb[m], tb[m]] = -1 / (z[m] * a[m])
+        ybus[tb[m], fb[m]] = -1 / (z[m] * a[m])
+    for m in range(len(fb)):
+        ybus[fb[m], fb[m]] += 1 / (z[m] * a[m] ** 2) + 1j * sh[m] / 2
+        ybus[tb[m], tb[m]] += 1 / (z[m] * a[m] ** 2) + 1j * sh[m] / 2
+    return ybus
+
+
+_LINE_DATA = [
+    [1, 2, 0.03, 0.08, 1.0, 0.04],
+    [1, 3, 0.02, 0.05, 1.0, 0.02],
+    [2, 3, 0.01, 0.03, 0.95, 0.03],
+]
+
+
+class TestBuildYbus(unittest.TestCase):
+
+    def test_matches_matlab_conventions(self):
+        ybus = build_ybus(_LINE_DATA, dense=True)
+        np.testing.assert_allclose(ybus, _reference_ybus(_LINE_DATA), rtol=1e-12)
+
+    def test_returns_csr_by_default(self):
+        ybus = build_ybus(_LINE_DATA)
+        self.assertTrue(sp.isspmatrix_csr(ybus))
+        self.assertEqual(ybus.shape, (3, 3))
+
+    def test_parallel_branches_are_summed(self):
+        ybus = build_ybus([[1, 2, 0.0, 0.1, 1, 0], [1, 2, 0.0, 0.1, 1, 0]], dense=True)
+        self.assertAlmostEqual(ybus[0, 1], 20j)
+        self.assertAlmostEqual(ybus[0, 0], -20j)
+
+    def test_explicit_bus_count(self):
+        ybus = build_ybus(_LINE_DATA, n_bus=5)
+        self.assertEqual(ybus.shape, (5, 5))
+        self.assertEqual(ybus[4, 4], 0)
+
+    def test_rejects_short_rows(self):
+        with self.assertRaises(ValueError):
+            build_ybus([[1, 2, 0.01, 0.1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# Tests for the Ybus file loaders and memory-mapped stores
+
+import mmap
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import scipy.io
+import scipy.sparse as sp
+
+from chatbot.ybus_builder import build_ybus
+from chatbot.ybus_io import load_mat, load_ybus, load_ybus_store, parse_complex_csv, save_ybus_store
+
+_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LINE_DATA = np.array([
+    [1, 2, 0.02, 0.06, 1, 0.03],
+    [2, 3, 0.08, 0.24, 1, 0.025],
+    [3, 4, 0.01, 0.03, 0.98, 0.0],
+    [1, 4, 0.06, 0.18, 1, 0.02],
+])
+
+
+def _is_mapped(a):
+    while a is not None and not isinstance(a, mmap.mmap):
+        a = a.base
+    return a is not None
+
+
+class TestYbusIO(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_matlab_complex_text(self):
+        Y = parse_complex_csv("-0-14i,0+4i, 1.5e-3+2.5i\n3,-4.25j,-Inf\n")
+        self.assertEqual(Y.shape, (2, 3))
+        self.assertEqual(Y[0, 0], -14j)
+        self.assertEqual(Y[0, 2], 1.5e-3 + 2.5j)
+        self.assertEqual(Y[1, 0], 3)
+        self.assertEqual(Y[1, 1], -4.25j)
+        self.assertEqual(Y[1, 2], -np.inf)
+        with self.assertRaises(ValueError):
+            parse_complex_csv("1+2i,3\n4\n")
+        with self.assertRaises(ValueError):
+            parse_complex_csv("1+2i,abc\n")
+
+    def test_repo_csv_and_mat_agree(self):
+        csv = load_ybus(os.path.join(_REPO, "Ybus_output.csv"), cache_dir=None)
+        mat = load_ybus(os.path.join(_REPO, "Ybus.mat"), cache_dir=None)
+        np.testing.assert_array_equal(csv, mat)
+        self.assertEqual(csv[0, 1], 4j)
+
+    def test_sparse_mat_variable(self):
+        Y = build_ybus(_LINE_DATA)
+        path = os.path.join(self.tmp.name, "net.mat")
+        scipy.io.savemat(path, {"Ybus": Y.tocsc(), "Zbus": np.eye(2)})
+        loaded = load_mat(path)
+        self.assertTrue(sp.isspmatrix_csr(loaded))
+        self.assertAlmostEqual(abs(loaded - Y).max(), 0.0)
+
+        scipy.io.savemat(path, {"A": np.eye(2), "B": np.eye(3)})
+        with self.assertRaises(ValueError):
+            load_mat(path)
+        np.testing.assert_array_equal(load_mat(path, "B"), np.eye(3))
+
+    def test_large_files_become_memory_mapped_stores(self):
+        Y = build_ybus(_LINE_DATA)
+        store = os.path.join(self.tmp.name, "store")
+        save_ybus_store(store, Y)
+        mapped = load_ybus_store(store)
+        self.assertTrue(_is_mapped(mapped.data) and _is_mapped(mapped.indices))
+        self.assertAlmostEqual(abs(mapped - Y).max(), 0.0)
+        self.assertAlmostEqual(abs(load_ybus(store) - Y).max(), 0.0)
+
+        csv = os.path.join(self.tmp.name, "ybus.csv")
+        with open(csv, "w") as fh:
+            for row in Y.toarray():
+                fh.write(",".join(f"{v.real:.17g}{v.imag:+.17g}i" for v in row) + "\n")
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        first = load_ybus(csv, cache_dir=cache_dir, mmap_threshold=0)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        second = load_ybus(csv, cache_dir=cache_dir, mmap_threshold=0)
+        self.assertTrue(_is_mapped(second.data))
+        np.testing.assert_array_equal(second.toarray(), first.toarray())
+        self.assertAlmostEqual(abs(second - Y).max(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
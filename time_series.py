@@ -0,0 +1,298 @@
+import csv
+import json
+import os
+import re
+from dataclasses import dataclass
+from itertools import islice
+import numpy as np
+import scipy.sparse as sp
+from numpy.lib.format import open_memmap
+from newton_raphson import newton_raphson_loadflow, solution_converged
+from network import as_ybus
+
+# Profile columns that set the load of one bus: P12, Q12, "P_12", "q 12", ...
+_BUS_COLUMN = re.compile(r"^\s*([PpQq])[\s_]*(\d+)\s*$")
+
+# Time labels are stored fixed width in the output
+_TIME_WIDTH = 32
+
+
+@dataclass
+class TimeSeriesResult:
+    out_dir: str                          # directory of the columnar .npy outputs
+    n_steps: int                          # timesteps solved
+    n_converged: int                      # timesteps whose load flow converged
+    energy_loss: float                    # sum of the step losses (pu x steps)
+    peak_loss: float                      # largest step loss (pu), None if no step converged
+    peak_loss_time: str                   # time label of the peak loss
+    min_voltage: float                    # lowest bus voltage magnitude of the horizon (pu) or None
+    min_voltage_bus: int                  # 0-based bus of the lowest voltage
+    min_voltage_time: str                 # time label of the lowest voltage
+    max_voltage: float                    # highest bus voltage magnitude of the horizon (pu) or None
+    violation_steps: int                  # timesteps with a bus outside [v_min, v_max]
+    bus_ids: np.ndarray                   # (n,) bus numbers used for reporting
+
+    def as_dict(self):
+        """Summary of the study (buses by bus_ids), e.g. for JSON tool output."""
+        return {
+            "out_dir": self.out_dir,
+            "n_steps": self.n_steps,
+            "n_converged": self.n_converged,
+            "energy_loss": self.energy_loss,
+            "peak_loss": self.peak_loss,
+            "peak_loss_time": self.peak_loss_time,
+            "min_voltage": self.min_voltage,
+            "min_voltage_bus": int(self.bus_ids[self.min_voltage_bus]) if self.min_voltage_bus >= 0 else None,
+            "min_voltage_time": self.min_voltage_time,
+            "max_voltage": self.max_voltage,
+            "violation_steps": self.violation_steps,
+        }
+
+
+def count_profile_rows(path):
+    """Number of data rows of a profile CSV (one streaming pass, header excluded)."""
+    with open(path, "r", newline="", encoding="utf-8") as fh:
+        return max(sum(1 for line in fh if line.strip()) - 1, 0)
+
+
+def iter_profile(path, chunk_size=1000):
+    """
+    Stream a load profile CSV in chunks.
+
+    The first column holds the time label of each row and the remaining
+    columns are numbers. Only one chunk is held in memory at a time.
+
+    Yields:
+        (header, times, values): column names, (k,) list of time labels and
+        (k, n_columns - 1) float array for each chunk of k <= chunk_size rows
+    """
+    with open(path, "r", newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        header = [h.strip() for h in next(reader)]
+        while True:
+            rows = [r for r in islice(reader, chunk_size) if r]
+            if not rows:
+                return
+            times = [r[0].strip() for r in rows]
+            try:
+                values = np.array([r[1:] for r in rows], dtype=float)
+            except ValueError as exc:
+                raise ValueError(f"{path}: bad profile row near {times[0]!r} ({exc})") from None
+            if values.shape[1] != len(header) - 1:
+                raise ValueError(f"{path}: rows near {times[0]!r} do not match the header")
+            yield header, times, values
+
+
+def _profile_columns(header, bus_ids):
+    """Map profile columns to (scale column, P columns, P buses, Q columns, Q buses)."""
+    position = {int(b): i for i, b in enumerate(bus_ids)}
+    scale, p_cols, p_bus, q_cols, q_bus = None, [], [], [], []
+    for k, name in enumerate(header[1:]):
+        if name.lower() in ("scale", "multiplier", "load_scale"):
+            scale = k
+            continue
+        m = _BUS_COLUMN.match(name)
+        if m is None:
+            raise ValueError(f"profile column {name!r} is neither a scale nor a P<bus>/Q<bus> column")
+        bus = int(m.group(2))
+        if bus not in position:
+            raise ValueError(f"profile column {name!r} refers to an unknown bus")
+        if m.group(1) in "Pp":
+            p_cols.append(k)
+            p_bus.append(position[bus])
+        else:
+            q_cols.append(k)
+            q_bus.append(position[bus])
+    return scale, np.array(p_cols, dtype=np.int64), np.array(p_bus, dtype=np.int64), \
+        np.array(q_cols, dtype=np.int64), np.array(q_bus, dtype=np.int64)
+
+
+def profile_injections(values, columns, p_spec, q_spec, base_mva=1.0, p_load=None, q_load=None):
+    """
+    Bus injections of a chunk of profile rows.
+
+    The profile acts on the load components of the injections only; the
+    rest (generation) stays at its base-case value. A scale column
+    multiplies every bus load, P and Q alike. P<bus> / Q<bus> columns give
+    the load of that bus (positive = consumption, in units of base_mva) in
+    place of its base-case load; a bus with a P column but no Q column
+    keeps its base-case load power factor.
+
+    Args:
+        values: (k, m) profile values of the chunk
+        columns: Output of _profile_columns for the profile header
+        p_spec, q_spec: (n,) base-case injections (pu)
+        base_mva: Divisor of the P/Q column values
+        p_load, q_load: Optional (n,) base-case loads (pu, positive =
+            consumption), e.g. Pd / Qd of a case file; by default the
+            negative parts of p_spec / q_spec
+
+    Returns:
+        (P, Q): (k, n) active and reactive injections (pu)
+    """
+    scale, p_cols, p_bus, q_cols, q_bus = columns
+    p_spec = np.asarray(p_spec, dtype=float)
+    q_spec = np.asarray(q_spec, dtype=float)
+    p_load = np.maximum(-p_spec, 0.0) if p_load is None else np.asarray(p_load, dtype=float)
+    q_load = np.maximum(-q_spec, 0.0) if q_load is None else np.asarray(q_load, dtype=float)
+    k = len(values)
+    Pd = np.tile(p_load, (k, 1))
+    Qd = np.tile(q_load, (k, 1))
+    if scale is not None:
+        Pd *= values[:, [scale]]
+        Qd *= values[:, [scale]]
+    if len(p_cols):
+        Pd[:, p_bus] = values[:, p_cols] / base_mva
+        keep_pf = np.setdiff1d(p_bus, q_bus)
+        base_p = p_load[keep_pf]
+        ratio = np.divide(Pd[:, keep_pf], base_p, out=np.ones_like(Pd[:, keep_pf]), where=base_p != 0)
+        Qd[:, keep_pf] = q_load[keep_pf] * ratio
+    if len(q_cols):
+        Qd[:, q_bus] = values[:, q_cols] / base_mva
+    return p_spec + p_load - Pd, q_spec + q_load - Qd
+
+
+def time_series_loadflow(Ybus, bus_type, p_spec, q_spec, profile_csv, out_dir,
+                         q_min=None, q_max=None, V_init=None, v_min=0.95, v_max=1.05,
+                         bus_ids=None, base_mva=1.0, p_load=None, q_load=None, tol=1e-6,
+                         max_iter=20, solver=newton_raphson_loadflow, chunk_size=1000):
+    """
+    Quasi-static time-series load flow over a load profile CSV.
+
+    The profile is streamed in chunks of chunk_size rows (see iter_profile
+    and profile_injections for its format) and every row is solved in turn,
+    warm-started from the previous timestep's voltages, so each step
+    typically takes one or two Newton iterations on the cached bus ordering.
+    Results are written as they are computed into memory-mapped .npy
+    columns in out_dir:
+
+        time.npy        (T,) time labels
+        vm.npy, va.npy  (T, n) voltage magnitudes (pu) and angles (deg)
+        loss.npy        (T,) total active loss (pu)
+        violations.npy  (T,) buses outside [v_min, v_max]
+        converged.npy   (T,) load flow convergence flags
+
+    so memory use does not grow with the length of the horizon. Read them
+    back with load_time_series.
+
+    Args:
+        Ybus, bus_type, p_spec, q_spec, q_min, q_max, V_init: Base case as for
+            newton_raphson_loadflow (bus 0 is the slack; V_init holds the
+            slack and PV voltage setpoints)
+        profile_csv: Load profile CSV path
+        out_dir: Output directory (created if needed)
+        v_min, v_max: Voltage limits (scalars or (n,) arrays, pu)
+        bus_ids: Bus numbers used in the P/Q column names (default 1..n)
+        base_mva: Divisor of the profile P/Q values (1 for pu profiles)
+        p_load, q_load: Optional (n,) base-case loads (pu) the profile acts on
+            (see profile_injections)
+        tol, max_iter: Load flow tolerance and iteration limit per step
+        solver: Load flow function with the newton_raphson_loadflow interface
+        chunk_size: Profile rows read and solved per chunk
+
+    Returns:
+        TimeSeriesResult
+    """
+    Y = sp.csr_matrix(as_ybus(Ybus), dtype=complex)
+    n = Y.shape[0]
+    bus_type = np.asarray(bus_type)
+    bus_ids = np.arange(1, n + 1) if bus_ids is None else np.asarray(bus_ids)
+    V_set = np.ones(n, dtype=complex) if V_init is None or len(V_init) == 0 else np.array(V_init, dtype=complex)
+    held = bus_type == 2
+    held[0] = True
+    v_lo = np.broadcast_to(np.asarray(v_min, dtype=float), (n,))
+    v_hi = np.broadcast_to(np.asarray(v_max, dtype=float), (n,))
+
+    n_steps = count_profile_rows(profile_csv)
+    os.makedirs(out_dir, exist_ok=True)
+    out = {
+        "time": open_memmap(os.path.join(out_dir, "time.npy"), "w+", f"<U{_TIME_WIDTH}", (n_steps,)),
+        "vm": open_memmap(os.path.join(out_dir, "vm.npy"), "w+", np.float64, (n_steps, n)),
+        "va": open_memmap(os.path.join(out_dir, "va.npy"), "w+", np.float64, (n_steps, n)),
+        "loss": open_memmap(os.path.join(out_dir, "loss.npy"), "w+", np.float64, (n_steps,)),
+        "violations": open_memmap(os.path.join(out_dir, "violations.npy"), "w+", np.int32, (n_steps,)),
+        "converged": open_memmap(os.path.join(out_dir, "converged.npy"), "w+", np.bool_, (n_steps,)),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w") as fh:
+        json.dump({"n_steps": n_steps, "bus_ids": bus_ids.tolist(), "columns": sorted(out)}, fh)
+
+    V_prev = V_set.copy()
+    columns = None
+    step = 0
+    stats = {"converged": 0, "energy": 0.0, "peak": -np.inf, "peak_t": "", "vmin": np.inf,
+             "vmin_bus": -1, "vmin_t": "", "vmax": -np.inf, "violation_steps": 0}
+    for header, times, values in iter_profile(profile_csv, chunk_size):
+        if columns is None:
+            columns = _profile_columns(header, bus_ids)
+        P, Q = profile_injections(values, columns, p_spec, q_spec, base_mva, p_load, q_load)
+        k = len(times)
+        vm = np.empty((k, n))
+        va = np.empty((k, n))
+        loss = np.empty(k)
+        ok = np.zeros(k, dtype=bool)
+        for i in range(k):
+            # Warm start: previous angles and PQ magnitudes, slack/PV setpoints
+            V0 = V_prev.copy()
+            V0[held] = np.abs(V_set[held]) * np.exp(1j * np.angle(V_prev[held]))
+            V0[0] = V_set[0]
+            V = np.asarray(solver(Y, bus_type, P[i], Q[i], q_min, q_max, V0,
+                                  tol=tol, max_iter=max_iter), dtype=complex)
+            S = V * np.conj(Y @ V)
+            ok[i] = solution_converged(Y, V, bus_type, P[i] + 1j * Q[i], tol, S=S)
+            if ok[i]:
+                V_prev = V
+            vm[i] = np.abs(V)
+            va[i] = np.degrees(np.angle(V))
+            loss[i] = S.real.sum()
+
+        viol = np.count_nonzero((vm < v_lo) | (vm > v_hi), axis=1)
+        sl = slice(step, step + k)
+        out["time"][sl] = [t[:_TIME_WIDTH] for t in times]
+        out["vm"][sl] = vm
+        out["va"][sl] = va
+        out["loss"][sl] = loss
+        out["violations"][sl] = viol
+        out["converged"][sl] = ok
+
+        # Running summary, so nothing has to be read back at the end
+        stats["converged"] += int(ok.sum())
+        stats["violation_steps"] += int(np.count_nonzero(viol[ok]))
+        if ok.any():
+            good = np.flatnonzero(ok)
+            stats["energy"] += float(loss[good].sum())
+            j = good[np.argmax(loss[good])]
+            if loss[j] > stats["peak"]:
+                stats["peak"], stats["peak_t"] = float(loss[j]), times[j]
+            j, b = np.unravel_index(np.argmin(vm[good]), (len(good), n))
+            if vm[good[j], b] < stats["vmin"]:
+                stats["vmin"], stats["vmin_bus"], stats["vmin_t"] = float(vm[good[j], b]), int(b), times[good[j]]
+            stats["vmax"] = max(stats["vmax"], float(vm[good].max()))
+        step += k
+
+    for arr in out.values():
+        arr.flush()
+    if not stats["converged"]:
+        # No converged step: no peak or voltage range (and no inf in the JSON output)
+        stats["peak"] = stats["vmin"] = stats["vmax"] = None
+    return TimeSeriesResult(
+        out_dir=out_dir, n_steps=step, n_converged=stats["converged"],
+        energy_loss=stats["energy"], peak_loss=stats["peak"], peak_loss_time=stats["peak_t"],
+        min_voltage=stats["vmin"], min_voltage_bus=stats["vmin_bus"], min_voltage_time=stats["vmin_t"],
+        max_voltage=stats["vmax"], violation_steps=stats["violation_steps"], bus_ids=bus_ids,
+    )
+
+
+def load_time_series(out_dir, mmap=True):
+    """
+    Open the outputs of time_series_loadflow.
+
+    Returns:
+        Dict of the output columns (memory-mapped read-only with mmap) plus
+        "bus_ids"
+    """
+    with open(os.path.join(out_dir, "meta.json")) as fh:
+        meta = json.load(fh)
+    mode = "r" if mmap else None
+    data = {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode) for name in meta["columns"]}
+    data["bus_ids"] = np.array(meta["bus_ids"])
+    return data
@@ -0,0 +1,335 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import os
+
+# Below this many machines a CCT search runs in-process by default: a
+# simulation then costs about as much as starting the pool and shipping the
+# case to it, so the parallel rounds save nothing
+POOL_MIN_MACHINES = 100
+
+
+@dataclass
+class GeneratorData:
+    H: np.ndarray                         # inertia constants (s); np.inf models an infinite bus
+    E: np.ndarray                         # internal EMF magnitudes behind transient reactance (pu)
+    delta0: np.ndarray                    # initial rotor angles (rad)
+    Pm: np.ndarray = None                 # mechanical powers (pu); pre-fault electrical power if None
+    D: np.ndarray = None                  # damping (pu power per rad/s of speed deviation); 0 if None
+    f: float = 50.0                       # system frequency (Hz)
+
+
+@dataclass
+class NetworkEvent:
+    time: float                           # switching time (s)
+    y_reduced: np.ndarray                 # admittance matrix between the internal machine nodes from this time on
+    label: str = ""
+
+
+@dataclass
+class StabilityResult:
+    t: np.ndarray                         # (N,) time points (s)
+    delta: np.ndarray                     # (N, m) rotor angles (deg)
+    omega: np.ndarray                     # (N, m) rotor speed deviations (rad/s)
+    events: list                          # [(time, label)] network switchings applied
+    stable: bool                          # largest rotor angle separation stayed below max_angle
+    max_angle_diff: float                 # largest rotor angle separation reached (deg)
+    t_unstable: float = None              # first time the separation exceeded max_angle
+
+    def as_dict(self, max_points=50):
+        """Summary with a down-sampled trajectory, e.g. for JSON tool output."""
+        step = max(1, int(np.ceil(len(self.t) / max_points)))
+        idx = np.r_[np.arange(0, len(self.t), step), len(self.t) - 1]
+        idx = np.unique(idx)
+        return {
+            "stable": self.stable,
+            "max_angle_diff_deg": float(self.max_angle_diff),
+            "t_unstable": self.t_unstable,
+            "events": [{"time": float(t), "label": label} for t, label in self.events],
+            "final_angles_deg": self.delta[-1].tolist(),
+            "trajectory": [
+                {"t": float(self.t[k]), "delta_deg": self.delta[k].round(3).tolist()}
+                for k in idx
+            ],
+        }
+
+
+def initial_conditions(v_term, s_gen, x_d):
+    """
+    Classical-model initial state from a solved load flow.
+
+    Args:
+        v_term: (m,) complex generator terminal voltages
+        s_gen: (m,) complex generator output powers P + jQ (pu)
+        x_d: (m,) transient reactances (pu)
+
+    Returns:
+        Tuple (E, delta0, Pm): EMF magnitudes, rotor angles (rad) and
+        mechanical powers
+    """
+    v_term = np.asarray(v_term, dtype=complex)
+    s_gen = np.asarray(s_gen, dtype=complex)
+    e = v_term + 1j * np.asarray(x_d, dtype=float) * np.conj(s_gen / v_term)
+    return np.abs(e), np.angle(e), s_gen.real.copy()
+
+
+def electrical_power(y_reduced, E, delta):
+    """
+    Machine electrical output powers for rotor angles delta.
+
+    delta may hold several states as rows, shape (k, m); the network
+    solution is then one matrix product for all of them.
+    """
+    e = E * np.exp(1j * delta)
+    return np.real(e * np.conj(e @ y_reduced.T))
+
+
+def _rhs(y_reduced, E, Pm, M, D, delta, omega):
+    """Swing equations: d(delta)/dt = omega, M d(omega)/dt = Pm - Pe - D omega."""
+    acc = (Pm - electrical_power(y_reduced, E, delta) - D * omega) / M
+    return omega, acc
+
+
+def _rk4_step(rhs, delta, omega, h):
+    k1d, k1w = rhs(delta, omega)
+    k2d, k2w = rhs(delta + 0.5 * h * k1d, omega + 0.5 * h * k1w)
+    k3d, k3w = rhs(delta + 0.5 * h * k2d, omega + 0.5 * h * k2w)
+    k4d, k4w = rhs(delta + h * k3d, omega + h * k3w)
+    return (delta + h / 6 * (k1d + 2 * k2d + 2 * k3d + k4d),
+            omega + h / 6 * (k1w + 2 * k2w + 2 * k3w + k4w))
+
+
+def _trapezoid_step(rhs, delta, omega, h, tol=1e-10, max_iter=20):
+    """Implicit trapezoidal rule, solved by fixed-point iteration from an Euler predictor."""
+    fd, fw = rhs(delta, omega)
+    d_new, w_new = delta + h * fd, omega + h * fw
+    for _ in range(max_iter):
+        gd, gw = rhs(d_new, w_new)
+        d_next = delta + 0.5 * h * (fd + gd)
+        w_next = omega + 0.5 * h * (fw + gw)
+        change = max(np.max(np.abs(d_next - d_new)), np.max(np.abs(w_next - w_new)))
+        d_new, w_new = d_next, w_next
+        if change < tol:
+            break
+    return d_new, w_new
+
+
+_STEPPERS = {"rk4": _rk4_step, "trapezoidal": _trapezoid_step}
+
+
+def simulate(gen, events, t_end, dt=0.01, method="rk4", max_angle=np.pi, stop_when_unstable=False):
+    """
+    Integrate the swing equations of all machines through a sequence of network switchings.
+
+    Args:
+        gen: GeneratorData (classical machine model)
+        events: NetworkEvent list; the one at time 0 is the pre-fault network
+        t_end: End time (s)
+        dt: Integration step (s); steps are shortened to land on event times
+        method: "rk4" or "trapezoidal"
+        max_angle: Rotor angle separation (rad) at which the case is unstable
+        stop_when_unstable: End the run as soon as max_angle is exceeded
+
+    Returns:
+        StabilityResult
+    """
+    if method not in _STEPPERS:
+        raise ValueError(f"Unknown integration method '{method}', use 'rk4' or 'trapezoidal'")
+    step = _STEPPERS[method]
+
+    events = sorted(events, key=lambda ev: ev.time)
+    if not events or events[0].time > 0:
+        raise ValueError("events must include the network in effect at t = 0")
+    y_pre = np.asarray(events[0].y_reduced, dtype=complex)
+
+    E = np.asarray(gen.E, dtype=float)
+    delta = np.array(gen.delta0, dtype=float)
+    m = len(delta)
+    M = np.asarray(gen.H, dtype=float) * np.ones(m) / (np.pi * gen.f)      # 2H / omega_s
+    D = np.zeros(m) if gen.D is None else np.asarray(gen.D, dtype=float) * np.ones(m)
+    Pm = electrical_power(y_pre, E, delta) if gen.Pm is None else np.asarray(gen.Pm, dtype=float)
+    omega = np.zeros(m)
+
+    # Segments between switchings, each integrated with (at most) dt steps
+    bounds = [min(ev.time, t_end) for ev in events[1:]] + [t_end]
+    n_steps = [int(np.ceil((b - a) / dt - 1e-9)) if b > a else 0
+               for a, b in zip([0.0] + bounds[:-1], bounds)]
+    N = sum(n_steps) + 1
+    t_out = np.empty(N)
+    delta_out = np.empty((N, m))
+    omega_out = np.empty((N, m))
+    t_out[0], delta_out[0], omega_out[0] = 0.0, delta, omega
+
+    result = StabilityResult(t=t_out, delta=delta_out, omega=omega_out, events=[],
+                             stable=True, max_angle_diff=0.0)
+    k = 0
+    t = 0.0
+    for ev, t_stop, n in zip(events, bounds, n_steps):
+        if ev.time > t_end:
+            break
+        result.events.append((ev.time, ev.label))
+        y = np.asarray(ev.y_reduced, dtype=complex)
+        rhs = lambda d, w, y=y: _rhs(y, E, Pm, M, D, d, w)
+        if n == 0:
+            continue
+        h = (t_stop - t) / n
+        for i in range(n):
+            delta, omega = step(rhs, delta, omega, h)
+            k += 1
+            t_out[k] = t + (i + 1) * h
+            delta_out[k], omega_out[k] = delta, omega
+            if np.ptp(delta) > max_angle and result.stable:
+                result.stable = False
+                result.t_unstable = float(t_out[k])
+                if stop_when_unstable:
+                    break
+        t = t_stop
+        if stop_when_unstable and not result.stable:
+            break
+
+    result.t = t_out[:k + 1]
+    result.delta = np.degrees(delta_out[:k + 1])
+    result.omega = omega_out[:k + 1]
+    result.max_angle_diff = float(np.degrees(np.ptp(delta_out[:k + 1], axis=1).max()))
+    return result
+
+
+def transient_stability(gen, y_pre, y_fault, y_post, t_clear, t_fault=0.0, t_end=2.0,
+                        dt=0.01, method="rk4", events=None, max_angle=np.pi,
+                        stop_when_unstable=False):
+    """
+    Classical multi-machine transient stability run for a fault cleared at t_clear.
+
+    Native replacement for matlab_scripts/swing.m, generalised to any number
+    of machines. All swing equations are integrated together (vectorized
+    RK4 or trapezoidal rule) into preallocated arrays.
+
+    Args:
+        gen: GeneratorData
+        y_pre, y_fault, y_post: Reduced admittance matrices between the
+            internal machine nodes before, during and after the fault
+        t_clear: Fault clearing time (s)
+        t_fault: Fault inception time (s)
+        t_end: End of the simulation (s)
+        dt: Integration step (s)
+        method: "rk4" or "trapezoidal"
+        events: Optional extra NetworkEvent switchings (e.g. reclosing)
+        max_angle: Rotor angle separation (rad) treated as loss of synchronism
+        stop_when_unstable: End the run as soon as max_angle is exceeded
+
+    Returns:
+        StabilityResult
+    """
+    if t_clear < t_fault:
+        raise ValueError("t_clear must not be earlier than t_fault")
+    schedule = [
+        NetworkEvent(0.0, y_pre, "pre-fault"),
+        NetworkEvent(t_fault, y_fault, "fault applied"),
+        NetworkEvent(t_clear, y_post, "fault cleared"),
+    ]
+    schedule += list(events or [])
+    return simulate(gen, schedule, t_end, dt=dt, method=method, max_angle=max_angle,
+                    stop_when_unstable=stop_when_unstable)
+
+
+@dataclass
+class CCTResult:
+    cct: float                            # critical clearing time estimate, midpoint of [lower, upper] (s)
+    lower: float                          # longest clearing time found stable (s)
+    upper: float                          # shortest clearing time found unstable (s); inf if none
+    stable_run: StabilityResult           # run cleared at lower
+    unstable_run: StabilityResult         # run cleared at upper (None if upper is inf)
+    n_simulations: int
+
+    def as_dict(self):
+        """Summary for JSON tool output; upper and tolerance are None when no unstable clearing was found."""
+        bounded = np.isfinite(self.upper)
+        return {
+            "cct": float(self.cct),
+            "lower": float(self.lower),
+            "upper": float(self.upper) if bounded else None,
+            "tolerance": float(self.upper - self.lower) if bounded else None,
+            "n_simulations": self.n_simulations,
+            "stable_run": self.stable_run.as_dict(max_points=20),
+            "unstable_run": self.unstable_run.as_dict(max_points=20) if self.unstable_run else None,
+        }
+
+
+_WORKER = {}
+
+
+def _init_worker(gen, y_pre, y_fault, y_post, kwargs):
+    _WORKER["case"] = (gen, y_pre, y_fault, y_post)
+    _WORKER["kwargs"] = kwargs
+
+
+def _worker_run(t_clear):
+    return transient_stability(*_WORKER["case"], t_clear, **_WORKER["kwargs"])
+
+
+def critical_clearing_time(gen, y_pre, y_fault, y_post, t_max=1.0, t_fault=0.0, tol=0.005,
+                           t_end=2.0, dt=0.01, method="rk4", max_angle=np.pi, workers=None):
+    """
+    Critical clearing time by parallel k-section search over the clearing time.
+
+    Each round splits the current [stable, unstable] bracket at one clearing
+    time per worker and runs those simulations concurrently on a process
+    pool (a plain bisection with a single worker), so the bracket shrinks by
+    a factor workers + 1 per round. Runs stop as soon as the machines lose
+    synchronism, so unstable candidates are cheap.
+
+    Args:
+        gen, y_pre, y_fault, y_post: Case as for transient_stability
+        t_max: Longest clearing time considered (s)
+        t_fault: Fault inception time (s); also the shortest clearing time
+        tol: Width of the final [lower, upper] bracket (s)
+        t_end, dt, method, max_angle: Simulation settings as for transient_stability
+        workers: Number of worker processes (default: CPU count from POOL_MIN_MACHINES
+            machines up, in-process below; 1 runs in-process)
+
+    Returns:
+        CCTResult; if the case is still stable when cleared at t_max,
+        lower = cct = t_max and upper = inf
+    """
+    kwargs = dict(t_fault=t_fault, t_end=t_end, dt=dt, method=method, max_angle=max_angle,
+                  stop_when_unstable=True)
+    case = (gen, y_pre, y_fault, y_post)
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(gen.H) >= POOL_MIN_MACHINES else 1
+    workers = max(1, workers)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                   initargs=(*case, kwargs))
+        run_all = lambda times: list(pool.map(_worker_run, times))
+    else:
+        run_all = lambda times: [transient_stability(*case, tc, **kwargs) for tc in times]
+
+    try:
+        n_sim = 2
+        low_run, high_run = run_all([t_fault, t_max])
+        if not low_run.stable:
+            raise ValueError("The system is unstable even when the fault is cleared immediately")
+        if high_run.stable:
+            return CCTResult(cct=t_max, lower=t_max, upper=np.inf, stable_run=high_run,
+                             unstable_run=None, n_simulations=n_sim)
+
+        lower, upper = t_fault, t_max
+        while upper - lower > tol:
+            times = np.linspace(lower, upper, workers + 2)[1:-1]
+            runs = run_all(times)
+            n_sim += len(times)
+            for tc, run in zip(times, runs):
+                if run.stable:
+                    lower, low_run = tc, run
+                else:
+                    # Stability is monotonic in the clearing time: first unstable ends the bracket
+                    upper, high_run = tc, run
+                    break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return CCTResult(cct=0.5 * (lower + upper), lower=float(lower), upper=float(upper),
+                     stable_run=low_run, unstable_run=high_run, n_simulations=n_sim)
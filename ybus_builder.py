@@ -0,0 +1,90 @@
+import numpy as np
+import scipy.sparse as sp
+from network import as_line_data, as_ybus
+
+
+def branch_admittances(line_data):
+    """
+    Per-branch Ybus stamps in the convention of build_ybus.
+
+    Args:
+        line_data: Array-like where each row is [from_bus, to_bus, R, X, a, shunt]
+                   with 1-based bus numbers. Extra columns are ignored. A Network
+                   is also accepted.
+
+    Returns:
+        Tuple (fb, tb, y_diag, y_off): 0-based end buses, the term each branch
+        adds to both diagonal entries and the term it adds to both off-diagonals
+    """
+    ldata = np.asarray(as_line_data(line_data), dtype=float)
+    if ldata.ndim != 2 or ldata.shape[1] < 6:
+        raise ValueError("line_data must have rows of [from_bus, to_bus, R, X, a, shunt]")
+
+    fb = ldata[:, 0].astype(np.int64) - 1
+    tb = ldata[:, 1].astype(np.int64) - 1
+    z = ldata[:, 2] + 1j * ldata[:, 3]
+    a = ldata[:, 4]
+    sh = ldata[:, 5]
+
+    y_off = -1.0 / (z * a)
+    y_diag = 1.0 / (z * a ** 2) + 1j * sh / 2
+    return fb, tb, y_diag, y_off
+
+
+def branch_stamps(line_data):
+    """
+    Two-port stamps of every branch of line_data or a Network.
+
+    A Network gives its own exact stamps (pi model with taps and phase
+    shifts); line_data rows give the symmetric build_ybus stamps.
+
+    Returns:
+        Tuple (fb, tb, yff, yft, ytf, ytt): 0-based end buses and the
+        admittances with I_from = yff V_f + yft V_t, I_to = ytf V_f + ytt V_t
+    """
+    if hasattr(line_data, "branch_admittances"):
+        return line_data.branch_admittances()
+    fb, tb, y_diag, y_off = branch_admittances(line_data)
+    return fb, tb, y_diag, y_off, y_off, y_diag
+
+
+def build_ybus(line_data, n_bus=None, dense=False):
+    """
+    Build the bus admittance matrix from branch data without MATLAB.
+
+    Uses the same conventions as the MATLAB code in ybus_agent.compute_ybus_matlab:
+    - off-diagonal terms are -1/(z*a)
+    - both end buses of a branch get 1/(z*a^2) + 1j*sh/2 on the diagonal
+
+    All branch contributions are scattered into a COO matrix in one pass and
+    summed into CSR, so parallel branches between the same pair of buses add up
+    (the MATLAB loop keeps only the last one on the off-diagonal).
+
+    Args:
+        line_data: Array-like where each row is [from_bus, to_bus, R, X, a, shunt]
+                   with 1-based bus numbers. Extra columns are ignored. A Network
+                   is also accepted.
+        n_bus: Number of buses. Defaults to the largest bus number in line_data.
+        dense: If True, return a dense (n, n) complex numpy array instead of CSR.
+
+    Returns:
+        Ybus as a scipy.sparse.csr_matrix (or numpy array if dense=True)
+    """
+    if hasattr(line_data, "ybus"):
+        # A Network keeps its exact Ybus; don't rebuild it from line_data rows
+        return as_ybus(line_data, dense=dense)
+    fb, tb, y_diag, y_off = branch_admittances(line_data)
+
+    if n_bus is None:
+        n_bus = int(max(fb.max(), tb.max())) + 1 if len(fb) else 0
+
+    rows = np.concatenate([fb, tb, fb, tb])
+    cols = np.concatenate([tb, fb, fb, tb])
+    vals = np.concatenate([y_off, y_off, y_diag, y_diag])
+
+    ybus = sp.coo_matrix((vals, (rows, cols)), shape=(n_bus, n_bus)).tocsr()
+    ybus.sum_duplicates()
+
+    if dense:
+        return ybus.toarray()
+    return ybus
@@ -0,0 +1,165 @@
+import json
+import os
+import re
+import numpy as np
+import scipy.io
+import scipy.sparse as sp
+from case_files import file_hash
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "YBUS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "chatbot_eee", "ybus"),
+)
+
+# Files above this size are converted to a memory-mapped store on first load
+MMAP_THRESHOLD = 8 * 2 ** 20
+
+# MATLAB imaginary unit after a number ("4i", "-14i", "2.5e-3j") and any whitespace
+_IMAG_UNIT = re.compile(r"(?<=[0-9.])[ij]\b")
+_BLANKS = re.compile(r"[ \t\r]+")
+
+
+def parse_complex_csv(text):
+    """
+    Parse MATLAB-style complex CSV text (writematrix / dlmwrite output).
+
+    Cells like "-0-14i", "0+4i", "1.5e-3-2j" or plain reals are normalized
+    with two regex passes over the whole text and converted to complex by
+    NumPy in one call, instead of parsing cell by cell.
+
+    Args:
+        text: CSV content (one matrix row per line)
+
+    Returns:
+        (rows, cols) complex ndarray
+    """
+    text = _BLANKS.sub("", _IMAG_UNIT.sub("j", text)).strip()
+    if not text:
+        return np.zeros((0, 0), dtype=complex)
+    lines = text.split("\n")
+    n_cols = lines[0].count(",") + 1
+    cells = np.array(text.replace("\n", ",").split(","))
+    if len(cells) != len(lines) * n_cols:
+        raise ValueError("complex CSV rows have different numbers of columns")
+    try:
+        values = cells.astype(np.complex128)
+    except ValueError as exc:
+        raise ValueError(f"not a complex number CSV: {exc}") from None
+    return values.reshape(len(lines), n_cols)
+
+
+def load_complex_csv(path):
+    """Read a MATLAB-style complex CSV file (see parse_complex_csv)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        return parse_complex_csv(fh.read())
+
+
+def load_mat(path, name=None):
+    """
+    Load one matrix variable from a MATLAB .mat file (v4 to v7).
+
+    Only the requested variable is read (found with scipy.io.whosmat when
+    name is None: "Ybus" if present, else the only 2-D numeric variable).
+    Sparse MATLAB matrices come back as CSR.
+
+    Args:
+        path: .mat file path
+        name: Variable name (optional)
+
+    Returns:
+        complex ndarray or scipy.sparse.csr_matrix
+    """
+    try:
+        variables = scipy.io.whosmat(path)
+    except (NotImplementedError, ValueError) as exc:
+        raise ValueError(f"{path}: unsupported .mat file ({exc}); save it with -v7") from None
+    if name is None:
+        names = [v[0] for v in variables if len(v[1]) == 2 and v[2] in ("double", "sparse", "single")]
+        name = "Ybus" if "Ybus" in names else (names[0] if len(names) == 1 else None)
+        if name is None:
+            raise ValueError(f"{path}: choose one of the variables {names}")
+    data = scipy.io.loadmat(path, variable_names=[name])
+    if name not in data:
+        raise ValueError(f"{path} has no variable {name!r}")
+    value = data[name]
+    if sp.issparse(value):
+        return sp.csr_matrix(value, dtype=complex)
+    return np.asarray(value, dtype=complex)
+
+
+def save_ybus_store(path, Ybus):
+    """
+    Write a Ybus as a store directory of raw .npy arrays (CSR parts) that
+    load_ybus_store can memory-map.
+    """
+    Y = sp.csr_matrix(Ybus, dtype=complex)
+    Y.sum_duplicates()
+    tmp = path + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "data.npy"), Y.data)
+    np.save(os.path.join(tmp, "indices.npy"), Y.indices)
+    np.save(os.path.join(tmp, "indptr.npy"), Y.indptr)
+    with open(os.path.join(tmp, "meta.json"), "w") as fh:
+        json.dump({"shape": list(Y.shape), "format": "csr"}, fh)
+    if os.path.isdir(path):
+        for f in os.listdir(path):
+            os.remove(os.path.join(path, f))
+        os.rmdir(path)
+    os.replace(tmp, path)
+
+
+def load_ybus_store(path, mmap=True):
+    """
+    Open a store written by save_ybus_store.
+
+    With mmap the CSR arrays are memory-mapped copy-on-write, so opening a
+    large network costs no parsing, pages are read only when touched and
+    in-place scipy operations (sum_duplicates, eliminate_zeros) never write
+    back to the store.
+    """
+    with open(os.path.join(path, "meta.json")) as fh:
+        shape = tuple(json.load(fh)["shape"])
+    mode = "c" if mmap else None
+    arrays = [np.load(os.path.join(path, f"{k}.npy"), mmap_mode=mode)
+              for k in ("data", "indices", "indptr")]
+    return sp.csr_matrix(tuple(arrays), shape=shape, copy=False)
+
+
+def load_ybus(path, name=None, cache_dir=DEFAULT_CACHE_DIR, mmap_threshold=MMAP_THRESHOLD):
+    """
+    Load a Ybus from a complex CSV, a .mat file or a Ybus store.
+
+    CSV and .mat files larger than mmap_threshold are converted to a store in
+    cache_dir (keyed by the file hash) on first use and memory-mapped from
+    then on.
+
+    Args:
+        path: .csv / .txt, .mat or store directory
+        name: Variable name inside a .mat file (optional)
+        cache_dir: Directory of converted stores (None disables conversion)
+        mmap_threshold: File size (bytes) from which files are converted
+
+    Returns:
+        complex ndarray (small CSV / dense .mat) or scipy.sparse.csr_matrix
+    """
+    if os.path.isdir(path):
+        return load_ybus_store(path)
+
+    store = None
+    if cache_dir and os.path.getsize(path) >= mmap_threshold:
+        store = os.path.join(cache_dir, f"ybus_{file_hash(path)}_{name or ''}")
+        if os.path.isdir(store):
+            return load_ybus_store(store)
+
+    if path.lower().endswith(".mat"):
+        Ybus = load_mat(path, name)
+    else:
+        Ybus = load_complex_csv(path)
+    if Ybus.ndim != 2 or Ybus.shape[0] != Ybus.shape[1]:
+        raise ValueError(f"{path} does not hold a square matrix (shape {Ybus.shape})")
+
+    if store:
+        os.makedirs(cache_dir, exist_ok=True)
+        save_ybus_store(store, Ybus)
+        return load_ybus_store(store)
+    return Ybus